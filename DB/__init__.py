@@ -1,3 +1,4 @@
 """Database package exposing connection utilities."""
 
 from .connection import get_connection  # re-export for convenience
+from .pool import APP_POOL, ConnectionPool, PoolTimeoutError
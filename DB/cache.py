@@ -0,0 +1,195 @@
+"""Shared LRU cache for read-heavy CRUD listings.
+
+Entries are keyed by the database the service's connection factory opens
+(see ``connection_target``), query name and parameters, and remember the
+version of every table they read. Write methods call
+``TABLE_VERSIONS.bump(table)`` after committing, which makes every cached
+result built from that table stale.
+
+Only writes made through the Modules CRUD classes bump those versions.
+Rows written with raw SQL (sqlite3 shell, scripts, DB.generate_data, other
+processes) are NOT seen by the shared ``QUERY_CACHE``, which keeps
+``watch_external`` off, until a CRUD write to the same table or
+``QUERY_CACHE.clear()``. Call ``clear()`` after such writes, or build a
+``QueryCache(..., watch_external=True)``: it keeps one connection open and
+drops the database's entries whenever ``PRAGMA data_version`` changes,
+which also happens on every commit made by any other connection.
+
+Inside a unit of work (DB/unit_of_work.py) ``get_or_load`` calls the
+loader directly: it reads rows the unit has not committed yet, which must
+neither be stored for other threads nor hide the unit's own writes.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from DB.connection import _open_connection, connection_target, database_identity, in_unit_of_work
+
+
+class TableVersions:
+    """Per-database, per-table change counters bumped by write paths."""
+
+    def __init__(self) -> None:
+        self._versions: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def bump(self, *tables: str) -> None:
+        identity = database_identity()
+        with self._lock:
+            for table in tables:
+                key = (identity, table)
+                self._versions[key] = self._versions.get(key, 0) + 1
+        recorded = getattr(self._local, "recorded", None)
+        if recorded is not None:
+            recorded.update(tables)
+
+    def start_recording(self, tables: set[str]) -> None:
+        """Add the tables bumped on this thread to ``tables`` until ``stop_recording``."""
+        self._local.recorded = tables
+
+    def stop_recording(self) -> None:
+        self._local.recorded = None
+
+    def snapshot(self, tables: Iterable[str]) -> tuple[int, ...]:
+        identity = database_identity()
+        return tuple(self._versions.get((identity, table), 0) for table in tables)
+
+
+def _estimate_size(value: Any) -> int:
+    """Rough byte size of a list of row dicts (or any other value)."""
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(_estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    """LRU cache bounded by entry count and by approximate size in bytes."""
+
+    def __init__(
+        self,
+        versions: TableVersions,
+        max_entries: int = 128,
+        max_bytes: int = 16 * 1024 * 1024,
+        watch_external: bool = False,
+    ) -> None:
+        self.versions = versions
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.watch_external = watch_external
+        self._entries: OrderedDict[Hashable, tuple[tuple[str, ...], tuple[int, ...], Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._watchers: dict[str, tuple[sqlite3.Connection, int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        tables: tuple[str, ...],
+        loader: Callable[[], Any],
+        connection_factory: Optional[Callable] = None,
+    ) -> Any:
+        """
+        Purpose: Return the cached result for ``key`` or run ``loader``.
+        Args:
+            key: Query name plus parameters.
+            tables: Tables the query reads; their versions validate the entry.
+            loader: Callable producing a fresh result (list of row dicts).
+            connection_factory: Factory ``loader`` reads through; services
+                with different factories never share entries.
+        Returns:
+            A copy of the cached rows, so callers may modify them freely.
+        """
+        if in_unit_of_work():
+            return loader()
+        if self.watch_external:
+            self._check_external_changes()
+        full_key = (*connection_target(connection_factory), key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and entry[1] == self.versions.snapshot(tables):
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return _copy_rows(entry[2])
+            self.misses += 1
+        # La versión se toma antes de leer: una escritura concurrente deja
+        # la entrada obsoleta en vez de guardar datos viejos como frescos.
+        version = self.versions.snapshot(tables)
+        value = loader()
+        size = _estimate_size(value)
+        if size <= self.max_bytes:
+            with self._lock:
+                self._drop(full_key)
+                self._entries[full_key] = (tables, version, value, size)
+                self._bytes += size
+                while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                    self._drop(next(iter(self._entries)))
+                    self.evictions += 1
+        return _copy_rows(value)
+
+    def _drop(self, full_key: Hashable) -> None:
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._bytes -= entry[3]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def close(self) -> None:
+        """Clear the cache and close the data_version watcher connections."""
+        self.clear()
+        with self._lock:
+            watchers, self._watchers = self._watchers, {}
+        for conn, _ in watchers.values():
+            conn.close()
+
+    def _check_external_changes(self) -> None:
+        identity = database_identity()
+        with self._lock:
+            watcher = self._watchers.get(identity)
+            if watcher is None:
+                # Conexión propia: nunca la de una unidad de trabajo activa.
+                conn = _open_connection(check_same_thread=False)
+                self._watchers[identity] = (conn, conn.execute("PRAGMA data_version").fetchone()[0])
+                return
+            conn, seen = watcher
+            current = conn.execute("PRAGMA data_version").fetchone()[0]
+            if current != seen:
+                self._watchers[identity] = (conn, current)
+                stale = [key for key in self._entries if key[0] == identity]
+                for key in stale:
+                    self._drop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def _copy_rows(value: Any) -> Any:
+    if isinstance(value, list):
+        return [dict(row) if isinstance(row, dict) else row for row in value]
+    return value
+
+
+TABLE_VERSIONS = TableVersions()
+QUERY_CACHE = QueryCache(TABLE_VERSIONS)
@@ -4,10 +4,55 @@ from __future__ import annotations
 
 import os
 import sqlite3
+import threading
 from pathlib import Path
+from typing import Callable, Hashable, Optional
+
+from DB.metrics import CONNECTIONS_OPENED
+from DB.tracing import QUERY_TRACER, TracedConnection
 
 DEFAULT_DB_PATH = Path(__file__).with_name("app.db")
 ENV_VAR_NAME = "PYTHON_BD_DB_PATH"
+PROFILE_ENV_VAR_NAME = "PYTHON_BD_DB_PROFILE"
+DEFAULT_PROFILE = "balanced"
+
+# Unit of work open on each thread (see DB/unit_of_work.py).
+_ACTIVE_UNIT = threading.local()
+
+# Every profile sets the same pragmas so switching profiles never leaves a
+# setting from the previous one behind. cache_size is negative (KiB) and
+# mmap_size is in bytes.
+PERFORMANCE_PROFILES: dict[str, dict[str, object]] = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16_000,
+        "mmap_size": 0,
+        "temp_store": "FILE",
+        "busy_timeout": 10_000,
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32_000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5_000,
+    },
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -128_000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 2_000,
+    },
+}
+
+
+# Stored in the database file rather than the connection: initialize_database
+# sets them once and apply_profile leaves them alone.
+PERSISTENT_PRAGMAS = frozenset({"journal_mode"})
 
 
 def _resolve_db_path() -> str:
@@ -26,12 +71,103 @@ def _resolve_db_path() -> str:
     return str(DEFAULT_DB_PATH)
 
 
-def get_connection() -> sqlite3.Connection:
+def database_identity() -> str:
+    """Return a cheap key identifying the configured database (for caches)."""
+    return os.getenv(ENV_VAR_NAME) or str(DEFAULT_DB_PATH)
+
+
+def connection_target(connection_factory: Optional[Callable] = None) -> tuple[str, Hashable]:
     """
-    Purpose: Establish and return a connection to the SQLite database.
+    Purpose: Identify the database a service's connection factory opens, for cache keys.
+    Args:
+        connection_factory: The service's factory; ``None`` and
+            ``get_connection`` open the configured database.
+    Returns:
+        (database_identity(), None) for the configured database. Any other
+        factory can only be resolved by connecting, so it becomes part of
+        the key: (database_identity(), connection_factory).
+    """
+    if connection_factory is None or connection_factory is get_connection:
+        return database_identity(), None
+    return database_identity(), connection_factory
+
+
+def in_unit_of_work() -> bool:
+    """True while a unit of work is open on this thread (its reads may see uncommitted rows)."""
+    return getattr(_ACTIVE_UNIT, "current", None) is not None
+
+
+def resolve_profile(profile: Optional[str] = None) -> str:
+    """Return the profile name to use, validating it against the known set."""
+    name = (profile or os.getenv(PROFILE_ENV_VAR_NAME) or DEFAULT_PROFILE).strip().lower()
+    if name not in PERFORMANCE_PROFILES:
+        known = ", ".join(sorted(PERFORMANCE_PROFILES))
+        raise ValueError(f"Unknown database profile '{name}'. Expected one of: {known}.")
+    return name
+
+
+def describe_profile(profile: Optional[str] = None) -> str:
+    """Return a one-line summary of the active profile for startup logs."""
+    name = resolve_profile(profile)
+    settings = ", ".join(f"{key}={value}" for key, value in PERFORMANCE_PROFILES[name].items())
+    return f"SQLite profile '{name}' ({settings})"
+
+
+def apply_profile(connection: sqlite3.Connection, profile: Optional[str] = None) -> str:
+    """
+    Purpose: Apply the per-connection pragmas of a performance profile.
+    Args:
+        connection: Open SQLite connection.
+        profile: Profile name; falls back to the env var, then the default.
+    Returns:
+        The name of the applied profile. PERSISTENT_PRAGMAS are skipped;
+        see apply_persistent_pragmas.
+    """
+    name = resolve_profile(profile)
+    for pragma, value in PERFORMANCE_PROFILES[name].items():
+        if pragma not in PERSISTENT_PRAGMAS:
+            connection.execute(f"PRAGMA {pragma} = {value};")
+    return name
+
+
+def apply_persistent_pragmas(connection: sqlite3.Connection, profile: Optional[str] = None) -> str:
+    """
+    Purpose: Store the profile's PERSISTENT_PRAGMAS (journal_mode) in the database file.
+    Args:
+        connection: Open SQLite connection outside any transaction.
+        profile: Profile name; falls back to the env var, then the default.
     Returns:
-        sqlite3.Connection object
+        The name of the applied profile.
     """
-    connection = sqlite3.connect(_resolve_db_path())
+    name = resolve_profile(profile)
+    for pragma, value in PERFORMANCE_PROFILES[name].items():
+        if pragma in PERSISTENT_PRAGMAS:
+            connection.execute(f"PRAGMA {pragma} = {value};")
+    return name
+
+
+def _open_connection(check_same_thread: bool = True, profile: Optional[str] = None) -> sqlite3.Connection:
+    """Open a new configured connection, ignoring any active unit of work."""
+    factory = TracedConnection if QUERY_TRACER.enabled else sqlite3.Connection
+    connection = sqlite3.connect(_resolve_db_path(), check_same_thread=check_same_thread, factory=factory)
+    CONNECTIONS_OPENED.inc()
     connection.execute("PRAGMA foreign_keys = ON;")
+    apply_profile(connection, profile)
     return connection
+
+
+def get_connection(check_same_thread: bool = True, profile: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Purpose: Establish and return a connection to the SQLite database.
+    Args:
+        check_same_thread: Forwarded to sqlite3.connect; pooled connections
+            disable it because they may be handed to another thread.
+        profile: Optional performance profile name (see PERFORMANCE_PROFILES).
+    Returns:
+        sqlite3.Connection object (a TracedConnection while DB.tracing is
+        enabled, or a handle on the unit's connection inside unit_of_work()).
+    """
+    unit = getattr(_ACTIVE_UNIT, "current", None)
+    if unit is not None:
+        return unit()
+    return _open_connection(check_same_thread, profile)
@@ -0,0 +1,291 @@
+"""
+Generate a large, deterministic synthetic dataset for performance work.
+
+Fills clientes, productos, proveedores, inventarios and ventas in a new
+database built from the schema in DB/init_db.py. Product and client
+popularity follow a Zipf-like distribution, sale dates follow monthly and
+weekday seasonality with a mild yearly growth, and the same ``--seed``
+always produces the same rows.
+
+Secondary indexes, the rollup and search triggers and the FTS5 tables are
+dropped before loading and rebuilt once at the end, and rows are written
+with ``executemany`` in large batches inside a single transaction.
+
+Usage:
+    python -m DB.generate_data --db DB/bench.db --sales 10000000 --seed 7
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterator, Optional
+
+from DB.init_db import (
+    INDEX_DEFINITIONS,
+    SEARCH_INDEXES,
+    TRIGGER_DEFINITIONS,
+    apply_definitions,
+    initialize_database,
+    rebuild_sales_rollups,
+)
+
+# Ventas por mes relativas (enero flojo, picos en mitad y fin de año).
+MONTH_WEIGHTS = (0.75, 0.8, 0.9, 0.95, 1.05, 1.1, 1.0, 0.95, 1.0, 1.05, 1.3, 1.6)
+# Lunes a domingo.
+WEEKDAY_WEIGHTS = (1.0, 1.0, 1.05, 1.1, 1.3, 1.4, 0.6)
+YEARLY_GROWTH = 0.08
+
+CITIES = (
+    ("Bogotá", 30), ("Medellín", 16), ("Cali", 12), ("Barranquilla", 9), ("Cartagena", 7),
+    ("Bucaramanga", 6), ("Pereira", 5), ("Manizales", 4), ("Cúcuta", 4), ("Ibagué", 3),
+    ("Santa Marta", 2), ("Pasto", 2),
+)
+COMPANY_WORDS = (
+    "Andina", "Delta", "Orion", "Global", "Quasar", "Nova", "Sigma", "Prisma", "Horizonte", "Atlas",
+    "Cóndor", "Pacífico", "Caribe", "Montaña", "Solar", "Vértice", "Aurora", "Zenit", "Faro", "Raíz",
+)
+COMPANY_KINDS = ("Comercial", "Servicios", "Soluciones", "Distribuciones", "Grupo", "Inversiones", "Tienda")
+CATEGORIES = (
+    ("Teclado", "Teclado"), ("Mouse", "Mouse óptico"), ("Monitor", "Monitor LED"),
+    ("Impresora", "Impresora multifuncional"), ("Disco", "Disco externo"), ("Router", "Router WiFi"),
+    ("Parlante", "Parlante bluetooth"), ("Webcam", "Cámara web"), ("USB", "Memoria USB"),
+    ("Silla", "Silla ergonómica"), ("Portátil", "Computador portátil"), ("Audífonos", "Audífonos inalámbricos"),
+)
+BRANDS = ("Atlas", "Nebula", "Zenith", "Flux", "Orion", "Aero", "Pulse", "Aurora", "Hyper", "Ergo", "Titan", "Nimbus")
+IVA_RATES = ((0.19, 85), (0.05, 10), (0.0, 5))
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    """Sizes and shape of the generated dataset."""
+
+    sales: int = 100_000
+    clients: int = 5_000
+    products: int = 1_000
+    providers_per_product: int = 2
+    start: date = date(2022, 1, 1)
+    days: int = 3 * 365
+    skew: float = 1.1
+    seed: int = 42
+    batch_size: int = 50_000
+
+
+def _zipf_cum_weights(count: int, skew: float) -> list[float]:
+    return list(accumulate(1.0 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+def _weighted_choice(rng: random.Random, options: tuple) -> str:
+    values, weights = zip(*options)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _calendar(config: GeneratorConfig) -> tuple[list[str], list[float]]:
+    days, weights = [], []
+    for offset in range(config.days):
+        day = config.start + timedelta(days=offset)
+        growth = 1.0 + YEARLY_GROWTH * offset / 365
+        days.append(day.isoformat())
+        weights.append(MONTH_WEIGHTS[day.month - 1] * WEEKDAY_WEIGHTS[day.weekday()] * growth)
+    return days, list(accumulate(weights))
+
+
+def _client_rows(rng: random.Random, config: GeneratorConfig) -> Iterator[tuple]:
+    for index in range(1, config.clients + 1):
+        name = f"{rng.choice(COMPANY_KINDS)} {rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)}"
+        address = f"Calle {rng.randint(1, 200)} #{rng.randint(1, 99)}-{rng.randint(1, 99)}"
+        phone = f"60{rng.randint(10_000_000, 99_999_999)}"
+        yield f"C{index:07d}", name, address, phone, _weighted_choice(rng, CITIES)
+
+
+def _product_rows(rng: random.Random, config: GeneratorConfig) -> list[tuple]:
+    rows = []
+    for index in range(1, config.products + 1):
+        short, long = rng.choice(CATEGORIES)
+        brand = rng.choice(BRANDS)
+        model = f"{rng.choice('ABCDEFGHJKLMNPRSTX')}{rng.randint(10, 999)}"
+        price = round(min(5_000.0, rng.lognormvariate(4.5, 1.0)), 2)
+        iva = _weighted_choice(rng, IVA_RATES)
+        rows.append((f"P{index:06d}", f"{short} {brand} {model}", f"{long} {brand}", iva, price))
+    return rows
+
+
+def _provider_rows(rng: random.Random, products: list[tuple], per_product: int) -> Iterator[tuple]:
+    index = 0
+    for codprod, _, descripcion, _, price in products:
+        for _ in range(per_product):
+            index += 1
+            yield (
+                f"PR{index:07d}",
+                codprod,
+                f"Proveedor {descripcion}",
+                round(price * rng.uniform(0.55, 0.85), 2),
+                f"Carrera {rng.randint(1, 120)} #{rng.randint(1, 99)}-{rng.randint(1, 99)}",
+                f"60{rng.randint(10_000_000, 99_999_999)}",
+            )
+
+
+def _inventory_rows(rng: random.Random, products: list[tuple]) -> Iterator[tuple]:
+    for codprod, nomprod, _, iva, price in products:
+        minimum = rng.randint(5, 50)
+        yield codprod, nomprod, rng.randint(0, minimum * 10), minimum, iva, price
+
+
+def _sale_batches(rng: random.Random, config: GeneratorConfig, products: list[tuple]) -> Iterator[list[tuple]]:
+    days, day_weights = _calendar(config)
+    # La popularidad no sigue el orden de los códigos.
+    clients = [f"C{index:07d}" for index in range(1, config.clients + 1)]
+    ranked_products = list(products)
+    rng.shuffle(clients)
+    rng.shuffle(ranked_products)
+    client_weights = _zipf_cum_weights(len(clients), config.skew)
+    product_weights = _zipf_cum_weights(len(ranked_products), config.skew)
+    quantities = (1, 2, 3, 4, 5, 6, 8, 10, 12, 20)
+    quantity_weights = list(accumulate((40, 22, 12, 8, 6, 4, 3, 2, 2, 1)))
+
+    remaining = config.sales
+    while remaining > 0:
+        size = min(config.batch_size, remaining)
+        remaining -= size
+        batch = []
+        for fecha, codclie, product, canti in zip(
+            rng.choices(days, cum_weights=day_weights, k=size),
+            rng.choices(clients, cum_weights=client_weights, k=size),
+            rng.choices(ranked_products, cum_weights=product_weights, k=size),
+            rng.choices(quantities, cum_weights=quantity_weights, k=size),
+        ):
+            codprod, nomprod, _, iva, price = product
+            subtotal = round(price * canti, 2)
+            vriva = round(subtotal * iva, 2)
+            batch.append((fecha, codclie, codprod, nomprod, price, canti, vriva, subtotal, round(subtotal + vriva, 2)))
+        yield batch
+
+
+def _drop_deferred_objects(connection: sqlite3.Connection) -> None:
+    """Drop indexes, triggers and FTS tables that would slow down the load."""
+    for name in INDEX_DEFINITIONS:
+        connection.execute(f"DROP INDEX IF EXISTS {name}")
+    for name in TRIGGER_DEFINITIONS:
+        connection.execute(f"DROP TRIGGER IF EXISTS {name}")
+    for fts_table in SEARCH_INDEXES:
+        for suffix in ("insert", "delete", "update"):
+            connection.execute(f"DROP TRIGGER IF EXISTS trg_{fts_table}_{suffix}")
+        connection.execute(f"DROP TABLE IF EXISTS {fts_table}")
+
+
+def generate(db_path: Path, config: GeneratorConfig, log=print) -> dict[str, int]:
+    """
+    Purpose: Fill an empty database with synthetic data.
+    Args:
+        db_path: Target SQLite file; it is created and migrated if needed.
+        config: Dataset sizes, distribution skew and random seed.
+        log: Callable receiving progress messages (``None`` to stay quiet).
+    Returns:
+        Number of rows written per table.
+    Raises:
+        ValueError: If the target database already contains products or sales.
+    """
+    log = log or (lambda message: None)
+    initialize_database(db_path)
+    rng = random.Random(config.seed)
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    counts: dict[str, int] = {}
+    try:
+        for table in ("productos", "clientes", "ventas"):
+            if connection.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                raise ValueError(f"La tabla {table} ya tiene datos; use una base de datos vacía.")
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("PRAGMA cache_size = -262144")
+        connection.execute("PRAGMA temp_store = MEMORY")
+        connection.execute("BEGIN IMMEDIATE")
+        _drop_deferred_objects(connection)
+
+        started = time.perf_counter()
+        connection.executemany("INSERT INTO clientes VALUES (?, ?, ?, ?, ?)", _client_rows(rng, config))
+        counts["clientes"] = config.clients
+        products = _product_rows(rng, config)
+        connection.executemany("INSERT INTO productos VALUES (?, ?, ?, ?, ?)", products)
+        counts["productos"] = len(products)
+        connection.executemany(
+            "INSERT INTO proveedores VALUES (?, ?, ?, ?, ?, ?)",
+            _provider_rows(rng, products, config.providers_per_product),
+        )
+        counts["proveedores"] = len(products) * config.providers_per_product
+        connection.executemany(
+            "INSERT INTO inventarios (codprod, nomprod, cantidad, stock_minimo, iva, costovta) VALUES (?, ?, ?, ?, ?, ?)",
+            _inventory_rows(rng, products),
+        )
+        counts["inventarios"] = len(products)
+
+        written = 0
+        for batch in _sale_batches(rng, config, products):
+            connection.executemany(
+                """
+                INSERT INTO ventas (fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                batch,
+            )
+            written += len(batch)
+            elapsed = time.perf_counter() - started
+            log(f"ventas: {written:,}/{config.sales:,} ({written / elapsed:,.0f} filas/s)")
+        counts["ventas"] = written
+
+        log("Creando índices, rollups e índices de búsqueda...")
+        rebuild_sales_rollups(connection)
+        apply_definitions(connection)
+        connection.commit()
+        connection.execute("PRAGMA optimize")
+        log(f"Listo en {time.perf_counter() - started:.1f} s")
+    except BaseException:
+        if connection.in_transaction:
+            connection.rollback()
+        raise
+    finally:
+        connection.close()
+    return counts
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    Purpose: CLI entry point for the synthetic data generator.
+    """
+    defaults = GeneratorConfig()
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos a gran escala.")
+    # Sin valor por defecto: nunca se escribe por accidente en la base de la aplicación.
+    parser.add_argument("--db", type=Path, required=True, help="Base de datos destino (vacía).")
+    parser.add_argument("--sales", type=int, default=defaults.sales)
+    parser.add_argument("--clients", type=int, default=defaults.clients)
+    parser.add_argument("--products", type=int, default=defaults.products)
+    parser.add_argument("--providers-per-product", type=int, default=defaults.providers_per_product)
+    parser.add_argument("--start", type=date.fromisoformat, default=defaults.start, help="Primera fecha (YYYY-MM-DD).")
+    parser.add_argument("--days", type=int, default=defaults.days, help="Días cubiertos por las ventas.")
+    parser.add_argument("--skew", type=float, default=defaults.skew, help="Exponente Zipf de popularidad.")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    args = parser.parse_args(argv)
+    config = GeneratorConfig(
+        sales=args.sales,
+        clients=args.clients,
+        products=args.products,
+        providers_per_product=args.providers_per_product,
+        start=args.start,
+        days=args.days,
+        skew=args.skew,
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+    counts = generate(args.db, config)
+    for table, count in counts.items():
+        print(f"{table}: {count:,}")
+    print(f"Database generated at: {args.db}")
+
+
+if __name__ == "__main__":
+    main()
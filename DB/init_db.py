@@ -2,17 +2,25 @@
 Initialize the SQLite schema used by the inventory and sales application.
 
 The module creates all required base tables plus a reporting view that
-joins sales with clients and products. Run it whenever you need to bootstrap
-or refresh the database structure.
+joins sales with clients and products, the trigger-maintained sales
+rollup tables used by the reports and the FTS5 search indexes over
+productos and clientes. PRAGMA user_version records the schema version
+applied, so ``migrate`` only runs the steps a database is missing and an
+up-to-date database costs a single PRAGMA read at startup.
 """
 from __future__ import annotations
 
 import sqlite3
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable
+
+from DB.connection import apply_persistent_pragmas
 
 DB_PATH = Path(__file__).with_name("app.db")
 
+# Stored in PRAGMA user_version once the schema below has been applied.
+SCHEMA_VERSION = 6
+
 TABLE_DEFINITIONS: dict[str, str] = {
     "usuarios": """
         CREATE TABLE IF NOT EXISTS usuarios (
@@ -64,6 +72,19 @@ TABLE_DEFINITIONS: dict[str, str] = {
                 ON UPDATE CASCADE ON DELETE RESTRICT
         );
     """,
+    "facturas": """
+        CREATE TABLE IF NOT EXISTS facturas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha TEXT NOT NULL,
+            codclie TEXT NOT NULL,
+            subtotal REAL NOT NULL CHECK (subtotal >= 0),
+            vriva REAL NOT NULL DEFAULT 0 CHECK (vriva >= 0),
+            vrtotal REAL NOT NULL CHECK (vrtotal >= 0),
+            FOREIGN KEY (codclie) REFERENCES clientes (codclie)
+                ON UPDATE CASCADE ON DELETE RESTRICT
+        );
+    """,
+    # Cada fila de ventas es una línea; idfactura la agrupa en su factura.
     "ventas": """
         CREATE TABLE IF NOT EXISTS ventas (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -76,14 +97,165 @@ TABLE_DEFINITIONS: dict[str, str] = {
             vriva REAL NOT NULL DEFAULT 0 CHECK (vriva >= 0),
             subtotal REAL NOT NULL CHECK (subtotal >= 0),
             vrtotal REAL NOT NULL CHECK (vrtotal >= 0),
+            idfactura INTEGER REFERENCES facturas (id) ON DELETE CASCADE,
             FOREIGN KEY (codclie) REFERENCES clientes (codclie)
                 ON UPDATE CASCADE ON DELETE RESTRICT,
             FOREIGN KEY (codprod) REFERENCES productos (codprod)
                 ON UPDATE CASCADE ON DELETE RESTRICT
         );
+    """,
+    # Rollups por cliente y periodo mantenidos por TRIGGER_DEFINITIONS.
+    # Guardar el cliente permite contar clientes únicos sin leer ventas.
+    "ventas_resumen_diario": """
+        CREATE TABLE IF NOT EXISTS ventas_resumen_diario (
+            dia TEXT NOT NULL,
+            codclie TEXT NOT NULL,
+            transacciones INTEGER NOT NULL,
+            total REAL NOT NULL,
+            iva REAL NOT NULL,
+            PRIMARY KEY (dia, codclie)
+        ) WITHOUT ROWID;
+    """,
+    "ventas_resumen_mensual": """
+        CREATE TABLE IF NOT EXISTS ventas_resumen_mensual (
+            mes TEXT NOT NULL,
+            codclie TEXT NOT NULL,
+            transacciones INTEGER NOT NULL,
+            total REAL NOT NULL,
+            iva REAL NOT NULL,
+            PRIMARY KEY (mes, codclie)
+        ) WITHOUT ROWID;
+    """,
+}
+
+# (tabla, columna clave, expresión sobre la fila de ventas) de cada rollup.
+ROLLUP_BUCKETS: tuple[tuple[str, str, str], ...] = (
+    ("ventas_resumen_diario", "dia", "date({row}.fecha)"),
+    ("ventas_resumen_mensual", "mes", "strftime('%Y-%m', {row}.fecha)"),
+)
+
+
+def _opens_transaction_sql(row: str, bucket: str, expr: str) -> str:
+    """1 when ``row`` is the only line of its transaction in its rollup bucket, else 0.
+
+    A transaction is a factura (lines sharing idfactura) or a sale without
+    one, so ``transacciones`` counts invoices instead of lines.
     """
+    other = expr.format(row="o")
+    return f"""
+            CASE WHEN {row}.idfactura IS NULL OR NOT EXISTS (
+                SELECT 1 FROM ventas AS o
+                WHERE o.idfactura = {row}.idfactura AND o.id <> {row}.id
+                  AND o.codclie = {row}.codclie AND {other} = {bucket}
+            ) THEN 1 ELSE 0 END"""
+
+
+def _rollup_add_sql(row: str) -> str:
+    statements = []
+    for table, key, expr in ROLLUP_BUCKETS:
+        bucket = expr.format(row=row)
+        statements.append(
+            f"""
+            INSERT INTO {table} ({key}, codclie, transacciones, total, iva)
+            SELECT {bucket}, {row}.codclie, {_opens_transaction_sql(row, bucket, expr)}, {row}.vrtotal, {row}.vriva
+            WHERE {bucket} IS NOT NULL
+            ON CONFLICT ({key}, codclie) DO UPDATE SET
+                transacciones = transacciones + excluded.transacciones,
+                total = total + excluded.total,
+                iva = iva + excluded.iva;
+            """
+        )
+    return "".join(statements)
+
+
+def _rollup_remove_sql(row: str) -> str:
+    statements = []
+    for table, key, expr in ROLLUP_BUCKETS:
+        bucket = expr.format(row=row)
+        statements.append(
+            f"""
+            UPDATE {table}
+            SET transacciones = transacciones - {_opens_transaction_sql(row, bucket, expr)},
+                total = total - {row}.vrtotal,
+                iva = iva - {row}.vriva
+            WHERE {key} = {bucket} AND codclie = {row}.codclie;
+            DELETE FROM {table}
+            WHERE {key} = {bucket} AND codclie = {row}.codclie AND transacciones <= 0;
+            """
+        )
+    return "".join(statements)
+
+
+TRIGGER_DEFINITIONS: dict[str, str] = {
+    "trg_ventas_resumen_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_ventas_resumen_insert
+        AFTER INSERT ON ventas
+        BEGIN
+            {_rollup_add_sql("NEW")}
+        END;
+    """,
+    "trg_ventas_resumen_delete": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_ventas_resumen_delete
+        AFTER DELETE ON ventas
+        BEGIN
+            {_rollup_remove_sql("OLD")}
+        END;
+    """,
+    "trg_ventas_resumen_update": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_ventas_resumen_update
+        AFTER UPDATE OF fecha, codclie, vrtotal, vriva ON ventas
+        BEGIN
+            {_rollup_remove_sql("OLD")}
+            {_rollup_add_sql("NEW")}
+        END;
+    """,
+}
+
+# External-content FTS5 indexes: the text lives only in the base table and
+# the triggers below keep the inverted index in sync. They are keyed by the
+# base table rowid, so run rebuild_search_indexes() after a VACUUM.
+SEARCH_INDEXES: dict[str, tuple[str, tuple[str, ...]]] = {
+    "productos_fts": ("productos", ("nomprod", "descripcion")),
+    "clientes_fts": ("clientes", ("nomclie", "direc", "ciudad")),
 }
 
+
+def _search_definitions(fts_table: str, table: str, columns: tuple[str, ...]) -> list[str]:
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"NEW.{column}" for column in columns)
+    old_values = ", ".join(f"OLD.{column}" for column in columns)
+    delete_old = f"""
+            INSERT INTO {fts_table} ({fts_table}, rowid, {column_list})
+            VALUES ('delete', OLD.rowid, {old_values});"""
+    insert_new = f"""
+            INSERT INTO {fts_table} (rowid, {column_list})
+            VALUES (NEW.rowid, {new_values});"""
+    return [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}
+        USING fts5({column_list}, content='{table}', tokenize='unicode61 remove_diacritics 2');
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_insert
+        AFTER INSERT ON {table}
+        BEGIN{insert_new}
+        END;
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_delete
+        AFTER DELETE ON {table}
+        BEGIN{delete_old}
+        END;
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts_table}_update
+        AFTER UPDATE ON {table}
+        BEGIN{delete_old}{insert_new}
+        END;
+        """,
+    ]
+
+
 VIEW_DEFINITIONS: dict[str, str] = {
     "vw_sales_with_clients": """
         CREATE VIEW IF NOT EXISTS vw_sales_with_clients AS
@@ -110,10 +282,19 @@ INDEX_DEFINITIONS: dict[str, str] = {
         CREATE INDEX IF NOT EXISTS idx_ventas_fecha
         ON ventas (fecha);
     """,
+    # Expression index so `date(fecha) BETWEEN ...` filters are range scans.
+    "idx_ventas_fecha_date": """
+        CREATE INDEX IF NOT EXISTS idx_ventas_fecha_date
+        ON ventas (date(fecha));
+    """,
     "idx_ventas_codclie": """
         CREATE INDEX IF NOT EXISTS idx_ventas_codclie
         ON ventas (codclie);
     """,
+    "idx_ventas_idfactura": """
+        CREATE INDEX IF NOT EXISTS idx_ventas_idfactura
+        ON ventas (idfactura);
+    """,
     "idx_inventarios_stock": """
         CREATE INDEX IF NOT EXISTS idx_inventarios_stock
         ON inventarios (stock_minimo);
@@ -137,14 +318,61 @@ def _column_exists(cursor: sqlite3.Cursor, table: str, column: str) -> bool:
     return any(row[1] == column for row in cursor.fetchall())
 
 
-def _apply_migrations(connection: sqlite3.Connection) -> None:
+def rebuild_sales_rollups(connection: sqlite3.Connection) -> None:
+    """
+    Purpose: Recompute every sales rollup table from the ventas rows.
+    Args:
+        connection: Open SQLite connection; the caller commits.
+    """
+    cursor = connection.cursor()
+    for table, key, expr in ROLLUP_BUCKETS:
+        bucket = expr.format(row="v")
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(
+            f"""
+            INSERT INTO {table} ({key}, codclie, transacciones, total, iva)
+            SELECT {bucket}, v.codclie, COUNT(DISTINCT COALESCE(v.idfactura, -v.id)),
+                   SUM(v.vrtotal), SUM(v.vriva)
+            FROM ventas AS v
+            WHERE {bucket} IS NOT NULL
+            GROUP BY {bucket}, v.codclie
+            """
+        )
+
+
+def rebuild_search_indexes(connection: sqlite3.Connection) -> None:
+    """
+    Purpose: Repopulate every FTS5 search index from its base table.
+    Args:
+        connection: Open SQLite connection; the caller commits.
+    """
+    for fts_table in SEARCH_INDEXES:
+        connection.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+
+def _create_search_indexes(connection: sqlite3.Connection) -> None:
     cursor = connection.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    existing = {row[0] for row in cursor.fetchall()}
+    for fts_table, (table, columns) in SEARCH_INDEXES.items():
+        try:
+            _execute_statements(cursor, _search_definitions(fts_table, table, columns))
+        except sqlite3.OperationalError:
+            # SQLite compilado sin FTS5: las búsquedas usan LIKE (DB/search.py).
+            return
+        if fts_table not in existing:
+            # Índice nuevo sobre una tabla que ya puede tener filas.
+            connection.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
 
-    if _column_exists(cursor, "usuarios", "nomusu") and not _column_exists(cursor, "usuarios", "salt"):
+def _migrate_legacy_columns(connection: sqlite3.Connection) -> None:
+    """Version 1: columns missing from databases created before versioning."""
+    cursor = connection.cursor()
+    if not _column_exists(cursor, "usuarios", "salt"):
         cursor.execute("ALTER TABLE usuarios ADD COLUMN salt TEXT")
         cursor.execute("UPDATE usuarios SET salt = '' WHERE salt IS NULL")
 
-    if _column_exists(cursor, "inventarios", "codprod") and not _column_exists(cursor, "inventarios", "nomprod"):
+    if not _column_exists(cursor, "inventarios", "nomprod"):
         cursor.execute("ALTER TABLE inventarios ADD COLUMN nomprod TEXT")
         cursor.execute(
             """
@@ -157,23 +385,95 @@ def _apply_migrations(connection: sqlite3.Connection) -> None:
         )
 
 
+def _migrate_invoice_column(connection: sqlite3.Connection) -> None:
+    """Version 4: ventas lines point at their facturas header."""
+    cursor = connection.cursor()
+    if not _column_exists(cursor, "ventas", "idfactura"):
+        cursor.execute(
+            "ALTER TABLE ventas ADD COLUMN idfactura INTEGER REFERENCES facturas (id) ON DELETE CASCADE"
+        )
+
+
+def _migrate_invoice_transactions(connection: sqlite3.Connection) -> None:
+    """Version 6: rollups count facturas, not lines, as transactions."""
+    cursor = connection.cursor()
+    for name in TRIGGER_DEFINITIONS:
+        if name.startswith("trg_ventas_resumen_"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    rebuild_sales_rollups(connection)
+
+
+# Data and column changes needed to reach each schema version. New tables,
+# indexes, views and triggers come from the *_DEFINITIONS dictionaries,
+# which are applied with IF NOT EXISTS after the steps have run. Version 2
+# (expression index) and 5 (FTS5 indexes) need no extra step; the rollups
+# of version 3 are filled by step 6, which needs the column of step 4.
+MIGRATIONS: dict[int, Callable[[sqlite3.Connection], None]] = {
+    1: _migrate_legacy_columns,
+    4: _migrate_invoice_column,
+    6: _migrate_invoice_transactions,  # los triggers nuevos se crean después
+}
+
+
+def apply_definitions(connection: sqlite3.Connection) -> None:
+    """
+    Purpose: Create any missing index, view, trigger and search index.
+    Args:
+        connection: Open SQLite connection; the caller commits.
+    """
+    cursor = connection.cursor()
+    _execute_statements(cursor, INDEX_DEFINITIONS.values())
+    _execute_statements(cursor, VIEW_DEFINITIONS.values())
+    _execute_statements(cursor, TRIGGER_DEFINITIONS.values())
+    _create_search_indexes(connection)
+
+
+def migrate(connection: sqlite3.Connection) -> int:
+    """
+    Purpose: Bring the schema up to SCHEMA_VERSION in a single transaction.
+    Args:
+        connection: Open SQLite connection with no transaction in progress.
+    Returns:
+        The user_version found before migrating. When it already equals
+        SCHEMA_VERSION nothing else is executed.
+    """
+    from_version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if from_version >= SCHEMA_VERSION:
+        return from_version
+    cursor = connection.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # Otro proceso pudo migrar mientras esperábamos el bloqueo.
+        from_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if from_version >= SCHEMA_VERSION:
+            connection.commit()
+            return from_version
+        _execute_statements(cursor, TABLE_DEFINITIONS.values())
+        for version in range(from_version + 1, SCHEMA_VERSION + 1):
+            step = MIGRATIONS.get(version)
+            if step is not None:
+                step(connection)
+        apply_definitions(connection)
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    return from_version
+
+
 def initialize_database(db_path: Path = DB_PATH) -> None:
     """
-    Purpose: Create all mandatory tables, indexes, and views for the project.
+    Purpose: Create or upgrade the tables, indexes, and views for the project,
+        and store the profile's journal_mode in the file once.
     Args:
         db_path: Optional override for the SQLite database path.
     """
-    connection = sqlite3.connect(db_path)
+    connection = sqlite3.connect(db_path, isolation_level=None)
     try:
         connection.execute("PRAGMA foreign_keys = ON;")
-        cursor = connection.cursor()
-
-        _execute_statements(cursor, TABLE_DEFINITIONS.values())
-        _execute_statements(cursor, INDEX_DEFINITIONS.values())
-        _execute_statements(cursor, VIEW_DEFINITIONS.values())
-        _apply_migrations(connection)
-
-        connection.commit()
+        apply_persistent_pragmas(connection)
+        migrate(connection)
     finally:
         connection.close()
 
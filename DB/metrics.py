@@ -0,0 +1,321 @@
+"""Prometheus-style metrics for the Modules services.
+
+``METRICS`` is a small in-process registry of counters and histograms that
+renders the Prometheus text exposition format (version 0.0.4). Services
+report to it through ``InstrumentedService`` (a mixin that wraps the
+public methods of every CRUD class) or the ``instrumented`` decorator (for
+the function-style helpers in Modules/Custumers.py). Each call records:
+
+* ``python_bd_operations_total{module, operation, outcome}``; outcome is
+  "ok", "rejected" (a ``(False, msg)`` result), "denied" or "error";
+* ``python_bd_operation_duration_seconds{module, operation}`` histogram;
+* ``python_bd_authorization_denials_total{module, operation}``, counted
+  when the service's ``_authorize`` refuses the caller;
+* ``python_bd_fk_validation_failures_total{module, operation}``, counted
+  when a result reports a missing "asociado" (related) row.
+
+``DB.connection.get_connection`` increments
+``python_bd_connections_opened_total``. ``start_metrics_server`` serves
+``GET /metrics`` from a daemon thread; ``Main.py`` starts it when
+``PYTHON_BD_METRICS_PORT`` is set. A call costs two ``perf_counter``
+reads and a few dict updates under a lock, so it is left on all the time.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import math
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterable, Optional
+
+METRICS_PORT_ENV_VAR_NAME = "PYTHON_BD_METRICS_PORT"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FK_FAILURE_MARKER = "asociado no existe"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _labels(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter keyed by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{self._labels(labels)} {_format_value(value)}" for labels, value in items]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram keyed by label values (seconds)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels -> [count per bucket..., sum, count]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return series[-1] if series else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        lines = self.header()
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{self._labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+OPERATIONS = METRICS.counter(
+    "python_bd_operations_total", "Service calls by outcome.", ("module", "operation", "outcome")
+)
+OPERATION_SECONDS = METRICS.histogram(
+    "python_bd_operation_duration_seconds", "Service call latency in seconds.", ("module", "operation")
+)
+AUTHORIZATION_DENIALS = METRICS.counter(
+    "python_bd_authorization_denials_total", "Calls refused by the level check.", ("module", "operation")
+)
+FK_FAILURES = METRICS.counter(
+    "python_bd_fk_validation_failures_total", "Writes rejected because a related row is missing.", ("module", "operation")
+)
+CONNECTIONS_OPENED = METRICS.counter("python_bd_connections_opened_total", "SQLite connections opened.")
+
+_context = threading.local()
+
+
+def _call_stack() -> list:
+    stack = getattr(_context, "stack", None)
+    if stack is None:
+        stack = _context.stack = []
+    return stack
+
+
+def record_denial(module: str) -> None:
+    """Count an authorization denial against the operation currently running."""
+    stack = _call_stack()
+    operation = stack[-1][0] if stack else "unknown"
+    if stack:
+        stack[-1][1] = True
+    AUTHORIZATION_DENIALS.inc(module, operation)
+
+
+def _outcome(module: str, operation: str, result: Any, denied: bool) -> str:
+    if denied:
+        return "denied"
+    if isinstance(result, tuple) and len(result) == 2 and not result[0] and isinstance(result[1], str):
+        if FK_FAILURE_MARKER in result[1]:
+            FK_FAILURES.inc(module, operation)
+        return "rejected"
+    return "ok"
+
+
+def instrumented(module: str, operation: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorator recording calls, outcome and latency of a service function."""
+
+    def decorate(func: Callable) -> Callable:
+        name = operation or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            stack = _call_stack()
+            frame = [name, False]
+            stack.append(frame)
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                OPERATIONS.inc(module, name, "error")
+                raise
+            else:
+                OPERATIONS.inc(module, name, _outcome(module, name, result, frame[1]))
+                return result
+            finally:
+                OPERATION_SECONDS.observe(time.perf_counter() - started, module, name)
+                stack.pop()
+
+        return wrapper
+
+    return decorate
+
+
+def _denial_recording(module: str, authorize: Callable) -> Callable:
+    @functools.wraps(authorize)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = authorize(*args, **kwargs)
+        if not result[0]:
+            record_denial(module)
+        return result
+
+    return wrapper
+
+
+class InstrumentedService:
+    """
+    Mixin that instruments every public method of a CRUD class.
+
+    Subclasses set ``metrics_module`` (the table name). Generator methods
+    are left alone because timing them would only measure their creation.
+    An ``_authorize`` method is wrapped to count denials.
+    """
+
+    metrics_module = "unknown"
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        module = cls.metrics_module
+        for name, attribute in list(vars(cls).items()):
+            if not inspect.isfunction(attribute) or inspect.isgeneratorfunction(attribute):
+                continue
+            if name == "_authorize":
+                setattr(cls, name, _denial_recording(module, attribute))
+            elif not name.startswith("_"):
+                setattr(cls, name, instrumented(module)(attribute))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = METRICS
+
+    def do_GET(self) -> None:  # noqa: N802 (API de http.server)
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def start_metrics_server(
+    port: int,
+    host: str = "127.0.0.1",
+    registry: MetricsRegistry = METRICS,
+) -> ThreadingHTTPServer:
+    """
+    Purpose: Serve ``GET /metrics`` from a daemon thread.
+    Args:
+        port: TCP port (0 picks a free one; see ``server.server_address``).
+        host: Interface to bind; local-only by default.
+        registry: Registry to expose.
+    Returns:
+        The running server; call ``shutdown()`` to stop it.
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,50 @@
+"""Keyset pagination for the listing windows.
+
+A page is read with ``WHERE key > :after ORDER BY key LIMIT :limit + 1``:
+the extra row only tells whether another page exists, so every page costs
+one index range scan no matter how deep the user has scrolled. The return
+shape ``(rows, next_token)`` is the page loader contract of
+``GUI/virtual_list.py`` (``next_token`` is None after the last page).
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, List, Optional, Sequence
+
+
+def keyset_page(
+    connection: sqlite3.Connection,
+    table: str,
+    columns: Sequence[str],
+    key: str,
+    after: Optional[Any] = None,
+    limit: int = 100,
+) -> tuple[List[dict], Optional[Any]]:
+    """
+    Purpose: Return one page of ``table`` ordered by its unique ``key`` column.
+    Args:
+        connection: Open SQLite connection.
+        table: Table name (a constant of the calling service, never user input).
+        columns: Columns to return; must include ``key``.
+        key: Unique column the listing is ordered by.
+        after: Token returned by the previous page; None for the first page.
+        limit: Maximum number of rows; must be at least 1.
+    Returns:
+        (rows, next_token): row dicts and the ``key`` of the last row, or
+        None as token once the last page has been returned.
+    """
+    if limit < 1:
+        raise ValueError("El tamaño de página (limit) debe ser al menos 1.")
+    where = "" if after is None else f"WHERE {key} > ?"
+    params: list[Any] = [] if after is None else [after]
+    cursor = connection.cursor()
+    cursor.execute(
+        f"SELECT {', '.join(columns)} FROM {table} {where} ORDER BY {key} LIMIT ?",
+        params + [limit + 1],
+    )
+    rows = cursor.fetchall()
+    names = [desc[0] for desc in cursor.description]
+    page = [dict(zip(names, row)) for row in rows[:limit]]
+    next_token = page[-1][key] if len(rows) > limit else None
+    return page, next_token
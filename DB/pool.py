@@ -0,0 +1,225 @@
+"""Bounded, thread-aware pool of SQLite connections.
+
+A ``ConnectionPool`` instance is callable, so it can be passed wherever the
+CRUD classes expect a ``connection_factory``::
+
+    pool = ConnectionPool(max_size=4)
+    sales = SalesCRUD(pool)
+
+The CRUD methods keep calling ``conn.close()`` in their ``finally`` blocks;
+for pooled connections that call returns the connection to the pool instead
+of closing it. Inside ``unit_of_work()`` the pool hands out the unit's
+connection, exactly like ``get_connection``.
+
+``APP_POOL`` is the process-wide pool the GUI windows build their services
+on; nothing is opened until the first checkout.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from DB.connection import _ACTIVE_UNIT, _open_connection, _resolve_db_path
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection becomes available before the timeout."""
+
+
+class _PoolEntry:
+    """Bookkeeping for a physical connection owned by the pool."""
+
+    __slots__ = ("raw", "db_path", "owner", "last_used")
+
+    def __init__(self, raw: sqlite3.Connection, db_path: str) -> None:
+        self.raw = raw
+        self.db_path = db_path
+        self.owner: Optional[int] = None
+        self.last_used = time.monotonic()
+
+
+class PooledConnection:
+    """Proxy around a pooled sqlite3.Connection; ``close`` releases it."""
+
+    def __init__(self, pool: "ConnectionPool", entry: _PoolEntry) -> None:
+        self._pool = pool
+        self._entry: Optional[_PoolEntry] = entry
+
+    def __getattr__(self, name: str):
+        if self._entry is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a released pooled connection.")
+        return getattr(self._entry.raw, name)
+
+    def __enter__(self):
+        return self._entry.raw.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._entry.raw.__exit__(exc_type, exc, tb)
+
+    @property
+    def closed(self) -> bool:
+        return self._entry is None
+
+    def close(self) -> None:
+        """Hand the connection back to the pool. Safe to call twice."""
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry)
+
+
+class ConnectionPool:
+    """Keep up to ``max_size`` open connections and reuse them across calls.
+
+    Each thread prefers the connection it used last (thread affinity), falls
+    back to any idle connection, and opens a new one while the pool is below
+    ``max_size``. Idle connections are pinged before reuse when they have
+    been idle longer than ``health_check_interval`` seconds, and are replaced
+    if the ping fails or the configured database path changed.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 5,
+        connect: Optional[Callable[[], sqlite3.Connection]] = None,
+        timeout: float = 5.0,
+        health_check_interval: float = 30.0,
+        profile: Optional[str] = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._connect = connect or (lambda: _open_connection(check_same_thread=False, profile=profile))
+        self._lock = threading.Condition()
+        self._idle: list[_PoolEntry] = []
+        self._size = 0
+        self._closed = False
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "waits": 0}
+
+    def __call__(self) -> PooledConnection:
+        """Check out a connection (the unit's one inside a unit of work); the caller must ``close()`` it."""
+        return self.acquire()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """Context-manager checkout that always releases the connection."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        unit = getattr(_ACTIVE_UNIT, "current", None)
+        if unit is not None:
+            return unit()
+        thread_id = threading.get_ident()
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed.")
+                entry = self._take_idle(thread_id)
+                if entry is not None:
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    entry = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No pooled connection available after {self.timeout:.1f}s."
+                    )
+                self.stats["waits"] += 1
+                self._lock.wait(remaining)
+
+        replaced = entry is not None and not self._is_healthy(entry)
+        if replaced:
+            # Keep the slot reserved and replace the physical connection.
+            self._close_quietly(entry)
+            entry = None
+
+        created = entry is None
+        if created:
+            try:
+                entry = _PoolEntry(self._connect(), _resolve_db_path())
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                    if replaced:
+                        self.stats["discarded"] += 1
+                    self._lock.notify()
+                raise
+        with self._lock:
+            if replaced:
+                self.stats["discarded"] += 1
+            self.stats["created" if created else "reused"] += 1
+        entry.owner = thread_id
+        return PooledConnection(self, entry)
+
+    def close(self) -> None:
+        """Close every idle connection and refuse further checkouts."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for entry in idle:
+            entry.raw.close()
+
+    def _take_idle(self, thread_id: int) -> Optional[_PoolEntry]:
+        for index, entry in enumerate(self._idle):
+            if entry.owner == thread_id:
+                return self._idle.pop(index)
+        if self._idle:
+            return self._idle.pop()
+        return None
+
+    def _is_healthy(self, entry: _PoolEntry) -> bool:
+        if entry.db_path != _resolve_db_path():
+            return False
+        if time.monotonic() - entry.last_used < self.health_check_interval:
+            return True
+        try:
+            entry.raw.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _close_quietly(self, entry: _PoolEntry) -> None:
+        try:
+            entry.raw.close()
+        except sqlite3.Error:
+            pass
+
+    def _discard(self, entry: _PoolEntry) -> None:
+        self._close_quietly(entry)
+        with self._lock:
+            self._size -= 1
+            self.stats["discarded"] += 1
+            self._lock.notify()
+
+    def _release(self, entry: _PoolEntry) -> None:
+        try:
+            if entry.raw.in_transaction:
+                entry.raw.rollback()
+        except sqlite3.Error:
+            self._discard(entry)
+            return
+        entry.last_used = time.monotonic()
+        with self._lock:
+            if self._closed:
+                self._size -= 1
+                entry.raw.close()
+                return
+            self._idle.append(entry)
+            self._lock.notify()
+
+
+APP_POOL = ConnectionPool()
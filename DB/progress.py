@@ -0,0 +1,152 @@
+"""Cancellation, progress and time budgets for long-running report queries.
+
+``QueryControl`` installs a SQLite progress handler on the connection a
+report uses. The handler runs every ``interval`` virtual-machine steps; it
+records progress and aborts the statement once ``cancel()`` has been called
+from another thread or the time budget is spent. The report method then
+raises ``QueryInterrupted``; ``QueryControl.run`` turns that into a
+``QueryOutcome`` whose ``status`` is "ok", "cancelled" or "timeout".
+
+The default budget comes from ``PYTHON_BD_REPORT_BUDGET`` (seconds, 0 or
+empty for none); a value that is not a number keeps the built-in default.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+BUDGET_ENV_VAR_NAME = "PYTHON_BD_REPORT_BUDGET"
+DEFAULT_TIME_BUDGET = 30.0
+PROGRESS_INTERVAL = 10_000
+
+
+def default_time_budget() -> Optional[float]:
+    """Return the report time budget in seconds from the environment, or the default."""
+    raw = os.getenv(BUDGET_ENV_VAR_NAME)
+    if raw is None:
+        return DEFAULT_TIME_BUDGET
+    try:
+        budget = float(raw) if raw.strip() else 0.0
+    except ValueError:
+        return DEFAULT_TIME_BUDGET
+    return budget if budget > 0 else None
+
+
+class QueryInterrupted(sqlite3.OperationalError):
+    """Raised by a report method when its QueryControl aborted the statement."""
+
+    def __init__(self, status: str, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class QueryOutcome:
+    """Result of ``QueryControl.run``: rows plus how the query ended."""
+
+    status: str
+    rows: list = field(default_factory=list)
+    elapsed: float = 0.0
+    message: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+class QueryControl:
+    """Cancel token, progress counter and time budget for one report query."""
+
+    def __init__(
+        self,
+        time_budget: Optional[float] = None,
+        interval: int = PROGRESS_INTERVAL,
+    ) -> None:
+        self.time_budget = time_budget
+        self.interval = interval
+        self.steps = 0
+        self.status = "pending"
+        self._started: Optional[float] = None
+        self._cancel = threading.Event()
+
+    @classmethod
+    def with_default_budget(cls) -> "QueryControl":
+        return cls(time_budget=default_time_budget())
+
+    def cancel(self) -> None:
+        """Ask the running statement to stop; safe to call from any thread."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        return 0.0 if self._started is None else time.perf_counter() - self._started
+
+    def _on_progress(self) -> int:
+        self.steps += self.interval
+        if self._cancel.is_set():
+            self.status = "cancelled"
+            return 1
+        if self.time_budget is not None and self.elapsed > self.time_budget:
+            self.status = "timeout"
+            return 1
+        return 0
+
+    def message(self) -> str:
+        if self.status == "cancelled":
+            return "Consulta cancelada por el usuario."
+        if self.status == "timeout":
+            return f"La consulta superó el tiempo máximo de {self.time_budget:g} s."
+        return ""
+
+    @contextmanager
+    def watch(self, connection: sqlite3.Connection) -> Iterator[None]:
+        """Install the progress handler on ``connection`` for the duration of the block."""
+        if self._cancel.is_set():
+            self.status = "cancelled"
+            raise QueryInterrupted(self.status, self.message())
+        self._started = time.perf_counter()
+        self.status = "running"
+        connection.set_progress_handler(self._on_progress, self.interval)
+        try:
+            yield
+        except sqlite3.OperationalError as exc:
+            if self.status in ("cancelled", "timeout"):
+                raise QueryInterrupted(self.status, self.message()) from exc
+            raise
+        finally:
+            connection.set_progress_handler(None, 0)
+        self.status = "ok"
+
+    def run(self, report: Callable[..., list], *args: Any, **kwargs: Any) -> QueryOutcome:
+        """
+        Purpose: Call a report method with ``control=self`` and capture how it ended.
+        Args:
+            report: Method accepting a ``control`` keyword (e.g. SalesCRUD.summarize_sales).
+        Returns:
+            QueryOutcome with status "ok", "cancelled" or "timeout".
+        """
+        try:
+            rows = report(*args, control=self, **kwargs)
+        except QueryInterrupted as exc:
+            return QueryOutcome(exc.status, [], self.elapsed, str(exc))
+        return QueryOutcome("ok", rows, self.elapsed)
+
+
+@contextmanager
+def watch_query(control: Optional[QueryControl], connection: sqlite3.Connection) -> Iterator[None]:
+    """``control.watch(connection)``, or a no-op when no control was given."""
+    if control is None:
+        yield
+    else:
+        with control.watch(connection):
+            yield
@@ -0,0 +1,68 @@
+"""Process-wide registry that checks the schema without DDL on hot paths.
+
+The CRUD modules used to run ``CREATE TABLE IF NOT EXISTS`` on every call.
+``migrate`` writes ``PRAGMA user_version`` in the same transaction that
+creates the tables, so a current user_version proves the whole schema is
+there. Reading it is a header lookup on the connection actually in use,
+which stays correct for custom connection factories and for database files
+recreated at the same path. Only databases behind SCHEMA_VERSION fall back
+to the ``sqlite_master`` lookup.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Optional
+
+from DB.connection import get_connection
+from DB.init_db import SCHEMA_VERSION, TABLE_DEFINITIONS
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """Raised when the database schema is older than the application expects."""
+
+
+def _is_current(cursor: sqlite3.Cursor) -> bool:
+    return cursor.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION
+
+
+class SchemaRegistry:
+    """Schema checks answered by the connection they run on, never by a path."""
+
+    def ensure_table(self, cursor: sqlite3.Cursor, table: str) -> None:
+        """Create ``table`` from TABLE_DEFINITIONS unless the schema is current."""
+        if _is_current(cursor):
+            return
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        if cursor.fetchone() is None:
+            cursor.execute(TABLE_DEFINITIONS[table])
+
+    def verify(self, connection: Optional[sqlite3.Connection] = None) -> None:
+        """
+        Purpose: Fail fast when the database schema is missing or outdated.
+        Args:
+            connection: Optional open connection; a new one is used otherwise.
+        Raises:
+            SchemaOutOfDateError: If user_version or the table set is behind.
+        """
+        conn = connection or get_connection()
+        try:
+            cursor = conn.cursor()
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                return
+            existing = {
+                row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+        finally:
+            if connection is None:
+                conn.close()
+        missing = sorted(set(TABLE_DEFINITIONS) - existing)
+        if missing:
+            raise SchemaOutOfDateError(f"Faltan tablas en la base de datos: {', '.join(missing)}.")
+        raise SchemaOutOfDateError(
+            f"Esquema en versión {version}; se requiere {SCHEMA_VERSION}. Ejecute DB/init_db.py."
+        )
+
+
+SCHEMA_REGISTRY = SchemaRegistry()
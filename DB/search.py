@@ -0,0 +1,96 @@
+"""Ranked full-text search over the FTS5 indexes created by DB/init_db.py.
+
+User input is split into words and every word becomes a quoted prefix term,
+so ``"lap gam"`` finds "Laptop Gamer" and FTS5 operators typed by the user
+are treated as plain text. Results are ordered by bm25 with the first
+indexed column (the name) weighted higher than the rest. When SQLite was
+built without FTS5 the same search runs as a LIKE scan over the base table.
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+from typing import List, Sequence
+
+from DB.init_db import SEARCH_INDEXES
+
+# Peso bm25 de la primera columna indexada (el nombre) frente a las demás.
+NAME_WEIGHT = 10.0
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def match_expression(query: str) -> str:
+    """Turn free text into an FTS5 query of quoted prefix terms ("" if empty)."""
+    return " ".join(f'"{word}"*' for word in _WORD.findall(query))
+
+
+def search(
+    connection: sqlite3.Connection,
+    fts_table: str,
+    select_columns: Sequence[str],
+    query: str,
+    limit: int = 50,
+) -> List[dict]:
+    """
+    Purpose: Return the rows of the base table best matching ``query``.
+    Args:
+        connection: Open SQLite connection.
+        fts_table: Key of SEARCH_INDEXES (e.g. "productos_fts").
+        select_columns: Base-table columns to return for every match.
+        query: Free text typed by the user.
+        limit: Maximum number of rows.
+    Returns:
+        List of row dicts, best match first; empty for a blank query.
+    """
+    table, columns = SEARCH_INDEXES[fts_table]
+    expression = match_expression(query)
+    if not expression:
+        return []
+    selected = ", ".join(f"t.{column}" for column in select_columns)
+    weights = ", ".join([str(NAME_WEIGHT)] + ["1.0"] * (len(columns) - 1))
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            f"""
+            SELECT {selected}
+            FROM {fts_table}
+            JOIN {table} AS t ON t.rowid = {fts_table}.rowid
+            WHERE {fts_table} MATCH ?
+            ORDER BY bm25({fts_table}, {weights})
+            LIMIT ?
+            """,
+            (expression, limit),
+        )
+    except sqlite3.OperationalError as exc:
+        if "no such table" not in str(exc):
+            raise
+        return _like_search(cursor, table, columns, select_columns, query, limit)
+    names = [desc[0] for desc in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def _like_search(
+    cursor: sqlite3.Cursor,
+    table: str,
+    columns: Sequence[str],
+    select_columns: Sequence[str],
+    query: str,
+    limit: int,
+) -> List[dict]:
+    words = _WORD.findall(query)
+    haystack = " || ' ' || ".join(columns)
+    conditions = " AND ".join(f"({haystack}) LIKE ?" for _ in words)
+    cursor.execute(
+        f"""
+        SELECT {", ".join(select_columns)}
+        FROM {table}
+        WHERE {conditions}
+        ORDER BY {columns[0]}
+        LIMIT ?
+        """,
+        [f"%{word}%" for word in words] + [limit],
+    )
+    names = [desc[0] for desc in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
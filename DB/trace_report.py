@@ -0,0 +1,29 @@
+"""
+Print a SQL trace dump written via PYTHON_BD_TRACE_DUMP or QueryTracer.dump.
+
+Usage:
+    python -m DB.trace_report trace.json --sort p95_ms --limit 30
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Optional
+
+from DB.tracing import format_report
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """CLI entry point for the trace dump report."""
+    parser = argparse.ArgumentParser(description="Muestra las estadísticas de un volcado de trazas SQL.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--sort", default="total_ms", choices=["total_ms", "calls", "mean_ms", "p95_ms", "max_ms"])
+    args = parser.parse_args(argv)
+    data = json.loads(args.path.read_text(encoding="utf-8"))
+    print(format_report(data, args.limit, args.sort))
+
+
+if __name__ == "__main__":
+    main()
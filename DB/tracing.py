@@ -0,0 +1,415 @@
+"""Opt-in SQL statement tracing, latency histograms and a slow-query log.
+
+With ``PYTHON_BD_TRACE=1`` (or ``QUERY_TRACER.enable()``) every connection
+opened by ``DB.connection.get_connection`` is a ``TracedConnection``:
+
+* ``TracedCursor`` counts and times execute plus the fetches that follow
+  it and adds the duration to a per-statement histogram;
+* ``set_trace_callback`` counts the statements that bypass the cursor
+  (``executescript``, statements run by the sqlite3 module itself). It is
+  muted while a cursor call runs because CPython reports the outer
+  statement again each time a trigger program starts.
+
+Statements are grouped by their normalized text (literals replaced by
+``?``), so the expanded SQL from the trace callback and the parameterized
+SQL from the cursor land on the same entry. Executions slower than
+``PYTHON_BD_SLOW_QUERY_MS`` (default used when it is not a number) are kept in a bounded slow-query log together
+with their ``EXPLAIN QUERY PLAN`` (and appended as JSON lines to
+``PYTHON_BD_SLOW_QUERY_LOG`` when set).
+
+``QUERY_TRACER.snapshot()`` and ``format_stats()`` expose the aggregates;
+``PYTHON_BD_TRACE_DUMP`` writes them to JSON at exit and
+``python -m DB.trace_report <file>`` prints a saved dump.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+TRACE_ENV_VAR_NAME = "PYTHON_BD_TRACE"
+SLOW_QUERY_ENV_VAR_NAME = "PYTHON_BD_SLOW_QUERY_MS"
+SLOW_QUERY_LOG_ENV_VAR_NAME = "PYTHON_BD_SLOW_QUERY_LOG"
+TRACE_DUMP_ENV_VAR_NAME = "PYTHON_BD_TRACE_DUMP"
+DEFAULT_SLOW_QUERY_MS = 100.0
+SLOW_LOG_SIZE = 200
+# Upper bounds (ms) of the latency histogram buckets.
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, math.inf)
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_BLOB_LITERAL = re.compile(r"\b[xX]\?")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.])")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(sql: str) -> str:
+    """Return ``sql`` with literals replaced by ``?`` and whitespace collapsed."""
+    text = _STRING_LITERAL.sub("?", sql)
+    text = _BLOB_LITERAL.sub("?", text)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _IN_LIST.sub("IN (?)", text)
+    return _WHITESPACE.sub(" ", text).strip().rstrip(";").strip()
+
+
+class StatementStats:
+    """Call count, total time and latency histogram for one normalized statement."""
+
+    __slots__ = ("calls", "timed", "total", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.timed = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(HISTOGRAM_BOUNDS_MS)
+
+    def add(self, elapsed_ms: float) -> None:
+        self.timed += 1
+        self.total += elapsed_ms
+        self.max = max(self.max, elapsed_ms)
+        self.buckets[bisect_left(HISTOGRAM_BOUNDS_MS, elapsed_ms)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (capped at ``max``)."""
+        if not self.timed:
+            return 0.0
+        rank = q * self.timed
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "timed": self.timed,
+            "total_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.timed, 3) if self.timed else 0.0,
+            "max_ms": round(self.max, 3),
+            "p50_ms": round(self.quantile(0.50), 3),
+            "p95_ms": round(self.quantile(0.95), 3),
+            "p99_ms": round(self.quantile(0.99), 3),
+            "histogram": {
+                ("inf" if math.isinf(bound) else f"{bound:g}"): count
+                for bound, count in zip(HISTOGRAM_BOUNDS_MS, self.buckets)
+                if count
+            },
+        }
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    """One execution slower than the threshold, with its query plan."""
+
+    sql: str
+    params: str
+    elapsed_ms: float
+    plan: tuple[str, ...]
+    at: str
+
+
+def _explain(connection: sqlite3.Connection, sql: str, params: Any) -> tuple[str, ...]:
+    if params is None or not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return ()
+    try:
+        # Cursor base: el EXPLAIN no debe volver a registrarse.
+        rows = sqlite3.Cursor(connection).execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    except sqlite3.Error:
+        return ()
+    depth: dict[int, int] = {}
+    plan = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        plan.append("  " * depth[node_id] + detail)
+    return tuple(plan)
+
+
+class QueryTracer:
+    """Process-wide aggregate of traced statements."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        slow_threshold_ms: float = DEFAULT_SLOW_QUERY_MS,
+        slow_log_path: Optional[str] = None,
+    ) -> None:
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms
+        self.slow_log_path = slow_log_path
+        self._stats: dict[str, StatementStats] = {}
+        self._slow: deque[SlowQuery] = deque(maxlen=SLOW_LOG_SIZE)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> "QueryTracer":
+        enabled = os.getenv(TRACE_ENV_VAR_NAME, "").strip().lower() in ("1", "true", "yes", "on")
+        raw_threshold = os.getenv(SLOW_QUERY_ENV_VAR_NAME, "").strip()
+        try:
+            slow_threshold_ms = float(raw_threshold) if raw_threshold else DEFAULT_SLOW_QUERY_MS
+        except ValueError:
+            # Se evalúa al importar DB.connection: un valor mal escrito no debe impedir arrancar.
+            slow_threshold_ms = DEFAULT_SLOW_QUERY_MS
+        tracer = cls(
+            enabled=enabled,
+            slow_threshold_ms=slow_threshold_ms,
+            slow_log_path=os.getenv(SLOW_QUERY_LOG_ENV_VAR_NAME) or None,
+        )
+        dump_path = os.getenv(TRACE_DUMP_ENV_VAR_NAME)
+        if enabled and dump_path:
+            atexit.register(tracer.dump, dump_path)
+        return tracer
+
+    def enable(self, slow_threshold_ms: Optional[float] = None) -> None:
+        """Trace connections opened from now on."""
+        if slow_threshold_ms is not None:
+            self.slow_threshold_ms = slow_threshold_ms
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+    def attach(self, connection: sqlite3.Connection) -> None:
+        """Install the trace callback on ``connection``."""
+        connection.set_trace_callback(self.on_statement)
+
+    def _entry(self, sql: str) -> StatementStats:
+        key = normalize_sql(sql)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = StatementStats()
+        return stats
+
+    def on_statement(self, sql: str) -> None:
+        """Trace callback: count one statement execution as seen by SQLite."""
+        if getattr(self._local, "in_cursor", False) or sql.startswith("EXPLAIN QUERY PLAN"):
+            return
+        with self._lock:
+            self._entry(sql).calls += 1
+
+    def record(
+        self,
+        connection: sqlite3.Connection,
+        sql: str,
+        params: Any,
+        elapsed: float,
+        calls: int = 1,
+    ) -> None:
+        """Add one timed cursor call; log it with its plan when it is slow."""
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            stats = self._entry(sql)
+            stats.calls += calls
+            stats.add(elapsed_ms)
+        if elapsed_ms < self.slow_threshold_ms:
+            return
+        entry = SlowQuery(
+            sql=normalize_sql(sql),
+            params=repr(params)[:500],
+            elapsed_ms=round(elapsed_ms, 3),
+            plan=_explain(connection, sql, params),
+            at=datetime.now().isoformat(timespec="milliseconds"),
+        )
+        with self._lock:
+            self._slow.append(entry)
+        if self.slow_log_path:
+            with open(self.slow_log_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Return the aggregates keyed by normalized statement."""
+        with self._lock:
+            return {sql: stats.as_dict() for sql, stats in self._stats.items()}
+
+    def slow_queries(self) -> list[SlowQuery]:
+        with self._lock:
+            return list(self._slow)
+
+    def dump(self, path: str) -> None:
+        """Write the aggregates and the slow-query log to ``path`` as JSON."""
+        report = {
+            "slow_threshold_ms": self.slow_threshold_ms,
+            "statements": self.snapshot(),
+            "slow_queries": [asdict(entry) for entry in self.slow_queries()],
+        }
+        Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    def format_stats(self, limit: int = 20, sort: str = "total_ms") -> str:
+        return format_report({"statements": self.snapshot(), "slow_queries": []}, limit, sort)
+
+
+def format_report(report: dict[str, Any], limit: int = 20, sort: str = "total_ms") -> str:
+    """Render a snapshot or a dump as a plain-text table, slowest first."""
+    rows = sorted(report.get("statements", {}).items(), key=lambda item: item[1].get(sort, 0), reverse=True)
+    lines = [f"{'calls':>8}{'total ms':>12}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}  statement"]
+    for sql, stats in rows[:limit]:
+        lines.append(
+            f"{stats['calls']:>8}{stats['total_ms']:>12.1f}{stats['mean_ms']:>10.3f}"
+            f"{stats['p95_ms']:>10.3f}{stats['max_ms']:>10.3f}  {sql[:120]}"
+        )
+    slow = report.get("slow_queries", [])
+    if slow:
+        lines.append("")
+        lines.append(f"Consultas lentas ({len(slow)}):")
+        for entry in slow[-limit:]:
+            lines.append(f"[{entry['at']}] {entry['elapsed_ms']:.1f} ms  {entry['sql'][:120]}")
+            lines.extend(f"    {step}" for step in entry["plan"])
+    return "\n".join(lines)
+
+
+QUERY_TRACER = QueryTracer.from_env()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that times each statement from execute through its last fetch."""
+
+    _pending: Optional[list] = None
+
+    def _finish(self) -> None:
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            self.connection.tracer.record(self.connection, *pending)
+
+    def _add(self, started: float) -> None:
+        if self._pending is not None:
+            self._pending[2] += time.perf_counter() - started
+
+    def execute(self, sql: str, parameters: Any = ()) -> "TracedCursor":
+        self._finish()
+        local = self.connection.tracer._local
+        local.in_cursor = True
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending = [sql, parameters, time.perf_counter() - started]
+            local.in_cursor = False
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "TracedCursor":
+        self._finish()
+        local = self.connection.tracer._local
+        calls = 0
+
+        def counted() -> Any:
+            nonlocal calls
+            for parameters in seq_of_parameters:
+                calls += 1
+                yield parameters
+
+        local.in_cursor = True
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, counted())
+        finally:
+            self._pending = [sql, None, time.perf_counter() - started, calls]
+            local.in_cursor = False
+            self._finish()
+
+    def fetchone(self) -> Any:
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._add(started)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> list:
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._add(started)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self) -> list:
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._add(started)
+        self._finish()
+        return rows
+
+    def __next__(self) -> Any:
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add(started)
+            self._finish()
+            raise
+        self._add(started)
+        return row
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def __del__(self) -> None:
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors are ``TracedCursor`` and whose statements are traced."""
+
+    tracer: QueryTracer = QUERY_TRACER
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._cursors: "weakref.WeakSet[TracedCursor]" = weakref.WeakSet()
+        self.tracer.attach(self)
+
+    def cursor(self, factory: type = TracedCursor) -> sqlite3.Cursor:
+        cursor = super().cursor(factory)
+        if isinstance(cursor, TracedCursor):
+            self._cursors.add(cursor)
+        return cursor
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def _finish_cursors(self) -> None:
+        for cursor in list(self._cursors):
+            cursor._finish()
+
+    def commit(self) -> None:
+        self._finish_cursors()
+        super().commit()
+
+    def rollback(self) -> None:
+        self._finish_cursors()
+        super().rollback()
+
+    def close(self) -> None:
+        self._finish_cursors()
+        super().close()
+
@@ -0,0 +1,266 @@
+"""Unit of work: one connection and one transaction across many CRUD calls.
+
+Inside ``with unit_of_work():`` every ``get_connection()`` made on the
+same thread (the default ``connection_factory`` of the CRUD classes and
+the function-style helpers) returns a handle on the unit's connection
+instead of opening a new one::
+
+    with unit_of_work():
+        ProductsCRUD().create_product("P100", "Teclado", "USB", 0.19, 25.0)
+        ProvidersCRUD().create_provider("PR100", "P100", "Teclado", 18.0, "Calle 1", "555")
+        InventoriesCRUD().create_inventory("P100", 10, 2, 0.19, 25.0, username=session)
+
+The unit starts with ``BEGIN IMMEDIATE`` and commits once when the block
+ends, or rolls everything back if it raises. Service methods still return
+``(False, msg)`` for rejected input and the unit goes on; wrap a call in
+``unit.check(...)`` to raise ``UnitOfWorkAborted`` on such a result, or
+call ``unit.fail()`` to roll the whole unit back when the block ends::
+
+    with unit_of_work() as unit:
+        unit.check(ProductsCRUD().create_product("P100", "Teclado", "USB", 0.19, 25.0))
+        unit.check(InventoriesCRUD().create_inventory("P100", 10, 2, 0.19, 25.0, username=session))
+
+Each handle runs inside its own savepoint, so the services keep their
+usual semantics: ``commit()`` releases the savepoint into the unit,
+``rollback()`` returns to it, and ``close()`` discards whatever the call
+did not commit, unless another handle committed while it was open (its
+work is kept then). ``BEGIN`` statements issued by a service are skipped.
+A nested ``unit_of_work()`` becomes a savepoint of the outer one.
+
+Cached listings are bypassed while a unit is open on the thread (see
+DB/cache.py), so uncommitted rows are never stored for other threads.
+Tables bumped in ``TABLE_VERSIONS`` during the unit are bumped again after
+it ends, dropping entries other threads cached before the commit.
+"""
+
+from __future__ import annotations
+
+import itertools
+import re
+import sqlite3
+from typing import Any, Optional
+
+from DB.cache import TABLE_VERSIONS
+from DB.connection import _ACTIVE_UNIT, _open_connection
+
+_BEGIN = re.compile(r"\s*BEGIN\b", re.IGNORECASE)
+_savepoint_ids = itertools.count(1)
+
+
+def _new_savepoint(connection: sqlite3.Connection, prefix: str) -> str:
+    name = f"{prefix}_{next(_savepoint_ids)}"
+    connection.execute(f"SAVEPOINT {name}")
+    return name
+
+
+class _UnitCursor:
+    """Cursor proxy that skips BEGIN statements inside a unit of work."""
+
+    def __init__(self, cursor: sqlite3.Cursor) -> None:
+        self._cursor = cursor
+
+    def execute(self, sql: str, parameters: Any = ()) -> "_UnitCursor":
+        if not _BEGIN.match(sql):
+            self._cursor.execute(sql, parameters)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> "_UnitCursor":
+        self._cursor.executemany(sql, seq_of_parameters)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+class UnitConnection:
+    """Handle given to one service call; maps commit/rollback/close onto a savepoint.
+
+    The unit keeps its handles and nested scopes on one stack, mirroring
+    the savepoints. ``close()`` only rolls back when no other handle
+    committed inside this handle's savepoint, and a handle closed while a
+    later one is still open (e.g. an unfinished ``iter_sales`` generator)
+    is closed together with that one.
+    """
+
+    def __init__(self, unit: "UnitOfWork") -> None:
+        self._root = unit._root
+        self._raw = unit.connection
+        self._closed = False
+        self._open_savepoint()
+        self._root._stack.append(self)
+
+    def _open_savepoint(self) -> None:
+        self._savepoint: Optional[str] = _new_savepoint(self._raw, "uow_call")
+        self._commits = self._root._commits
+
+    def _innermost(self) -> bool:
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed unit connection.")
+        return self._root._stack[-1] is self
+
+    def cursor(self) -> _UnitCursor:
+        return _UnitCursor(self._raw.cursor())
+
+    def execute(self, sql: str, parameters: Any = ()) -> _UnitCursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> _UnitCursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self) -> None:
+        innermost = self._innermost()
+        self._root._commits += 1
+        if innermost:
+            self._raw.execute(f"RELEASE {self._savepoint}")
+            self._open_savepoint()
+        # Con otro handle abierto encima, el savepoint se libera (sin revertir) al cerrar.
+
+    def rollback(self) -> None:
+        if not self._innermost():
+            raise sqlite3.OperationalError("Cannot roll back a unit connection while a later one is still open.")
+        self._raw.execute(f"ROLLBACK TO {self._savepoint}")
+        self._commits = self._root._commits
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._root._unwind()
+
+    def _finish(self) -> None:
+        savepoint, self._savepoint = self._savepoint, None
+        if self._commits == self._root._commits:
+            self._raw.execute(f"ROLLBACK TO {savepoint}")
+        self._raw.execute(f"RELEASE {savepoint}")
+
+    def _drop(self) -> None:
+        """Forget the savepoint; an enclosing scope already released or rolled it back."""
+        self._savepoint = None
+        self._closed = True
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._raw, name)
+
+
+class UnitOfWorkAborted(RuntimeError):
+    """Raised by ``UnitOfWork.check`` when a service call was rejected."""
+
+
+class UnitOfWork:
+    """One transaction shared by the CRUD calls made inside the ``with`` block."""
+
+    def __init__(
+        self,
+        profile: Optional[str] = None,
+        immediate: bool = True,
+        connection: Optional[sqlite3.Connection] = None,
+    ) -> None:
+        self.profile = profile
+        self.immediate = immediate
+        self.connection = connection
+        self._owns_connection = connection is None
+        self.tables: set[str] = set()
+        self._parent: Optional[UnitOfWork] = None
+        self._savepoint: Optional[str] = None
+        self.failed = False
+        # Shared with nested scopes: open handles and scopes, innermost last,
+        # and the number of commits made by handles and nested scopes.
+        self._root = self
+        self._stack: list[Any] = []
+        self._commits = 0
+
+    def __call__(self) -> UnitConnection:
+        """Connection factory: a handle on this unit (for explicit ``connection_factory`` use)."""
+        return UnitConnection(self)
+
+    def check(self, result: tuple[Any, str]) -> tuple[Any, str]:
+        """Return a service's ``(ok, msg)`` result, or raise ``UnitOfWorkAborted(msg)`` if ``ok`` is falsy."""
+        ok, message = result
+        if not ok:
+            raise UnitOfWorkAborted(message)
+        return result
+
+    def fail(self) -> None:
+        """Roll this unit (or nested scope) back when its ``with`` block ends."""
+        self.failed = True
+
+    def _unwind(self) -> None:
+        """Finish the handles closed while a later handle or scope was still open."""
+        while self._stack and isinstance(self._stack[-1], UnitConnection) and self._stack[-1].closed:
+            self._stack.pop()._finish()
+
+    def __enter__(self) -> "UnitOfWork":
+        self._parent = getattr(_ACTIVE_UNIT, "current", None)
+        if self._parent is not None:
+            self.connection = self._parent.connection
+            self._root = self._parent._root
+            self._savepoint = _new_savepoint(self.connection, "uow_scope")
+            self._root._stack.append(self)
+        else:
+            if self._owns_connection:
+                self.connection = _open_connection(profile=self.profile)
+            self.connection.execute("BEGIN IMMEDIATE" if self.immediate else "BEGIN")
+            TABLE_VERSIONS.start_recording(self.tables)
+        _ACTIVE_UNIT.current = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _ACTIVE_UNIT.current = self._parent
+        if self._parent is not None:
+            stack = self._root._stack
+            index = stack.index(self)
+            for handle in stack[index + 1:]:
+                handle._drop()
+            del stack[index:]
+            if exc_type is not None or self.failed:
+                self.connection.execute(f"ROLLBACK TO {self._savepoint}")
+            else:
+                self._root._commits += 1
+            self.connection.execute(f"RELEASE {self._savepoint}")
+            self._root._unwind()
+            return
+        try:
+            if exc_type is None and not self.failed:
+                try:
+                    self.connection.commit()
+                except BaseException:
+                    # Un COMMIT rechazado (p. ej. llaves foráneas diferidas) deja la transacción abierta.
+                    if self.connection.in_transaction:
+                        self.connection.rollback()
+                    raise
+            else:
+                self.connection.rollback()
+        finally:
+            for handle in self._stack:
+                handle._drop()
+            self._stack.clear()
+            TABLE_VERSIONS.stop_recording()
+            if self._owns_connection:
+                self.connection.close()
+                self.connection = None
+            if self.tables:
+                TABLE_VERSIONS.bump(*sorted(self.tables))
+
+
+def unit_of_work(
+    profile: Optional[str] = None,
+    immediate: bool = True,
+    connection: Optional[sqlite3.Connection] = None,
+) -> UnitOfWork:
+    """
+    Purpose: Open a unit of work for the current thread (see the module docstring).
+    Args:
+        profile: Performance profile for the unit's connection.
+        immediate: Take the write lock up front (``BEGIN IMMEDIATE``).
+        connection: Reuse this open connection instead of opening (and
+            closing) one; it must not be inside a transaction.
+    Returns:
+        UnitOfWork to use as a context manager.
+    """
+    return UnitOfWork(profile=profile, immediate=immediate, connection=connection)
@@ -0,0 +1,174 @@
+"""Single writer thread with group commit for concurrent write requests.
+
+Many threads calling ``SalesCRUD.create_sale`` at once each open a
+connection, fight for SQLite's write lock ("database is locked" once the
+busy timeout runs out) and pay one commit (one fsync under the durable
+profile) per sale. ``GroupCommitWriter`` instead runs every write on one
+thread and one long-lived connection::
+
+    writer = GroupCommitWriter()
+    future = writer.submit(SalesCRUD().create_sale, "2024-01-01", "C001", "P001", "Teclado", 25.0, 1,
+                           username=session)
+    ok, message = future.result()   # returns once the batch is committed
+
+The thread takes the first queued request plus everything that queued
+up behind it (at most ``max_batch``) and runs the whole batch inside one
+``unit_of_work`` on its connection, so the batch costs a single commit.
+Requests arriving while a commit runs form the next batch; a positive
+``batch_window`` also waits that many seconds for more requests, trading
+latency for larger batches when commits are very expensive. Each request runs in its own
+savepoint: one that raises is rolled back alone and its future gets the
+exception, the rest of the batch still commits. Futures are resolved only
+after the commit returns; if the commit itself fails every future in the
+batch gets that error and the writer continues on a fresh connection.
+A request raising a ``BaseException`` that is not an ``Exception`` (e.g.
+``SystemExit``) stops the writer: its batch gets that error, and requests
+still queued get ``RuntimeError``.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from DB.connection import _open_connection
+from DB.unit_of_work import unit_of_work
+
+DEFAULT_BATCH_WINDOW = 0.0
+DEFAULT_MAX_BATCH = 256
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """Queue of write requests drained by one thread in committed batches."""
+
+    def __init__(
+        self,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        profile: Optional[str] = None,
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.profile = profile
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {"batches": 0, "requests": 0, "failed": 0, "largest_batch": 0}
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Queue ``fn(*args, **kwargs)``; the future resolves after its batch commits."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The writer is closed.")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-group-writer", daemon=True)
+                self._thread.start()
+            self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def close(self, wait: bool = True) -> None:
+        """Commit what is already queued and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            self._queue.put(_STOP)
+        if thread is not None and wait:
+            thread.join()
+
+    def __enter__(self) -> "GroupCommitWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _collect(self, first: tuple) -> tuple[list[tuple], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        connection = None
+        error: BaseException = RuntimeError("The writer is closed.")
+        try:
+            connection = _open_connection(profile=self.profile)
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                batch, stopping = self._collect(item)
+                if not self._commit_batch(connection, batch) and not stopping:
+                    # Un lote fallido no deja estado (transacción, PRAGMAs) al siguiente.
+                    connection.close()
+                    connection = None
+                    connection = _open_connection(profile=self.profile)
+        except Exception as exc:
+            error = exc
+        except BaseException as exc:  # el hilo termina; los futures no quedan colgados
+            error = RuntimeError("The writer stopped.")
+            error.__cause__ = exc
+        finally:
+            if connection is not None:
+                connection.close()
+            self._fail_pending(error)
+
+    def _fail_pending(self, error: BaseException) -> None:
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item[0].set_running_or_notify_cancel():
+                item[0].set_exception(error)
+
+    def _commit_batch(self, connection: Any, batch: list[tuple]) -> bool:
+        """Run and commit one batch; False when the whole batch failed."""
+        running = [item for item in batch if item[0].set_running_or_notify_cancel()]
+        if not running:
+            return True
+        outcomes = []
+        try:
+            with unit_of_work(connection=connection):
+                for future, fn, args, kwargs in running:
+                    try:
+                        with unit_of_work():
+                            outcomes.append((future, fn(*args, **kwargs), None))
+                    except Exception as exc:  # se entrega por el future
+                        outcomes.append((future, None, exc))
+        except BaseException as exc:
+            self.stats["failed"] += len(running)
+            for future, *_ in running:
+                future.set_exception(exc)
+            if not isinstance(exc, Exception):
+                raise
+            return False
+        self.stats["batches"] += 1
+        self.stats["requests"] += len(running)
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(running))
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+        return True
@@ -3,14 +3,19 @@
 from __future__ import annotations
 
 import tkinter as tk
-from tkinter import END, Frame, Label, Listbox, Toplevel, messagebox
+from tkinter import END, Frame, Label, Toplevel, messagebox
 
+from DB.pool import APP_POOL
 from GUI.permissions import allowed_actions
+from GUI.tasks import BusyIndicator, TaskRunner
+from GUI.virtual_list import VirtualList
+from Modules.Session import Principal
 from Modules.Custumers import (
     create_client,
     delete_client,
     get_client,
-    list_clients,
+    list_clients_page,
+    search_clients,
     update_client,
 )
 
@@ -57,10 +62,18 @@ class ClientsWindow:
         self.btn_delete.grid(row=0, column=2, padx=4)
         tk.Button(buttons, text="Limpiar", command=self.clear_form).grid(row=0, column=3, padx=4)
 
-        Label(container, text="Clientes").grid(row=6, column=0, columnspan=2, sticky="w", pady=(10, 0))
-        self.listbox = Listbox(container, height=10, width=50)
-        self.listbox.grid(row=7, column=0, columnspan=2, sticky="nsew")
-        self.listbox.bind("<<ListboxSelect>>", self.load_selection)
+        Label(container, text="Clientes").grid(row=6, column=0, sticky="w", pady=(10, 0))
+        search_bar = Frame(container)
+        search_bar.grid(row=6, column=1, sticky="e", pady=(10, 0))
+        self.entry_search = tk.Entry(search_bar, width=24)
+        self.entry_search.grid(row=0, column=0, padx=(0, 4))
+        self.entry_search.bind("<Return>", lambda _event: self.refresh_list())
+        tk.Button(search_bar, text="Buscar", command=self.refresh_list).grid(row=0, column=1)
+        self.list_view = VirtualList(container, self._format_row, on_select=self.load_selection)
+        self.list_view.grid(row=7, column=0, columnspan=2, sticky="nsew")
+        self.busy = BusyIndicator(container)
+        self.busy.grid(row=8, column=0, columnspan=2, sticky="w")
+        self.tasks = TaskRunner(master, self.busy, title="Clientes")
 
         container.columnconfigure(1, weight=1)
         container.rowconfigure(7, weight=1)
@@ -76,13 +89,22 @@ class ClientsWindow:
         if "delete" not in self.actions:
             self.btn_delete.config(state=tk.DISABLED)
         if "read" not in self.actions:
-            self.listbox.config(state=tk.DISABLED)
+            self.list_view.listbox.config(state=tk.DISABLED)
 
     def refresh_list(self) -> None:
-        self.listbox.delete(0, END)
-        for client in list_clients():
-            row = f"{client['codclie']} - {client['nomclie']} ({client['ciudad']})"
-            self.listbox.insert(END, row)
+        query = self.entry_search.get().strip()
+        if query:
+            self.tasks.run(search_clients, query, connection_factory=APP_POOL, key="clientes", on_done=self.list_view.set_rows)
+        else:
+            # Las páginas se piden en segundo plano a medida que se muestran.
+            request_page = self.tasks.page_requester(
+                list_clients_page, key="clientes", connection_factory=APP_POOL
+            )
+            self.list_view.set_async_source(request_page, first_token=None)
+
+    @staticmethod
+    def _format_row(client: dict) -> str:
+        return f"{client['codclie']} - {client['nomclie']} ({client['ciudad']})"
 
     def _get_form_data(self) -> tuple[str, str, str, str, str]:
         return (
@@ -100,12 +122,9 @@ class ClientsWindow:
         if not codclie or not nomclie:
             messagebox.showerror("Clientes", "Código y nombre son obligatorios.")
             return
-        ok, msg = create_client(codclie, nomclie, direc, telef, ciudad)
-        if ok:
-            messagebox.showinfo("Clientes", msg)
-            self.refresh_list()
-        else:
-            messagebox.showerror("Clientes", msg)
+        self.tasks.run(
+            create_client, codclie, nomclie, direc, telef, ciudad, connection_factory=APP_POOL, key="clientes", on_done=self._on_saved
+        )
 
     def update_client(self) -> None:
         if "update" not in self.actions:
@@ -115,12 +134,9 @@ class ClientsWindow:
         if not codclie:
             messagebox.showerror("Clientes", "Debe seleccionar un cliente.")
             return
-        ok, msg = update_client(codclie, nomclie, direc, telef, ciudad)
-        if ok:
-            messagebox.showinfo("Clientes", msg)
-            self.refresh_list()
-        else:
-            messagebox.showerror("Clientes", msg)
+        self.tasks.run(
+            update_client, codclie, nomclie, direc, telef, ciudad, connection_factory=APP_POOL, key="clientes", on_done=self._on_saved
+        )
 
     def delete_client(self) -> None:
         if "delete" not in self.actions:
@@ -130,22 +146,26 @@ class ClientsWindow:
         if not codclie:
             messagebox.showerror("Clientes", "Debe seleccionar un cliente.")
             return
-        ok, msg = delete_client(codclie)
+        self.tasks.run(
+            delete_client, codclie, connection_factory=APP_POOL, key="clientes", on_done=lambda result: self._on_saved(result, clear=True)
+        )
+
+    def _on_saved(self, result: tuple[bool, str], clear: bool = False) -> None:
+        ok, msg = result
         if ok:
             messagebox.showinfo("Clientes", msg)
-            self.clear_form()
+            if clear:
+                self.clear_form()
             self.refresh_list()
         else:
             messagebox.showerror("Clientes", msg)
 
-    def load_selection(self, event) -> None:
+    def load_selection(self, row: dict) -> None:
         if "read" not in self.actions:
             return
-        selection = event.widget.curselection()
-        if not selection:
-            return
-        codclie = event.widget.get(selection[0]).split(" ")[0]
-        client = get_client(codclie)
+        self.tasks.run(get_client, row["codclie"], connection_factory=APP_POOL, key="clientes", on_done=self._fill_form)
+
+    def _fill_form(self, client) -> None:
         if not client:
             return
         self.entry_code.delete(0, END)
@@ -170,7 +190,7 @@ class ClientsWindow:
             entry.delete(0, END)
 
 
-def open_clients_window(parent, username: str, level: int) -> None:
+def open_clients_window(parent, username: Principal, level: int) -> None:
     actions = allowed_actions("clients", level)
     if not actions:
         messagebox.showwarning("Clientes", "No tiene permisos para este módulo.")
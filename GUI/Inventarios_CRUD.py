@@ -3,21 +3,25 @@
 from __future__ import annotations
 
 import tkinter as tk
-from tkinter import END, Frame, Label, Listbox, Toplevel, messagebox
+from tkinter import END, Frame, Label, Toplevel, messagebox
 
+from DB.pool import APP_POOL
 from GUI.permissions import allowed_actions
+from GUI.tasks import BusyIndicator, TaskRunner
+from GUI.virtual_list import VirtualList
+from Modules.Session import Principal
 from Modules.Inventarios import InventoriesCRUD
 
 
 class InventoryWindow:
     """Render inventories with create/update/delete governed by user level."""
 
-    def __init__(self, master: Toplevel, username: str, level: int, actions: list[str]) -> None:
+    def __init__(self, master: Toplevel, username: Principal, level: int, actions: list[str]) -> None:
         self.master = master
         self.username = username
         self.level = level
         self.actions = actions
-        self.service = InventoriesCRUD()
+        self.service = InventoriesCRUD(APP_POOL)
 
         self.master.title("Inventarios")
 
@@ -56,9 +60,11 @@ class InventoryWindow:
         tk.Button(buttons, text="Limpiar", command=self.clear_form).grid(row=0, column=3, padx=4)
 
         Label(container, text="Inventario actual").grid(row=6, column=0, columnspan=2, sticky="w", pady=(10, 0))
-        self.listbox = Listbox(container, height=10, width=50)
-        self.listbox.grid(row=7, column=0, columnspan=2, sticky="nsew")
-        self.listbox.bind("<<ListboxSelect>>", self.load_selection)
+        self.list_view = VirtualList(container, self._format_row, on_select=self.load_selection)
+        self.list_view.grid(row=7, column=0, columnspan=2, sticky="nsew")
+        self.busy = BusyIndicator(container)
+        self.busy.grid(row=8, column=0, columnspan=2, sticky="w")
+        self.tasks = TaskRunner(master, self.busy, title="Inventarios")
 
         container.columnconfigure(1, weight=1)
         container.rowconfigure(7, weight=1)
@@ -75,13 +81,18 @@ class InventoryWindow:
             self.btn_delete.config(state=tk.DISABLED)
 
     def refresh_list(self) -> None:
-        self.listbox.delete(0, END)
-        for item in self.service.list_inventories(self.username):
-            row = (
-                f"{item['codprod']} - {item['nomprod']} | Cant: {item['cantidad']} | "
-                f"Stock min: {item['stock_minimo']}"
-            )
-            self.listbox.insert(END, row)
+        # Las páginas se piden en segundo plano a medida que se muestran.
+        request_page = self.tasks.page_requester(
+            self.service.list_inventories_page, self.username, key="inventarios"
+        )
+        self.list_view.set_async_source(request_page, first_token=None)
+
+    @staticmethod
+    def _format_row(item: dict) -> str:
+        return (
+            f"{item['codprod']} - {item['nomprod']} | Cant: {item['cantidad']} | "
+            f"Stock min: {item['stock_minimo']}"
+        )
 
     def _parse_numeric(self, value: str, cast, default=0):
         try:
@@ -104,19 +115,17 @@ class InventoryWindow:
         if not codprod:
             messagebox.showerror("Inventarios", "Debe indicar código de producto.")
             return
-        ok, msg = self.service.create_inventory(
+        self.tasks.run(
+            self.service.create_inventory,
             codprod,
             cantidad,
             stock_minimo,
             iva,
             costovta,
             username=self.username,
+            key="inventarios",
+            on_done=self._on_saved,
         )
-        if ok:
-            messagebox.showinfo("Inventarios", msg)
-            self.refresh_list()
-        else:
-            messagebox.showerror("Inventarios", msg)
 
     def update_inventory(self) -> None:
         if "update" not in self.actions:
@@ -126,19 +135,17 @@ class InventoryWindow:
         if not codprod:
             messagebox.showerror("Inventarios", "Seleccione un registro a actualizar.")
             return
-        ok, msg = self.service.update_inventory(
+        self.tasks.run(
+            self.service.update_inventory,
             codprod,
             cantidad,
             stock_minimo,
             iva,
             costovta,
             username=self.username,
+            key="inventarios",
+            on_done=self._on_saved,
         )
-        if ok:
-            messagebox.showinfo("Inventarios", msg)
-            self.refresh_list()
-        else:
-            messagebox.showerror("Inventarios", msg)
 
     def delete_inventory(self) -> None:
         if "delete" not in self.actions:
@@ -148,20 +155,34 @@ class InventoryWindow:
         if not codprod:
             messagebox.showerror("Inventarios", "Seleccione un registro a eliminar.")
             return
-        ok, msg = self.service.delete_inventory(codprod, username=self.username)
+        self.tasks.run(
+            self.service.delete_inventory,
+            codprod,
+            username=self.username,
+            key="inventarios",
+            on_done=lambda result: self._on_saved(result, clear=True),
+        )
+
+    def _on_saved(self, result: tuple[bool, str], clear: bool = False) -> None:
+        ok, msg = result
         if ok:
             messagebox.showinfo("Inventarios", msg)
-            self.clear_form()
+            if clear:
+                self.clear_form()
             self.refresh_list()
         else:
             messagebox.showerror("Inventarios", msg)
 
-    def load_selection(self, event) -> None:
-        selection = event.widget.curselection()
-        if not selection:
-            return
-        codprod = event.widget.get(selection[0]).split(" ")[0]
-        data = self.service.read_inventory(codprod, username=self.username)
+    def load_selection(self, row: dict) -> None:
+        self.tasks.run(
+            self.service.read_inventory,
+            row["codprod"],
+            username=self.username,
+            key="inventarios",
+            on_done=self._fill_form,
+        )
+
+    def _fill_form(self, data) -> None:
         if not data:
             return
         self.entry_code.delete(0, END)
@@ -186,7 +207,7 @@ class InventoryWindow:
             entry.delete(0, END)
 
 
-def open_inventory_window(parent, username: str, level: int) -> None:
+def open_inventory_window(parent, username: Principal, level: int) -> None:
     actions = allowed_actions("inventories", level)
     if not actions:
         messagebox.showwarning("Inventarios", "No tiene permisos para este módulo.")
@@ -1,17 +1,18 @@
 import tkinter as tk
 from tkinter import messagebox
 
+from DB.pool import APP_POOL
 from Modules.Users import UsersCRUD
 
 
 def login_window():
-    """Display the login window and return (username, level) when successful."""
+    """Display the login window and return the authenticated Session (or None)."""
 
     root = tk.Tk()
     root.title("Login")
     root.geometry("320x200")
 
-    result = {"username": None, "level": None}
+    result = {"session": None}
 
     tk.Label(root, text="Usuario").pack(pady=5)
     username_entry = tk.Entry(root)
@@ -28,12 +29,9 @@ def login_window():
             messagebox.showerror("Login", "Debe ingresar usuario y contraseña.")
             return
 
-        users = UsersCRUD()
-        ok, msg = users.verify_user(username, password)
-        if ok:
-            level = users.get_user_level(username)
-            result["username"] = username
-            result["level"] = level
+        session, msg = UsersCRUD(APP_POOL).authenticate(username, password)
+        if session is not None:
+            result["session"] = session
             root.destroy()
         else:
             messagebox.showerror("Login", msg)
@@ -42,5 +40,5 @@ def login_window():
 
     root.mainloop()
 
-    return result["username"], result["level"]
+    return result["session"]
 
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import tkinter as tk
 from functools import partial
+from typing import Optional
 
 from GUI.Custumers_CRUD import open_clients_window
 from GUI.Inventarios_CRUD import open_inventory_window
@@ -11,6 +12,7 @@ from GUI.Providers_CRUD import open_providers_window
 from GUI.Sales_CRUD import open_sales_window
 from GUI.Users_CRUD import open_users_window
 from GUI.permissions import allowed_actions
+from Modules.Session import Principal, Session, principal_name
 
 try:
     from GUI.Products_CRUD import open_products_window
@@ -23,14 +25,20 @@ except ImportError:
     open_reports_window = None
 
 
-def open_main_menu(username: str, level: int) -> None:
-    """Create the main menu window and display buttons the user can access."""
+def open_main_menu(user: Principal, level: Optional[int] = None) -> None:
+    """Create the main menu window and display buttons the user can access.
+
+    ``user`` is normally the Session returned by the login window; a bare
+    username plus ``level`` is still accepted.
+    """
+    if isinstance(user, Session):
+        level = user.level
 
     root = tk.Tk()
     root.title("Menú principal")
     root.geometry("420x420")
 
-    header = f"Usuario: {username} | Nivel: {level}"
+    header = f"Usuario: {principal_name(user)} | Nivel: {level}"
     tk.Label(root, text=header, font=("Arial", 12)).pack(pady=10)
     tk.Label(root, text="Seleccione un módulo", font=("Arial", 14, "bold")).pack(pady=5)
 
@@ -50,7 +58,7 @@ def open_main_menu(username: str, level: int) -> None:
         actions = allowed_actions(module_key, level)
         if not actions:
             continue
-        command = partial(handler, root, username, level)
+        command = partial(handler, root, user, level)
         tk.Button(root, text=label, width=20, command=command).pack(pady=6)
 
     tk.Button(root, text="Cerrar sesión", width=20, command=root.destroy).pack(pady=20)
@@ -3,9 +3,13 @@
 from __future__ import annotations
 
 import tkinter as tk
-from tkinter import END, Frame, Label, Listbox, Toplevel, messagebox
+from tkinter import END, Frame, Label, Toplevel, messagebox
 
+from DB.pool import APP_POOL
 from GUI.permissions import allowed_actions
+from GUI.tasks import BusyIndicator, TaskRunner
+from GUI.virtual_list import VirtualList
+from Modules.Session import Principal
 from Modules.Products import ProductsCRUD
 
 
@@ -15,7 +19,7 @@ class ProductsWindow:
     def __init__(self, master: Toplevel, actions: list[str]) -> None:
         self.master = master
         self.actions = actions
-        self.service = ProductsCRUD()
+        self.service = ProductsCRUD(APP_POOL)
 
         self.master.title("Productos")
 
@@ -53,10 +57,18 @@ class ProductsWindow:
         self.btn_delete.grid(row=0, column=2, padx=4)
         tk.Button(buttons, text="Limpiar", command=self.clear_form).grid(row=0, column=3, padx=4)
 
-        Label(container, text="Productos").grid(row=6, column=0, columnspan=2, sticky="w", pady=(10, 0))
-        self.listbox = Listbox(container, height=10, width=50)
-        self.listbox.grid(row=7, column=0, columnspan=2, sticky="nsew")
-        self.listbox.bind("<<ListboxSelect>>", self.load_selection)
+        Label(container, text="Productos").grid(row=6, column=0, sticky="w", pady=(10, 0))
+        search_bar = Frame(container)
+        search_bar.grid(row=6, column=1, sticky="e", pady=(10, 0))
+        self.entry_search = tk.Entry(search_bar, width=24)
+        self.entry_search.grid(row=0, column=0, padx=(0, 4))
+        self.entry_search.bind("<Return>", lambda _event: self.refresh_list())
+        tk.Button(search_bar, text="Buscar", command=self.refresh_list).grid(row=0, column=1)
+        self.list_view = VirtualList(container, self._format_row, on_select=self.load_selection)
+        self.list_view.grid(row=7, column=0, columnspan=2, sticky="nsew")
+        self.busy = BusyIndicator(container)
+        self.busy.grid(row=8, column=0, columnspan=2, sticky="w")
+        self.tasks = TaskRunner(master, self.busy, title="Productos")
 
         container.columnconfigure(1, weight=1)
         container.rowconfigure(7, weight=1)
@@ -73,10 +85,17 @@ class ProductsWindow:
             self.btn_delete.config(state=tk.DISABLED)
 
     def refresh_list(self) -> None:
-        self.listbox.delete(0, END)
-        for product in self.service.list_products():
-            row = f"{product['codprod']} - {product['nomprod']} (${product['costovta']})"
-            self.listbox.insert(END, row)
+        query = self.entry_search.get().strip()
+        if query:
+            self.tasks.run(self.service.search_products, query, key="productos", on_done=self.list_view.set_rows)
+        else:
+            # Las páginas se piden en segundo plano a medida que se muestran.
+            request_page = self.tasks.page_requester(self.service.list_products_page, key="productos")
+            self.list_view.set_async_source(request_page, first_token=None)
+
+    @staticmethod
+    def _format_row(product: dict) -> str:
+        return f"{product['codprod']} - {product['nomprod']} (${product['costovta']})"
 
     def _get_form(self):
         return (
@@ -100,12 +119,12 @@ class ProductsWindow:
         except ValueError:
             messagebox.showerror("Productos", "IVA y costo deben ser numéricos.")
             return
-        ok, msg = self.service.create_product(codprod, nomprod, descripcion, iva_value, cost_value)
-        if ok:
-            messagebox.showinfo("Productos", msg)
-            self.refresh_list()
-        else:
-            messagebox.showerror("Productos", msg)
+        self.tasks.run(
+            self.service.create_product,
+            codprod, nomprod, descripcion, iva_value, cost_value,
+            key="productos",
+            on_done=self._on_saved,
+        )
 
     def update_product(self) -> None:
         if "update" not in self.actions:
@@ -121,12 +140,12 @@ class ProductsWindow:
         except ValueError:
             messagebox.showerror("Productos", "IVA y costo deben ser numéricos.")
             return
-        ok, msg = self.service.update_product(codprod, nomprod, descripcion, iva_value, cost_value)
-        if ok:
-            messagebox.showinfo("Productos", msg)
-            self.refresh_list()
-        else:
-            messagebox.showerror("Productos", msg)
+        self.tasks.run(
+            self.service.update_product,
+            codprod, nomprod, descripcion, iva_value, cost_value,
+            key="productos",
+            on_done=self._on_saved,
+        )
 
     def delete_product(self) -> None:
         if "delete" not in self.actions:
@@ -136,20 +155,27 @@ class ProductsWindow:
         if not codprod:
             messagebox.showerror("Productos", "Seleccione un producto.")
             return
-        ok, msg = self.service.delete_product(codprod)
+        self.tasks.run(
+            self.service.delete_product,
+            codprod,
+            key="productos",
+            on_done=lambda result: self._on_saved(result, clear=True),
+        )
+
+    def _on_saved(self, result: tuple[bool, str], clear: bool = False) -> None:
+        ok, msg = result
         if ok:
             messagebox.showinfo("Productos", msg)
-            self.clear_form()
+            if clear:
+                self.clear_form()
             self.refresh_list()
         else:
             messagebox.showerror("Productos", msg)
 
-    def load_selection(self, event) -> None:
-        selection = event.widget.curselection()
-        if not selection:
-            return
-        codprod = event.widget.get(selection[0]).split(" ")[0]
-        product = self.service.read_product(codprod)
+    def load_selection(self, row: dict) -> None:
+        self.tasks.run(self.service.read_product, row["codprod"], key="productos", on_done=self._fill_form)
+
+    def _fill_form(self, product) -> None:
         if not product:
             return
         self.entry_code.delete(0, END)
@@ -174,7 +200,7 @@ class ProductsWindow:
             entry.delete(0, END)
 
 
-def open_products_window(parent, username: str, level: int) -> None:
+def open_products_window(parent, username: Principal, level: int) -> None:
     actions = allowed_actions("products", level)
     if not actions:
         messagebox.showwarning("Productos", "No tiene permisos para este módulo.")
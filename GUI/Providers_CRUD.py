@@ -3,9 +3,13 @@
 from __future__ import annotations
 
 import tkinter as tk
-from tkinter import END, Frame, Label, Listbox, Toplevel, messagebox
+from tkinter import END, Frame, Label, Toplevel, messagebox
 
+from DB.pool import APP_POOL
 from GUI.permissions import allowed_actions
+from GUI.tasks import BusyIndicator, TaskRunner
+from GUI.virtual_list import VirtualList
+from Modules.Session import Principal
 from Modules.Providers import ProvidersCRUD
 
 
@@ -15,7 +19,7 @@ class ProvidersWindow:
     def __init__(self, master: Toplevel, actions: list[str]) -> None:
         self.master = master
         self.actions = actions
-        self.service = ProvidersCRUD()
+        self.service = ProvidersCRUD(APP_POOL)
 
         self.master.title("Proveedores")
 
@@ -58,9 +62,11 @@ class ProvidersWindow:
         tk.Button(buttons, text="Limpiar", command=self.clear_form).grid(row=0, column=3, padx=4)
 
         Label(container, text="Proveedores").grid(row=7, column=0, columnspan=2, sticky="w", pady=(10, 0))
-        self.listbox = Listbox(container, height=10, width=50)
-        self.listbox.grid(row=8, column=0, columnspan=2, sticky="nsew")
-        self.listbox.bind("<<ListboxSelect>>", self.load_selection)
+        self.list_view = VirtualList(container, self._format_row, on_select=self.load_selection)
+        self.list_view.grid(row=8, column=0, columnspan=2, sticky="nsew")
+        self.busy = BusyIndicator(container)
+        self.busy.grid(row=9, column=0, columnspan=2, sticky="w")
+        self.tasks = TaskRunner(master, self.busy, title="Proveedores")
 
         container.columnconfigure(1, weight=1)
         container.rowconfigure(8, weight=1)
@@ -77,10 +83,13 @@ class ProvidersWindow:
             self.btn_delete.config(state=tk.DISABLED)
 
     def refresh_list(self) -> None:
-        self.listbox.delete(0, END)
-        for provider in self.service.list_providers():
-            row = f"{provider['idprov']} - {provider['descripcion']} (Prod: {provider['codprod']})"
-            self.listbox.insert(END, row)
+        # Las páginas se piden en segundo plano a medida que se muestran.
+        request_page = self.tasks.page_requester(self.service.list_providers_page, key="proveedores")
+        self.list_view.set_async_source(request_page, first_token=None)
+
+    @staticmethod
+    def _format_row(provider: dict) -> str:
+        return f"{provider['idprov']} - {provider['descripcion']} (Prod: {provider['codprod']})"
 
     def _get_form(self):
         return (
@@ -104,12 +113,12 @@ class ProvidersWindow:
         except ValueError:
             messagebox.showerror("Proveedores", "Costo inválido.")
             return
-        ok, msg = self.service.create_provider(idprov, codprod, descripcion, costo_value, direccion, telefono)
-        if ok:
-            messagebox.showinfo("Proveedores", msg)
-            self.refresh_list()
-        else:
-            messagebox.showerror("Proveedores", msg)
+        self.tasks.run(
+            self.service.create_provider,
+            idprov, codprod, descripcion, costo_value, direccion, telefono,
+            key="proveedores",
+            on_done=self._on_saved,
+        )
 
     def update_provider(self) -> None:
         if "update" not in self.actions:
@@ -124,12 +133,12 @@ class ProvidersWindow:
         except ValueError:
             messagebox.showerror("Proveedores", "Costo inválido.")
             return
-        ok, msg = self.service.update_provider(idprov, codprod, descripcion, costo_value, direccion, telefono)
-        if ok:
-            messagebox.showinfo("Proveedores", msg)
-            self.refresh_list()
-        else:
-            messagebox.showerror("Proveedores", msg)
+        self.tasks.run(
+            self.service.update_provider,
+            idprov, codprod, descripcion, costo_value, direccion, telefono,
+            key="proveedores",
+            on_done=self._on_saved,
+        )
 
     def delete_provider(self) -> None:
         if "delete" not in self.actions:
@@ -139,20 +148,27 @@ class ProvidersWindow:
         if not idprov:
             messagebox.showerror("Proveedores", "Seleccione un proveedor.")
             return
-        ok, msg = self.service.delete_provider(idprov)
+        self.tasks.run(
+            self.service.delete_provider,
+            idprov,
+            key="proveedores",
+            on_done=lambda result: self._on_saved(result, clear=True),
+        )
+
+    def _on_saved(self, result: tuple[bool, str], clear: bool = False) -> None:
+        ok, msg = result
         if ok:
             messagebox.showinfo("Proveedores", msg)
-            self.clear_form()
+            if clear:
+                self.clear_form()
             self.refresh_list()
         else:
             messagebox.showerror("Proveedores", msg)
 
-    def load_selection(self, event) -> None:
-        selection = event.widget.curselection()
-        if not selection:
-            return
-        idprov = event.widget.get(selection[0]).split(" ")[0]
-        provider = self.service.read_provider(idprov)
+    def load_selection(self, row: dict) -> None:
+        self.tasks.run(self.service.read_provider, row["idprov"], key="proveedores", on_done=self._fill_form)
+
+    def _fill_form(self, provider) -> None:
         if not provider:
             return
         self.entry_id.delete(0, END)
@@ -180,7 +196,7 @@ class ProvidersWindow:
             entry.delete(0, END)
 
 
-def open_providers_window(parent, username: str, level: int) -> None:
+def open_providers_window(parent, username: Principal, level: int) -> None:
     actions = allowed_actions("providers", level)
     if not actions:
         messagebox.showwarning("Proveedores", "No tiene permisos para este módulo.")
@@ -4,8 +4,14 @@ from __future__ import annotations
 
 import tkinter as tk
 from tkinter import Toplevel, messagebox
+from typing import Callable
 
+from DB.pool import APP_POOL
+from DB.progress import QueryControl, QueryOutcome
 from GUI.permissions import allowed_actions
+from GUI.tasks import BusyIndicator, TaskRunner
+from GUI.virtual_list import VirtualList
+from Modules.Session import Principal
 from Modules.Sales import SalesCRUD
 
 
@@ -19,12 +25,12 @@ class ReportsWindow:
         ("Año", "year"),
     ]
 
-    def __init__(self, master: Toplevel, username: str, level: int, actions: list[str]) -> None:
+    def __init__(self, master: Toplevel, username: Principal, level: int, actions: list[str]) -> None:
         self.master = master
         self.username = username
         self.level = level
         self.actions = actions
-        self.service = SalesCRUD()
+        self.service = SalesCRUD(APP_POOL)
 
         self.master.title("Reportes de ventas")
         self.master.geometry("520x480")
@@ -51,11 +57,16 @@ class ReportsWindow:
         period_menu.grid(row=2, column=1, sticky="ew", padx=4)
         tk.Button(container, text="Ver indicadores", command=self.show_summary).grid(row=2, column=2, padx=4)
 
-        self.text_output = tk.Text(container, height=18)
-        self.text_output.grid(row=3, column=0, columnspan=3, sticky="nsew", pady=(10, 0))
+        self.label_status = tk.Label(container, anchor="w")
+        self.label_status.grid(row=3, column=0, columnspan=3, sticky="ew", pady=(10, 0))
+        self.list_output = VirtualList(container, str, height=16, width=80)
+        self.list_output.grid(row=4, column=0, columnspan=3, sticky="nsew")
+        self.busy = BusyIndicator(container)
+        self.busy.grid(row=5, column=0, columnspan=3, sticky="w")
+        self.tasks = TaskRunner(master, self.busy, title="Reportes")
 
         container.columnconfigure(1, weight=1)
-        container.rowconfigure(3, weight=1)
+        container.rowconfigure(4, weight=1)
 
     def _get_dates(self) -> tuple[str, str]:
         return self.entry_start.get().strip(), self.entry_end.get().strip()
@@ -65,17 +76,30 @@ class ReportsWindow:
             messagebox.showwarning("Reportes", "No cuenta con permisos de reporte.")
             return
         start, end = self._get_dates()
-        records = self.service.list_sales_by_date_range(start or "0001-01-01", end or "9999-12-31", username=self.username)
-        self.text_output.delete("1.0", tk.END)
-        if not records:
-            self.text_output.insert(tk.END, "Sin registros para el rango indicado.\n")
-            return
-        for sale in records:
-            line = (
-                f"ID {sale['id']} | Fecha {sale['fecha']} | Cliente {sale['codclie']} | "
-                f"Prod {sale['codprod']} | Cant {sale['canti']} | Total {sale['vrtotal']}\n"
-            )
-            self.text_output.insert(tk.END, line)
+        control = QueryControl.with_default_budget()
+        self.tasks.run(
+            control.run,
+            self.service.list_sales_by_date_range,
+            start or "0001-01-01",
+            end or "9999-12-31",
+            username=self.username,
+            key="reportes",
+            on_done=lambda outcome: self._show_outcome(outcome, self._show_sales_result),
+            on_cancel=control.cancel,
+        )
+        self._track_progress(control)
+
+    def _show_sales_result(self, records: list[dict]) -> None:
+        self.label_status.config(text=f"{len(records)} ventas" if records else "Sin registros para el rango indicado.")
+        self.list_output.format_row = self._format_sale
+        self.list_output.set_rows(records)
+
+    @staticmethod
+    def _format_sale(sale: dict) -> str:
+        return (
+            f"ID {sale['id']} | Fecha {sale['fecha']} | Cliente {sale['codclie']} | "
+            f"Prod {sale['codprod']} | Cant {sale['canti']} | Total {sale['vrtotal']}"
+        )
 
     def show_summary(self) -> None:
         if "report" not in self.actions:
@@ -83,24 +107,56 @@ class ReportsWindow:
             return
         period = self.period_var.get()
         start, end = self._get_dates()
-        stats = self.service.summarize_sales(period, username=self.username, start_date=start or None, end_date=end or None)
-        self.text_output.delete("1.0", tk.END)
-        if not stats:
-            self.text_output.insert(tk.END, "No hay datos para generar indicadores.\n")
-            return
-        self.text_output.insert(
-            tk.END,
-            f"Indicadores agrupados por {period}:\n\n",
+        control = QueryControl.with_default_budget()
+
+        def show(stats: list[dict]) -> None:
+            self._show_summary_result(period, stats)
+
+        self.tasks.run(
+            control.run,
+            self.service.summarize_sales,
+            period,
+            username=self.username,
+            start_date=start or None,
+            end_date=end or None,
+            key="reportes",
+            on_done=lambda outcome: self._show_outcome(outcome, show),
+            on_cancel=control.cancel,
+        )
+        self._track_progress(control)
+
+    def _track_progress(self, control: QueryControl) -> None:
+        """Show elapsed time and SQLite steps while ``control`` is running."""
+        if control.status in ("pending", "running") and self.tasks.busy:
+            if control.status == "running":
+                self.label_status.config(
+                    text=f"Consultando… {control.elapsed:.1f} s ({control.steps:,} pasos)"
+                )
+            self.master.after(200, self._track_progress, control)
+
+    def _show_outcome(self, outcome: QueryOutcome, show: Callable[[list], None]) -> None:
+        if outcome.ok:
+            show(outcome.rows)
+        else:
+            self.label_status.config(text=outcome.message)
+            self.list_output.set_rows([])
+
+    def _show_summary_result(self, period: str, stats: list[dict]) -> None:
+        self.label_status.config(
+            text=f"Indicadores agrupados por {period}:" if stats else "No hay datos para generar indicadores."
+        )
+        self.list_output.format_row = self._format_summary
+        self.list_output.set_rows(stats)
+
+    @staticmethod
+    def _format_summary(row: dict) -> str:
+        return (
+            f"Periodo: {row['periodo']} | Total ventas: {row['total_ventas']} | IVA: {row['total_iva']} | "
+            f"Clientes únicos: {row['clientes_unicos']} | Promedio por cliente: {row['promedio_por_cliente']}"
         )
-        for row in stats:
-            line = (
-                f"Periodo: {row['periodo']} | Total ventas: {row['total_ventas']} | IVA: {row['total_iva']} | "
-                f"Clientes únicos: {row['clientes_unicos']} | Promedio por cliente: {row['promedio_por_cliente']}\n"
-            )
-            self.text_output.insert(tk.END, line)
 
 
-def open_reports_window(parent, username: str, level: int) -> None:
+def open_reports_window(parent, username: Principal, level: int) -> None:
     actions = allowed_actions("reports", level)
     if "report" not in actions:
         messagebox.showwarning("Reportes", "No tiene permisos para este módulo.")
@@ -3,22 +3,26 @@
 from __future__ import annotations
 
 import tkinter as tk
-from tkinter import END, Frame, Label, Listbox, Scrollbar, Toplevel, messagebox
+from tkinter import END, Frame, Label, Toplevel, messagebox
 
+from DB.pool import APP_POOL
 from GUI.permissions import allowed_actions
+from GUI.tasks import BusyIndicator, TaskRunner
+from GUI.virtual_list import VirtualList
+from Modules.Session import Principal
 from Modules.Sales import SalesCRUD
-from Modules.Products import ProductsCRUD
+from Modules.Products import PRODUCT_CATALOG
 
 
 class SalesWindow:
     """CRUD window for ventas table, aware of user capabilities."""
 
-    def __init__(self, master: Toplevel, username: str, level: int, actions: list[str]) -> None:
+    def __init__(self, master: Toplevel, username: Principal, level: int, actions: list[str]) -> None:
         self.master = master
         self.username = username
         self.level = level
         self.actions = actions
-        self.service = SalesCRUD()
+        self.service = SalesCRUD(APP_POOL)
 
         self.master.title("Ventas")
 
@@ -72,21 +76,18 @@ class SalesWindow:
         tk.Button(buttons, text="Limpiar", command=self.clear_form).grid(row=0, column=3, padx=4)
 
         Label(frame, text="Ventas registradas").grid(row=9, column=0, columnspan=2, sticky="w", pady=(10, 0))
-        list_frame = Frame(frame)
-        list_frame.grid(row=10, column=0, columnspan=2, sticky="nsew")
-
-        self.listbox = Listbox(list_frame, width=70, height=10)
-        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.listbox.bind("<<ListboxSelect>>", self.load_selection)
-
-        scrollbar = Scrollbar(list_frame, orient=tk.VERTICAL, command=self.listbox.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.listbox.config(yscrollcommand=scrollbar.set)
+        self.list_view = VirtualList(frame, self._format_row, on_select=self.load_selection, width=70)
+        self.list_view.grid(row=10, column=0, columnspan=2, sticky="nsew")
+        self.busy = BusyIndicator(frame)
+        self.busy.grid(row=11, column=0, columnspan=2, sticky="w")
+        self.tasks = TaskRunner(master, self.busy, title="Ventas")
 
         frame.columnconfigure(1, weight=1)
         frame.rowconfigure(10, weight=1)
 
         self._apply_permissions()
+        # Carga el catálogo una vez para autocompletar sin consultas.
+        self.tasks.run(PRODUCT_CATALOG.ensure_loaded, key="productos")
         self.refresh_list()
 
     def _apply_permissions(self) -> None:
@@ -98,13 +99,19 @@ class SalesWindow:
             self.btn_delete.config(state=tk.DISABLED)
 
     def refresh_list(self) -> None:
-        self.listbox.delete(0, END)
-        for sale in self.service.list_sales(self.username):
-            row = (
-                f"{sale['id']} | {sale['fecha']} | Cliente: {sale['codclie']} | "
-                f"Prod: {sale['codprod']} | Cant: {sale['canti']} | Total: {sale['vrtotal']}"
-            )
-            self.listbox.insert(END, row)
+        # Cada página por keyset se pide en segundo plano, detrás de las
+        # escrituras pendientes sobre ventas, cuando se va a mostrar.
+        request_page = self.tasks.page_requester(
+            self.service.list_sales_page, self.username, key="ventas", token_arg="after_id"
+        )
+        self.list_view.set_async_source(request_page)
+
+    @staticmethod
+    def _format_row(sale: dict) -> str:
+        return (
+            f"{sale['id']} | {sale['fecha']} | Cliente: {sale['codclie']} | "
+            f"Prod: {sale['codprod']} | Cant: {sale['canti']} | Total: {sale['vrtotal']}"
+        )
 
     def _parse_float(self, value: str) -> float:
         try:
@@ -131,12 +138,24 @@ class SalesWindow:
         }
 
     def _on_product_change(self, event=None) -> None:
-        """When product code is entered, fetch product data and fill fields."""
+        """When product code is entered, fill the fields from the in-memory catalog."""
         codprod = self.entry_product.get().strip()
         if not codprod:
             return
-        prod_service = ProductsCRUD()
-        prod = prod_service.read_product(codprod)
+        self._fill_product(PRODUCT_CATALOG.peek(codprod))
+        if PRODUCT_CATALOG.is_stale():
+            # La recarga no bloquea el formulario; al terminar se completa de nuevo.
+            self.tasks.run(
+                PRODUCT_CATALOG.ensure_loaded,
+                key="productos",
+                on_done=lambda _result: self._refill_product(codprod),
+            )
+
+    def _refill_product(self, codprod: str) -> None:
+        if self.entry_product.get().strip() == codprod:
+            self._fill_product(PRODUCT_CATALOG.peek(codprod))
+
+    def _fill_product(self, prod) -> None:
         if not prod:
             # If product not found, don't overwrite fields but inform user
             # (silent failure is preferred in form flow).
@@ -161,7 +180,8 @@ class SalesWindow:
         if not all(required):
             messagebox.showerror("Ventas", "Complete fecha, cliente, producto y nombre.")
             return
-        ok, msg = self.service.create_sale(
+        self.tasks.run(
+            self.service.create_sale,
             data["fecha"],
             data["codclie"],
             data["codprod"],
@@ -170,12 +190,9 @@ class SalesWindow:
             data["canti"],
             vriva=data["vriva"],
             username=self.username,
+            key="ventas",
+            on_done=self._on_saved,
         )
-        if ok:
-            messagebox.showinfo("Ventas", msg)
-            self.refresh_list()
-        else:
-            messagebox.showerror("Ventas", msg)
 
     def update_sale(self) -> None:
         if "update" not in self.actions:
@@ -185,7 +202,8 @@ class SalesWindow:
         if not data["sale_id"]:
             messagebox.showerror("Ventas", "Seleccione una venta.")
             return
-        ok, msg = self.service.update_sale(
+        self.tasks.run(
+            self.service.update_sale,
             int(data["sale_id"]),
             data["fecha"],
             data["codclie"],
@@ -195,12 +213,9 @@ class SalesWindow:
             data["canti"],
             vriva=data["vriva"],
             username=self.username,
+            key="ventas",
+            on_done=self._on_saved,
         )
-        if ok:
-            messagebox.showinfo("Ventas", msg)
-            self.refresh_list()
-        else:
-            messagebox.showerror("Ventas", msg)
 
     def delete_sale(self) -> None:
         if "delete" not in self.actions:
@@ -210,20 +225,30 @@ class SalesWindow:
         if not sale_id:
             messagebox.showerror("Ventas", "Seleccione una venta.")
             return
-        ok, msg = self.service.delete_sale(int(sale_id), username=self.username)
+        self.tasks.run(
+            self.service.delete_sale,
+            int(sale_id),
+            username=self.username,
+            key="ventas",
+            on_done=lambda result: self._on_saved(result, clear=True),
+        )
+
+    def _on_saved(self, result: tuple[bool, str], clear: bool = False) -> None:
+        ok, msg = result
         if ok:
             messagebox.showinfo("Ventas", msg)
-            self.clear_form()
+            if clear:
+                self.clear_form()
             self.refresh_list()
         else:
             messagebox.showerror("Ventas", msg)
 
-    def load_selection(self, event) -> None:
-        selection = event.widget.curselection()
-        if not selection:
-            return
-        sale_id = event.widget.get(selection[0]).split(" |")[0]
-        sale = self.service.read_sale(int(sale_id), username=self.username)
+    def load_selection(self, row: dict) -> None:
+        self.tasks.run(
+            self.service.read_sale, row["id"], username=self.username, key="ventas", on_done=self._fill_form
+        )
+
+    def _fill_form(self, sale) -> None:
         if not sale:
             return
         self.entry_id.delete(0, END)
@@ -257,7 +282,7 @@ class SalesWindow:
             entry.delete(0, END)
 
 
-def open_sales_window(parent, username: str, level: int) -> None:
+def open_sales_window(parent, username: Principal, level: int) -> None:
     actions = allowed_actions("sales", level)
     if not actions:
         messagebox.showwarning("Ventas", "No tiene permisos para este módulo.")
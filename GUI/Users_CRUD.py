@@ -1,7 +1,11 @@
 import tkinter as tk
-from tkinter import END, Frame, Label, Listbox, Spinbox, Toplevel, messagebox
+from tkinter import END, Frame, Label, Spinbox, Toplevel, messagebox
 
+from DB.pool import APP_POOL
 from GUI.permissions import allowed_actions
+from GUI.tasks import BusyIndicator, TaskRunner
+from GUI.virtual_list import VirtualList
+from Modules.Session import Principal
 from Modules.Users import UsersCRUD
 
 
@@ -9,7 +13,7 @@ class UsersWindow:
     """Ventana CRUD para administrar usuarios respetando privilegios."""
 
     def __init__(self, master: Toplevel, actions: list[str]) -> None:
-        self._service = UsersCRUD()
+        self._service = UsersCRUD(APP_POOL)
         self.master = master
         self.actions = actions
         self.master.title("Administrar usuarios")
@@ -40,9 +44,17 @@ class UsersWindow:
         self.btn_delete.grid(row=0, column=2, padx=4)
 
         Label(container, text="Usuarios registrados").grid(row=4, column=0, columnspan=2, sticky="w", pady=(10, 0))
-        self.listbox_users = Listbox(container, width=40, height=8)
-        self.listbox_users.grid(row=5, column=0, columnspan=2, sticky="nsew")
-        self.listbox_users.bind("<<ListboxSelect>>", self.load_selection)
+        self.list_users = VirtualList(
+            container,
+            lambda user: f"{user['nomusu']} (Nivel {user['nivel']})",
+            on_select=self.load_selection,
+            height=8,
+            width=40,
+        )
+        self.list_users.grid(row=5, column=0, columnspan=2, sticky="nsew")
+        self.busy = BusyIndicator(container)
+        self.busy.grid(row=6, column=0, columnspan=2, sticky="w")
+        self.tasks = TaskRunner(self.master, self.busy, title="Usuarios")
 
         container.columnconfigure(1, weight=1)
         container.rowconfigure(5, weight=1)
@@ -59,9 +71,9 @@ class UsersWindow:
             self.btn_delete.config(state=tk.DISABLED)
 
     def refresh_users(self) -> None:
-        self.listbox_users.delete(0, END)
-        for user in self._service.list_users():
-            self.listbox_users.insert(END, f"{user['nomusu']} (Nivel {user['nivel']})")
+        # Las páginas se piden en segundo plano a medida que se muestran.
+        request_page = self.tasks.page_requester(self._service.list_users_page, key="usuarios")
+        self.list_users.set_async_source(request_page, first_token=None)
 
     def _get_form_data(self) -> tuple[str, str, int]:
         username = self.entry_username.get().strip()
@@ -76,13 +88,7 @@ class UsersWindow:
         if not username or not password:
             messagebox.showerror("Usuarios", "Usuario y contraseña son obligatorios.")
             return
-        ok, msg = self._service.create_user(username, password, level)
-        if ok:
-            messagebox.showinfo("Usuarios", msg)
-            self.entry_password.delete(0, END)
-            self.refresh_users()
-        else:
-            messagebox.showerror("Usuarios", msg)
+        self.tasks.run(self._service.create_user, username, password, level, key="usuarios", on_done=self._on_saved)
 
     def update_user(self) -> None:
         if "update" not in self.actions:
@@ -93,13 +99,9 @@ class UsersWindow:
             messagebox.showerror("Usuarios", "Debe seleccionar o ingresar un usuario.")
             return
         password_arg = password or None
-        ok, msg = self._service.update_user(username, password_arg, level)
-        if ok:
-            messagebox.showinfo("Usuarios", msg)
-            self.entry_password.delete(0, END)
-            self.refresh_users()
-        else:
-            messagebox.showerror("Usuarios", msg)
+        self.tasks.run(
+            self._service.update_user, username, password_arg, level, key="usuarios", on_done=self._on_saved
+        )
 
     def delete_user(self) -> None:
         if "delete" not in self.actions:
@@ -109,22 +111,28 @@ class UsersWindow:
         if not username:
             messagebox.showerror("Usuarios", "Debe elegir un usuario para eliminar.")
             return
-        ok, msg = self._service.delete_user(username)
+        self.tasks.run(
+            self._service.delete_user,
+            username,
+            key="usuarios",
+            on_done=lambda result: self._on_saved(result, clear_username=True),
+        )
+
+    def _on_saved(self, result: tuple[bool, str], clear_username: bool = False) -> None:
+        ok, msg = result
         if ok:
             messagebox.showinfo("Usuarios", msg)
-            self.entry_username.delete(0, END)
+            if clear_username:
+                self.entry_username.delete(0, END)
             self.entry_password.delete(0, END)
             self.refresh_users()
         else:
             messagebox.showerror("Usuarios", msg)
 
-    def load_selection(self, event) -> None:
-        selection = event.widget.curselection()
-        if not selection:
-            return
-        value = event.widget.get(selection[0])
-        username = value.split(" ")[0]
-        user = self._service.read_user(username)
+    def load_selection(self, row: dict) -> None:
+        self.tasks.run(self._service.read_user, row["nomusu"], key="usuarios", on_done=self._fill_form)
+
+    def _fill_form(self, user) -> None:
         if not user:
             return
         self.entry_username.delete(0, END)
@@ -134,7 +142,7 @@ class UsersWindow:
         self.entry_password.delete(0, END)
 
 
-def open_users_window(parent, username: str, level: int) -> None:
+def open_users_window(parent, username: Principal, level: int) -> None:
     actions = allowed_actions("users", level)
     if not actions:
         messagebox.showwarning("Usuarios", "No tiene permisos para usar este módulo.")
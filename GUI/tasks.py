@@ -0,0 +1,214 @@
+"""Run CRUD service calls off the Tk main loop and deliver results back to it.
+
+``KeyedExecutor`` runs callables on a small thread pool. Calls submitted
+with the same key (the table they touch) run one after another in
+submission order, so a refresh queued after a write always sees it; calls
+with different keys run in parallel.
+
+``TaskRunner`` belongs to one window. It submits work to the shared
+executor, polls the returned futures with ``after()`` and invokes the
+callbacks on the Tk thread, and drives a ``BusyIndicator`` while work is
+pending. Cancelling drops queued calls. A running call given an
+``on_cancel`` hook (e.g. ``QueryControl.cancel``) is asked to stop and
+still reports its result; other running calls have their result
+discarded. Closing the window cancels everything it owns.
+"""
+
+from __future__ import annotations
+
+import threading
+import tkinter as tk
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from tkinter import Frame, messagebox
+from typing import Any, Callable, Hashable, Optional
+
+POLL_INTERVAL_MS = 50
+
+
+class KeyedExecutor:
+    """Thread pool that keeps FIFO order among calls sharing a key."""
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._lanes: dict[Hashable, deque] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: Optional[Hashable], fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        """Schedule ``fn(*args, **kwargs)``; calls with the same ``key`` never overlap."""
+        future: Future = Future()
+        item = (future, fn, args, kwargs)
+        if key is None:
+            self._pool.submit(self._run, None, item)
+            return future
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is not None:
+                lane.append(item)
+                return future
+            self._lanes[key] = deque()
+        self._pool.submit(self._run, key, item)
+        return future
+
+    def _run(self, key: Optional[Hashable], item: tuple) -> None:
+        future, fn, args, kwargs = item
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as exc:  # se entrega al hilo de la interfaz
+                future.set_exception(exc)
+        if key is None:
+            return
+        with self._lock:
+            lane = self._lanes[key]
+            if not lane:
+                del self._lanes[key]
+                return
+            next_item = lane.popleft()
+        self._pool.submit(self._run, key, next_item)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+DB_EXECUTOR = KeyedExecutor()
+
+
+class BusyIndicator(Frame):
+    """In-window "working" label with a button that cancels pending work."""
+
+    def __init__(self, master, on_cancel: Optional[Callable[[], None]] = None) -> None:
+        super().__init__(master)
+        self.label = tk.Label(self, text="", fg="gray25")
+        self.label.pack(side=tk.LEFT)
+        self.btn_cancel = tk.Button(self, text="Cancelar", command=on_cancel)
+
+    def set_busy(self, pending: int) -> None:
+        if pending:
+            self.label.config(text=f"Procesando… ({pending})")
+            if not self.btn_cancel.winfo_ismapped():
+                self.btn_cancel.pack(side=tk.LEFT, padx=(6, 0))
+        else:
+            self.label.config(text="")
+            self.btn_cancel.pack_forget()
+
+
+class TaskRunner:
+    """Per-window bridge between Tk callbacks and ``DB_EXECUTOR``."""
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        indicator: Optional[BusyIndicator] = None,
+        title: str = "",
+        executor: KeyedExecutor = DB_EXECUTOR,
+    ) -> None:
+        self.master = master
+        self.indicator = indicator
+        self.title = title
+        self.executor = executor
+        self._pending: list[tuple[Future, Optional[Callable], Optional[Callable], Optional[Callable]]] = []
+        self._after_id: Optional[str] = None
+        self._closed = False
+        if indicator is not None:
+            indicator.btn_cancel.config(command=self.cancel_all)
+        master.bind("<Destroy>", self._on_destroy, add="+")
+
+    def run(
+        self,
+        fn: Callable,
+        *args: Any,
+        key: Optional[Hashable] = None,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        on_cancel: Optional[Callable[[], None]] = None,
+        **kwargs: Any,
+    ) -> Future:
+        """Run ``fn`` in the background and call ``on_done(result)`` on the Tk thread."""
+        future = self.executor.submit(key, fn, *args, **kwargs)
+        if self._closed:
+            future.cancel()
+            return future
+        self._pending.append((future, on_done, on_error, on_cancel))
+        self._update_indicator()
+        if self._after_id is None:
+            self._after_id = self.master.after(POLL_INTERVAL_MS, self._poll)
+        return future
+
+    def page_requester(
+        self,
+        fn: Callable,
+        *args: Any,
+        key: Optional[Hashable] = None,
+        token_arg: str = "after",
+        **kwargs: Any,
+    ) -> Callable[[Any, int, Callable], Future]:
+        """Adapt a paged service call to ``VirtualList.set_async_source``.
+
+        ``fn`` is called as ``fn(*args, <token_arg>=token, limit=limit, **kwargs)``
+        and must return ``(rows, next_token)``; failures are reported like any
+        other task and delivered to the list as a missing page.
+        """
+
+        def request_page(token: Any, limit: int, deliver: Callable) -> Future:
+            def failed(error: BaseException) -> None:
+                deliver(None)
+                self._show_error(error)
+
+            return self.run(fn, *args, key=key, on_done=deliver, on_error=failed, limit=limit, **{token_arg: token}, **kwargs)
+
+        return request_page
+
+    def cancel_all(self) -> None:
+        """Drop queued calls and stop or ignore the running ones."""
+        remaining = []
+        for entry in self._pending:
+            future, on_cancel = entry[0], entry[3]
+            if future.cancel():
+                continue
+            if on_cancel is not None:
+                on_cancel()
+                if not self._closed:
+                    remaining.append(entry)
+        self._pending = remaining
+        self._update_indicator()
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._pending)
+
+    def _poll(self) -> None:
+        self._after_id = None
+        if self._closed:
+            return
+        finished, pending = [], []
+        for entry in self._pending:
+            (finished if entry[0].done() else pending).append(entry)
+        self._pending = pending
+        for future, on_done, on_error, _ in finished:
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                (on_error or self._show_error)(error)
+            elif on_done is not None:
+                on_done(future.result())
+        self._update_indicator()
+        if self._pending and not self._closed:
+            self._after_id = self.master.after(POLL_INTERVAL_MS, self._poll)
+
+    def _show_error(self, error: BaseException) -> None:
+        messagebox.showerror(self.title or "Error", f"Error inesperado: {error}")
+
+    def _update_indicator(self) -> None:
+        if self.indicator is not None and not self._closed:
+            self.indicator.set_busy(len(self._pending))
+
+    def _on_destroy(self, event) -> None:
+        if event.widget is not self.master:
+            return
+        self._closed = True
+        self.cancel_all()
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+            self._after_id = None
@@ -0,0 +1,327 @@
+"""Virtualized list widget that renders only the visible rows of a paged source.
+
+A page loader has the same shape as ``SalesCRUD.list_sales_page``: it is
+called as ``load_page(token, limit)`` and returns ``(rows, next_token)``,
+where ``next_token`` is None after the last page. ``PagedRows`` remembers
+the start token of every page it has walked past and keeps only a few
+pages in memory, so any row can be fetched again with one keyset query.
+``VirtualList`` draws the visible slice into a Listbox and drives its own
+scrollbar, asking for more pages only as the user scrolls.
+
+With ``VirtualList.set_async_source`` pages are requested in the
+background instead (e.g. through a window's ``TaskRunner``): rows whose
+page has not arrived yet are drawn as placeholders and the list redraws
+itself when the page is delivered, so scrolling never blocks the Tk thread.
+"""
+
+from __future__ import annotations
+
+import tkinter as tk
+import tkinter.font as tkfont
+from collections import OrderedDict
+from concurrent.futures import Future
+from tkinter import Frame, Listbox, Scrollbar
+from typing import Any, Callable, Optional, Sequence
+
+PageLoader = Callable[[Any, int], "tuple[list[dict], Any]"]
+# request_page(token, limit, deliver): starts the load and returns at once,
+# optionally with its Future; deliver((rows, next_token)) runs later on the
+# Tk thread, deliver(None) on failure. Cancelled requests are sent again.
+AsyncPageLoader = Callable[[Any, int, Callable[[Optional[tuple]], None]], Any]
+
+PLACEHOLDER = "Cargando…"
+
+
+def list_page_loader(rows: Sequence[dict]) -> PageLoader:
+    """Adapt an already loaded list (e.g. a cached listing) to a page loader."""
+
+    def load_page(offset: int, limit: int) -> tuple[list[dict], Optional[int]]:
+        end = offset + limit
+        return list(rows[offset:end]), end if end < len(rows) else None
+
+    return load_page
+
+
+class PagedRows:
+    """Random access over a keyset-paged source with a bounded page cache.
+
+    ``load_page`` may be None when the caller fetches pages itself and hands
+    them over with ``store``; only ``cached_rows`` is usable then.
+    """
+
+    def __init__(
+        self,
+        load_page: Optional[PageLoader],
+        page_size: int = 200,
+        first_token: Any = 0,
+        max_pages: int = 8,
+    ) -> None:
+        self._load_page = load_page
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._tokens: list[Any] = [first_token]
+        self._pages: OrderedDict[int, list[dict]] = OrderedDict()
+        self.total: Optional[int] = None
+        self.loads = 0
+
+    def estimated_count(self) -> int:
+        """Exact count once the last page was seen, otherwise a lower bound plus one page."""
+        if self.total is not None:
+            return self.total
+        return len(self._tokens) * self.page_size
+
+    def _page(self, number: int) -> list[dict]:
+        rows = self._pages.get(number)
+        if rows is not None:
+            self._pages.move_to_end(number)
+            return rows
+        rows, next_token = self._load_page(self._tokens[number], self.page_size)
+        self.store(number, rows, next_token)
+        return rows
+
+    def token(self, number: int) -> Any:
+        """Start token of page ``number``; known for every page up to the first unseen one."""
+        return self._tokens[number]
+
+    def store(self, number: int, rows: list[dict], next_token: Any) -> None:
+        """Record page ``number`` as returned by the page loader."""
+        self.loads += 1
+        if number == len(self._tokens) - 1:
+            if next_token is None:
+                self.total = number * self.page_size + len(rows)
+            else:
+                self._tokens.append(next_token)
+        self._pages[number] = rows
+        self._pages.move_to_end(number)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def reach(self, index: int) -> None:
+        """Walk forward until row ``index`` is known to exist or the source ends."""
+        while self.total is None and index >= (len(self._tokens) - 1) * self.page_size:
+            self._page(len(self._tokens) - 1)
+
+    def rows(self, start: int, stop: int) -> list[dict]:
+        """Return rows ``start`` to ``stop`` (exclusive), clipped to the source size."""
+        self.reach(stop - 1)
+        stop = min(stop, self.estimated_count())
+        result = []
+        index = start
+        while index < stop:
+            number, offset = divmod(index, self.page_size)
+            page = self._page(number)
+            chunk = page[offset:offset + stop - index]
+            if not chunk:
+                break
+            result.extend(chunk)
+            index += len(chunk)
+        return result
+
+    def cached_rows(self, start: int, stop: int) -> tuple[list[Optional[dict]], list[int]]:
+        """Return rows ``start`` to ``stop`` without loading anything.
+
+        Rows of pages that are not in memory come back as None, and the
+        numbers of those pages are returned alongside so they can be
+        requested; the range is clipped to ``estimated_count``.
+        """
+        stop = min(stop, self.estimated_count())
+        result: list[Optional[dict]] = []
+        missing: list[int] = []
+        index = start
+        while index < stop:
+            number, offset = divmod(index, self.page_size)
+            span = min(stop - index, self.page_size - offset)
+            page = self._pages.get(number)
+            if page is None:
+                missing.append(number)
+                result.extend([None] * span)
+            else:
+                self._pages.move_to_end(number)
+                chunk = page[offset:offset + span]
+                result.extend(chunk)
+                if len(chunk) < span:
+                    break
+            index += span
+        return result, missing
+
+
+class VirtualList(Frame):
+    """Listbox replacement that fetches and draws rows on demand."""
+
+    def __init__(
+        self,
+        master,
+        format_row: Callable[[dict], str],
+        on_select: Optional[Callable[[dict], None]] = None,
+        page_size: int = 200,
+        height: int = 10,
+        width: int = 50,
+    ) -> None:
+        super().__init__(master)
+        self.format_row = format_row
+        self.on_select = on_select
+        self.page_size = page_size
+        self.source: Optional[PagedRows] = None
+        self._request_page: Optional[AsyncPageLoader] = None
+        self._requested: dict[int, Any] = {}
+        self.top = 0
+        self.selected: Optional[int] = None
+        self._visible = height
+
+        self.listbox = Listbox(self, height=height, width=width, exportselection=False)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.listbox.bind("<Configure>", self._on_resize)
+        self.listbox.bind("<MouseWheel>", self._on_mousewheel)
+        self.listbox.bind("<Button-4>", lambda _event: self.scroll(-3))
+        self.listbox.bind("<Button-5>", lambda _event: self.scroll(3))
+        self.listbox.bind("<Up>", lambda _event: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda _event: self._move_selection(1))
+        self.listbox.bind("<Prior>", lambda _event: self._move_selection(-self._visible))
+        self.listbox.bind("<Next>", lambda _event: self._move_selection(self._visible))
+
+    def set_source(self, load_page: PageLoader, first_token: Any = 0) -> None:
+        """Show a new data source from its first row."""
+        self._show(PagedRows(load_page, self.page_size, first_token), None)
+
+    def set_async_source(
+        self,
+        request_page: AsyncPageLoader,
+        first_token: Any = 0,
+        first_page: Optional[tuple[list[dict], Any]] = None,
+    ) -> None:
+        """Show a source whose pages are fetched in the background.
+
+        ``first_page`` is an already fetched ``(rows, next_token)`` for
+        ``first_token``; every other page goes through ``request_page`` and
+        is drawn as placeholders until it is delivered.
+        """
+        source = PagedRows(None, self.page_size, first_token)
+        if first_page is not None:
+            source.store(0, *first_page)
+        self._show(source, request_page)
+
+    def _show(self, source: PagedRows, request_page: Optional[AsyncPageLoader]) -> None:
+        self.source = source
+        self._request_page = request_page
+        self._requested = {}
+        self.top = 0
+        self.selected = None
+        self.render()
+
+    def set_rows(self, rows: Sequence[dict]) -> None:
+        """Show an in-memory list; only the visible rows are formatted."""
+        self.set_source(list_page_loader(rows))
+
+    def selected_row(self) -> Optional[dict]:
+        if self.source is None or self.selected is None:
+            return None
+        if self._request_page is None:
+            rows = self.source.rows(self.selected, self.selected + 1)
+        else:
+            rows = self.source.cached_rows(self.selected, self.selected + 1)[0]
+        return rows[0] if rows else None
+
+    def _request(self, number: int) -> None:
+        if number in self._requested:
+            pending = self._requested[number]
+            if not (isinstance(pending, Future) and pending.cancelled()):
+                return
+        source = self.source
+
+        def deliver(page: Optional[tuple[list[dict], Any]]) -> None:
+            if source is not self.source:
+                return  # llegó tarde: la lista ya muestra otra fuente
+            self._requested.pop(number, None)
+            if page is not None:
+                source.store(number, *page)
+                self.render()
+
+        self._requested[number] = None
+        request = self._request_page(source.token(number), self.page_size, deliver)
+        if number in self._requested:
+            self._requested[number] = request
+
+    def render(self) -> None:
+        self.listbox.delete(0, tk.END)
+        if self.source is None:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        if self._request_page is None:
+            self.source.reach(self.top + self._visible)
+        count = self.source.estimated_count()
+        self.top = max(0, min(self.top, count - self._visible))
+        missing: list[int] = []
+        if self._request_page is None:
+            rows = self.source.rows(self.top, self.top + self._visible)
+        else:
+            rows, missing = self.source.cached_rows(self.top, self.top + self._visible)
+        for row in rows:
+            self.listbox.insert(tk.END, PLACEHOLDER if row is None else self.format_row(row))
+        if self.selected is not None and self.top <= self.selected < self.top + len(rows):
+            self.listbox.selection_set(self.selected - self.top)
+        if count:
+            self.scrollbar.set(self.top / count, min(1.0, (self.top + len(rows)) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        # Se piden al final: una entrega inmediata vuelve a llamar a render().
+        for number in missing:
+            self._request(number)
+
+    def scroll(self, delta: int) -> str:
+        self.top = max(0, self.top + delta)
+        self.render()
+        return "break"
+
+    def _on_scrollbar(self, action: str, value: str, unit: Optional[str] = None) -> None:
+        if self.source is None:
+            return
+        if action == "moveto":
+            self.top = int(float(value) * self.source.estimated_count())
+            self.render()
+        elif action == "scroll":
+            step = self._visible if unit == "pages" else 1
+            self.scroll(int(value) * step)
+
+    def _on_mousewheel(self, event) -> str:
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event) -> None:
+        linespace = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace")
+        visible = max(1, event.height // (linespace + 1))
+        if visible != self._visible:
+            self._visible = visible
+            self.render()
+
+    def _on_listbox_select(self, _event) -> None:
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        self.selected = self.top + selection[0]
+        self._notify()
+
+    def _move_selection(self, delta: int) -> str:
+        if self.source is None:
+            return "break"
+        target = max(0, (self.top if self.selected is None else self.selected) + delta)
+        if self._request_page is None:
+            self.source.reach(target)
+        target = min(target, self.source.estimated_count() - 1)
+        if target < 0:
+            return "break"
+        self.selected = target
+        if target < self.top:
+            self.top = target
+        elif target >= self.top + self._visible:
+            self.top = target - self._visible + 1
+        self.render()
+        self._notify()
+        return "break"
+
+    def _notify(self) -> None:
+        row = self.selected_row()
+        if row is not None and self.on_select is not None:
+            self.on_select(row)
@@ -1,106 +1,29 @@
-"""Punto de entrada para iniciar la aplicación con datos precargados."""
+"""Punto de entrada de la aplicación; los datos de ejemplo se cargan con ``--seed``."""
 
 from __future__ import annotations
 
-from DB.connection import get_connection
+import argparse
+import os
+
+from DB.cache import TABLE_VERSIONS
+from DB.connection import describe_profile, get_connection
 from DB.init_db import initialize_database
+from DB.metrics import METRICS_PORT_ENV_VAR_NAME, start_metrics_server
+from DB.pool import APP_POOL
+from DB.schema import SCHEMA_REGISTRY
+from DB.unit_of_work import unit_of_work
 from GUI.Login import login_window
 from GUI.Main_Menu import open_main_menu
-from Modules.Custumers import create_client, update_client
-from Modules.Inventarios import InventoriesCRUD
-from Modules.Products import ProductsCRUD
-from Modules.Providers import ProvidersCRUD
-from Modules.Sales import SalesCRUD
-from Modules.Users import UsersCRUD
-
-
-def _table_has_rows(table: str) -> bool:
-    conn = get_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(f"SELECT COUNT(1) FROM {table}")
-        count = cur.fetchone()[0]
-        return count > 0
-    finally:
-        conn.close()
+from Modules.Session import SESSIONS
+from Modules.Users import USER_LEVEL_CACHE, hash_password
 
 
 def seed_demo_data() -> None:
-    """Insert demo rows for every table, ensuring a rich baseline dataset."""
-
-    users = UsersCRUD()
-    products = ProductsCRUD()
-    providers = ProvidersCRUD()
-    inventories = InventoriesCRUD()
-    sales = SalesCRUD()
-
-    def ensure_user(username: str, password: str, level: int) -> None:
-        record = users.read_user(username)
-        if record is None:
-            users.create_user(username, password, level)
-            return
-        current_level = int(record.get("nivel", level))
-        if current_level != level:
-            users.update_user(username, None, level)
-
-    def ensure_client(codclie: str, nomclie: str, direc: str, telef: str, ciudad: str) -> None:
-        ok, _ = create_client(codclie, nomclie, direc, telef, ciudad)
-        if not ok:
-            update_client(codclie, nomclie, direc, telef, ciudad)
-
-    def ensure_product(data: dict) -> None:
-        ok, _ = products.create_product(
-            data["codprod"],
-            data["nomprod"],
-            data["descripcion"],
-            data["iva"],
-            data["costovta"],
-        )
-        if not ok:
-            products.update_product(
-                data["codprod"],
-                data["nomprod"],
-                data["descripcion"],
-                data["iva"],
-                data["costovta"],
-            )
+    """Upsert the demo rows for every table in a single transaction.
 
-    def ensure_provider(entry: tuple[str, str, str, float, str, str]) -> None:
-        ok, _ = providers.create_provider(*entry)
-        if not ok:
-            providers.update_provider(*entry)
-
-    def ensure_inventory(entry: tuple[str, int, int, float, float]) -> None:
-        codprod, cantidad, stock_minimo, iva, costovta = entry
-        ok, _ = inventories.create_inventory(
-            codprod,
-            cantidad=cantidad,
-            stock_minimo=stock_minimo,
-            iva=iva,
-            costovta=costovta,
-            username="manager",
-        )
-        if not ok:
-            inventories.update_inventory(
-                codprod,
-                cantidad,
-                stock_minimo,
-                iva,
-                costovta,
-                username="manager",
-            )
-
-    def sale_exists(fecha: str, codclie: str, codprod: str, canti: int) -> bool:
-        conn = get_connection()
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT 1 FROM ventas WHERE fecha = ? AND codclie = ? AND codprod = ? AND canti = ?",
-                (fecha, codclie, codprod, canti),
-            )
-            return cur.fetchone() is not None
-        finally:
-            conn.close()
+    Existing rows are updated in place (users keep their password, only the
+    level is refreshed), so the command can be repeated safely.
+    """
 
     user_records = [
         ("admin", "Admin123", 1),
@@ -114,9 +37,6 @@ def seed_demo_data() -> None:
         ("logistics", "Logistic123", 3),
         ("support", "Support123", 3),
     ]
-    for username, password, level in user_records:
-        ensure_user(username, password, level)
-
     client_data = [
         ("C001", "Comercial Andina", "Cra 10 #10-10", "5551000", "Bogotá"),
         ("C002", "Servicios Delta", "Av 45 #20-15", "5552000", "Medellín"),
@@ -129,9 +49,6 @@ def seed_demo_data() -> None:
         ("C009", "Mercantil Prisma", "Carrera 9 #70-15", "5553007", "Bogotá"),
         ("C010", "Grupo Horizonte", "Av 3N #45-50", "5553008", "Cali"),
     ]
-    for codclie, nomclie, direc, telef, ciudad in client_data:
-        ensure_client(codclie, nomclie, direc, telef, ciudad)
-
     product_data = [
         {"codprod": "P001", "nomprod": "Teclado Atlas", "descripcion": "Teclado mecánico 87 teclas", "iva": 0.19, "costovta": 120.0},
         {"codprod": "P002", "nomprod": "Mouse Nebula", "descripcion": "Mouse óptico gamer", "iva": 0.19, "costovta": 60.0},
@@ -144,9 +61,6 @@ def seed_demo_data() -> None:
         {"codprod": "P009", "nomprod": "USB Hyper 128", "descripcion": "Memoria USB 128GB 3.2", "iva": 0.19, "costovta": 32.0},
         {"codprod": "P010", "nomprod": "Silla ErgoFlex", "descripcion": "Silla ergonómica de oficina", "iva": 0.19, "costovta": 380.0},
     ]
-    for product in product_data:
-        ensure_product(product)
-
     provider_data = [
         ("PR001", "P001", "Distribuidor oficial", 95.0, "Calle 50 #20-30", "5553000"),
         ("PR002", "P002", "Mayorista periféricos", 45.0, "Carrera 40 #15-25", "5554000"),
@@ -159,9 +73,6 @@ def seed_demo_data() -> None:
         ("PR009", "P009", "Componentes flash", 20.0, "Calle 45 #18-33", "5554700"),
         ("PR010", "P010", "Mobiliario corporativo", 298.0, "Av 68 #95-05", "5554800"),
     ]
-    for provider in provider_data:
-        ensure_provider(provider)
-
     inventory_data = [
         ("P001", 40, 10, 0.19, 120.0),
         ("P002", 60, 15, 0.19, 60.0),
@@ -174,10 +85,6 @@ def seed_demo_data() -> None:
         ("P009", 120, 30, 0.19, 32.0),
         ("P010", 22, 6, 0.19, 380.0),
     ]
-    for inventory_entry in inventory_data:
-        ensure_inventory(inventory_entry)
-
-    product_lookup = {product["codprod"]: product for product in product_data}
     sales_entries = [
         {"fecha": "2025-01-05", "codclie": "C001", "codprod": "P001", "canti": 2},
         {"fecha": "2025-01-07", "codclie": "C002", "codprod": "P003", "canti": 1},
@@ -190,37 +97,138 @@ def seed_demo_data() -> None:
         {"fecha": "2025-03-10", "codclie": "C009", "codprod": "P009", "canti": 10},
         {"fecha": "2025-03-22", "codclie": "C010", "codprod": "P010", "canti": 2},
     ]
+
+    user_rows = []
+    for username, password, level in user_records:
+        salt = os.urandom(16).hex()
+        user_rows.append((username, hash_password(password, salt), salt, level))
+
+    product_lookup = {product["codprod"]: product for product in product_data}
+    sale_rows = []
     for entry in sales_entries:
         product = product_lookup[entry["codprod"]]
-        unit_price = product["costovta"]
-        iva_rate = product["iva"]
-        subtotal = round(unit_price * entry["canti"], 2)
-        iva_value = round(subtotal * iva_rate, 2)
+        subtotal = round(product["costovta"] * entry["canti"], 2)
+        iva_value = round(subtotal * product["iva"], 2)
         total = round(subtotal + iva_value, 2)
-        if sale_exists(entry["fecha"], entry["codclie"], entry["codprod"], entry["canti"]):
-            continue
-        sales.create_sale(
-            fecha=entry["fecha"],
-            codclie=entry["codclie"],
-            codprod=entry["codprod"],
-            nomprod=product["nomprod"],
-            costovta=unit_price,
-            canti=entry["canti"],
-            vriva=iva_value,
-            subtotal=subtotal,
-            vrtotal=total,
-            username="manager",
+        key = (entry["fecha"], entry["codclie"], entry["codprod"], entry["canti"])
+        sale_rows.append(
+            key[:3] + (product["nomprod"], product["costovta"], entry["canti"], iva_value, subtotal, total) + key
+        )
+
+    with unit_of_work() as unit:
+        cur = unit.connection.cursor()
+        cur.executemany(
+            """
+            INSERT INTO usuarios (nomusu, clave, salt, nivel) VALUES (?, ?, ?, ?)
+            ON CONFLICT (nomusu) DO UPDATE SET nivel = excluded.nivel
+            """,
+            user_rows,
+        )
+        cur.executemany(
+            """
+            INSERT INTO clientes (codclie, nomclie, direc, telef, ciudad) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (codclie) DO UPDATE SET
+                nomclie = excluded.nomclie, direc = excluded.direc,
+                telef = excluded.telef, ciudad = excluded.ciudad
+            """,
+            client_data,
+        )
+        cur.executemany(
+            """
+            INSERT INTO productos (codprod, nomprod, descripcion, iva, costovta)
+            VALUES (:codprod, :nomprod, :descripcion, :iva, :costovta)
+            ON CONFLICT (codprod) DO UPDATE SET
+                nomprod = excluded.nomprod, descripcion = excluded.descripcion,
+                iva = excluded.iva, costovta = excluded.costovta
+            """,
+            product_data,
+        )
+        cur.executemany(
+            """
+            INSERT INTO proveedores (idprov, codprod, descripcion, costo, direccion, telefono)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (idprov) DO UPDATE SET
+                codprod = excluded.codprod, descripcion = excluded.descripcion, costo = excluded.costo,
+                direccion = excluded.direccion, telefono = excluded.telefono
+            """,
+            provider_data,
+        )
+        cur.executemany(
+            """
+            INSERT INTO inventarios (codprod, nomprod, cantidad, stock_minimo, iva, costovta)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (codprod) DO UPDATE SET
+                nomprod = excluded.nomprod, cantidad = excluded.cantidad,
+                stock_minimo = excluded.stock_minimo, iva = excluded.iva, costovta = excluded.costovta
+            """,
+            [
+                (codprod, product_lookup[codprod]["nomprod"], cantidad, stock_minimo, iva, costovta)
+                for codprod, cantidad, stock_minimo, iva, costovta in inventory_data
+            ],
+        )
+        # ventas no tiene clave natural: una venta de ejemplo se omite si ya existe.
+        cur.executemany(
+            """
+            INSERT INTO ventas (fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal)
+            SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM ventas WHERE fecha = ? AND codclie = ? AND codprod = ? AND canti = ?
+            )
+            """,
+            sale_rows,
         )
+    TABLE_VERSIONS.bump("usuarios", "clientes", "productos", "proveedores", "inventarios", "ventas")
+    USER_LEVEL_CACHE.invalidate()
+    SESSIONS.revoke()
+
+
+def _start_metrics(port: str) -> None:
+    """Expose ``/metrics`` on ``port``; a bad or busy port only prints a warning."""
+    try:
+        server = start_metrics_server(int(port))
+    except (ValueError, OSError) as exc:
+        print(f"Aviso: no se pudo iniciar el endpoint de métricas en el puerto {port!r} ({exc}); se continúa sin él.")
+        return
+    print(f"Métricas disponibles en http://127.0.0.1:{server.server_address[1]}/metrics")
+
+
+def _has_users() -> bool:
+    conn = get_connection()
+    try:
+        return conn.execute("SELECT 1 FROM usuarios LIMIT 1").fetchone() is not None
+    finally:
+        conn.close()
+
 
+def main(argv: list[str] | None = None) -> None:
+    """Inicializa la base de datos y abre la ventana de login (``--seed`` carga datos de ejemplo)."""
 
-def main() -> None:
-    """Inicializa la base de datos, aplica datos de ejemplo y abre la ventana de login."""
+    parser = argparse.ArgumentParser(description="Sistema de inventario y ventas.")
+    parser.add_argument(
+        "--seed",
+        action="store_true",
+        help="Carga o actualiza los datos de ejemplo en una sola transacción y termina.",
+    )
+    args = parser.parse_args(argv)
 
+    print(describe_profile())
+    metrics_port = os.getenv(METRICS_PORT_ENV_VAR_NAME)
+    if metrics_port and not args.seed:
+        _start_metrics(metrics_port)
+    # Con el esquema al día esto solo lee PRAGMA user_version.
     initialize_database()
-    seed_demo_data()
-    username, level = login_window()
-    if username and level is not None:
-        open_main_menu(username, level)
+    SCHEMA_REGISTRY.verify()
+    if args.seed:
+        seed_demo_data()
+        print("Datos de ejemplo cargados.")
+        return
+    if not _has_users():
+        print("No hay usuarios registrados. Ejecute: python Main.py --seed")
+        return
+    session = login_window()
+    if session is not None:
+        open_main_menu(session)
+    APP_POOL.close()
 
 
 if __name__ == "__main__":
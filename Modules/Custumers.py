@@ -1,21 +1,31 @@
-"""CRUD helpers for clientes that enforce existence validations."""
+"""CRUD helpers for clientes that enforce existence validations.
+
+Every helper takes an optional ``connection_factory`` (e.g. a
+``ConnectionPool``), like the ``connection_factory`` of the CRUD classes.
+"""
 
 from __future__ import annotations
 
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
+from DB.cache import QUERY_CACHE, TABLE_VERSIONS
 from DB.connection import get_connection
+from DB.metrics import instrumented
+from DB.paging import keyset_page
+from DB.search import search
 
 
+@instrumented("clientes")
 def create_client(
     codclie: str,
     nomclie: str,
     direc: str,
     telef: str,
     ciudad: str,
+    connection_factory: Callable = get_connection,
 ) -> Tuple[bool, str]:
     """Insert a client while checking for duplicated primary keys."""
-    conn = get_connection()
+    conn = connection_factory()
     try:
         cursor = conn.cursor()
         cursor.execute("SELECT 1 FROM clientes WHERE codclie = ?", (codclie,))
@@ -30,14 +40,16 @@ def create_client(
             (codclie, nomclie, direc, telef, ciudad),
         )
         conn.commit()
+        TABLE_VERSIONS.bump("clientes")
         return True, "Cliente creado."
     finally:
         conn.close()
 
 
-def delete_client(codclie: str) -> Tuple[bool, str]:
+@instrumented("clientes")
+def delete_client(codclie: str, connection_factory: Callable = get_connection) -> Tuple[bool, str]:
     """Delete a client only if it exists."""
-    conn = get_connection()
+    conn = connection_factory()
     try:
         cursor = conn.cursor()
         cursor.execute("SELECT 1 FROM clientes WHERE codclie = ?", (codclie,))
@@ -46,14 +58,16 @@ def delete_client(codclie: str) -> Tuple[bool, str]:
 
         cursor.execute("DELETE FROM clientes WHERE codclie = ?", (codclie,))
         conn.commit()
+        TABLE_VERSIONS.bump("clientes")
         return True, "Cliente eliminado."
     finally:
         conn.close()
 
 
-def get_client(codclie: str) -> Optional[dict]:
+@instrumented("clientes")
+def get_client(codclie: str, connection_factory: Callable = get_connection) -> Optional[dict]:
     """Fetch a single client as a dictionary."""
-    conn = get_connection()
+    conn = connection_factory()
     try:
         cursor = conn.cursor()
         cursor.execute(
@@ -69,15 +83,17 @@ def get_client(codclie: str) -> Optional[dict]:
         conn.close()
 
 
+@instrumented("clientes")
 def update_client(
     codclie: str,
     nomclie: str,
     direc: str,
     telef: str,
     ciudad: str,
+    connection_factory: Callable = get_connection,
 ) -> Tuple[bool, str]:
     """Update an existing client record."""
-    conn = get_connection()
+    conn = connection_factory()
     try:
         cursor = conn.cursor()
         cursor.execute("SELECT 1 FROM clientes WHERE codclie = ?", (codclie,))
@@ -93,14 +109,47 @@ def update_client(
             (nomclie, direc, telef, ciudad, codclie),
         )
         conn.commit()
+        TABLE_VERSIONS.bump("clientes")
         return True, "Cliente actualizado."
     finally:
         conn.close()
 
 
-def list_clients() -> List[dict]:
-    """Return all clients ordered by identifier."""
-    conn = get_connection()
+@instrumented("clientes")
+def list_clients(connection_factory: Callable = get_connection) -> List[dict]:
+    """Return all clients ordered by identifier (cached until clientes changes)."""
+    return QUERY_CACHE.get_or_load(
+        ("list_clients",), ("clientes",), lambda: _fetch_clients(connection_factory), connection_factory
+    )
+
+
+@instrumented("clientes")
+def list_clients_page(
+    after: Optional[str] = None,
+    limit: int = 100,
+    connection_factory: Callable = get_connection,
+) -> Tuple[List[dict], Optional[str]]:
+    """Return one page of clients after the ``after`` code plus the token for the next page."""
+    conn = connection_factory()
+    try:
+        columns = ("codclie", "nomclie", "direc", "telef", "ciudad")
+        return keyset_page(conn, "clientes", columns, "codclie", after, limit)
+    finally:
+        conn.close()
+
+
+@instrumented("clientes")
+def search_clients(query: str, limit: int = 50, connection_factory: Callable = get_connection) -> List[dict]:
+    """Return up to ``limit`` clients matching ``query`` by name, address or city, best first."""
+    conn = connection_factory()
+    try:
+        return search(conn, "clientes_fts", ("codclie", "nomclie", "direc", "telef", "ciudad"), query, limit)
+    finally:
+        conn.close()
+
+
+def _fetch_clients(connection_factory: Callable = get_connection) -> List[dict]:
+    conn = connection_factory()
     try:
         cursor = conn.cursor()
         cursor.execute(
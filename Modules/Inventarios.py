@@ -4,13 +4,19 @@ from __future__ import annotations
 
 from typing import Callable, List, Optional, Tuple
 
+from DB.cache import QUERY_CACHE, TABLE_VERSIONS
 from DB.connection import get_connection
+from DB.metrics import InstrumentedService
+from DB.paging import keyset_page
+from Modules.Session import SESSIONS, Principal, Session, principal_name
 import sqlite3
 
 
-class InventoriesCRUD:
+class InventoriesCRUD(InstrumentedService):
     """Operaciones CRUD sobre la tabla inventarios con validación de stock mínimo y control de acceso por nivel."""
 
+    metrics_module = "inventarios"
+
     def __init__(self, connection_factory: Callable = get_connection) -> None:
         self._connection_factory = connection_factory
 
@@ -23,14 +29,18 @@ class InventoriesCRUD:
             return False, "La cantidad disponible no puede ser menor que el stock mínimo."
         return True, ""
 
-    def _authorize(self, username: Optional[str], min_level: int) -> Tuple[bool, str]:
+    def _authorize(self, username: Principal, min_level: int) -> Tuple[bool, str]:
         if not username:
             return False, "Usuario no proporcionado."
-        # import aquí para evitar ciclos al cargar módulos
-        from Modules.Users import UsersCRUD
-
-        users = UsersCRUD(self._connection_factory)
-        level = users.get_user_level(username)
+        if isinstance(username, Session) and SESSIONS.is_current(username, self._connection_factory):
+            level = username.level
+        else:
+            # Sesiones revocadas o sin registrar se validan como un nombre de usuario.
+            # import aquí para evitar ciclos al cargar módulos
+            from Modules.Users import UsersCRUD
+
+            users = UsersCRUD(self._connection_factory)
+            level = users.get_cached_user_level(principal_name(username))
         if level is None:
             return False, "Usuario no encontrado."
         # Lower numeric value = more privileges (1 = admin). Deny when
@@ -49,7 +59,7 @@ class InventoriesCRUD:
         stock_minimo: int,
         iva: float,
         costovta: float,
-        username: Optional[str] = None,
+        username: Principal = None,
     ) -> tuple[bool, str]:
         # crear/update requieren nivel >=2
         ok, msg = self._authorize(username, 2)
@@ -78,11 +88,12 @@ class InventoriesCRUD:
                 (codprod, nomprod, cantidad, stock_minimo, iva, costovta),
             )
             conn.commit()
+            TABLE_VERSIONS.bump("inventarios")
             return True, "Inventario creado."
         finally:
             conn.close()
 
-    def read_inventory(self, codprod: str, username: Optional[str] = None) -> Optional[dict]:
+    def read_inventory(self, codprod: str, username: Principal = None) -> Optional[dict]:
         # Allow read access to all levels
         ok, msg = self._authorize(username, 3)
         if not ok:
@@ -109,7 +120,7 @@ class InventoriesCRUD:
         stock_minimo: int,
         iva: float,
         costovta: float,
-        username: Optional[str] = None,
+        username: Principal = None,
     ) -> tuple[bool, str]:
         # Only admin (nivel 1) can update inventories
         ok, msg = self._authorize(username, 1)
@@ -139,11 +150,12 @@ class InventoriesCRUD:
                 (nomprod, cantidad, stock_minimo, iva, costovta, codprod),
             )
             conn.commit()
+            TABLE_VERSIONS.bump("inventarios")
             return True, "Inventario actualizado."
         finally:
             conn.close()
 
-    def delete_inventory(self, codprod: str, username: Optional[str] = None) -> tuple[bool, str]:
+    def delete_inventory(self, codprod: str, username: Principal = None) -> tuple[bool, str]:
         # Only admin (nivel 1) can delete inventories
         ok, msg = self._authorize(username, 1)
         if not ok:
@@ -156,15 +168,38 @@ class InventoriesCRUD:
                 return False, "Registro de inventario no existe."
             cursor.execute("DELETE FROM inventarios WHERE codprod = ?", (codprod,))
             conn.commit()
+            TABLE_VERSIONS.bump("inventarios")
             return True, "Inventario eliminado."
         finally:
             conn.close()
 
-    def list_inventories(self, username: Optional[str] = None) -> List[dict]:
+    def list_inventories(self, username: Principal = None) -> List[dict]:
         # Listing is allowed for all levels
         ok, msg = self._authorize(username, 3)
         if not ok:
             return []
+        return QUERY_CACHE.get_or_load(
+            ("list_inventories",), ("inventarios",), self._fetch_inventories, self._connection_factory
+        )
+
+    def list_inventories_page(
+        self,
+        username: Principal = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Return one page of inventory rows after the ``after`` code plus the token for the next page."""
+        ok, msg = self._authorize(username, 3)
+        if not ok:
+            return [], None
+        conn = self._connection_factory()
+        try:
+            columns = ("codprod", "nomprod", "cantidad", "stock_minimo", "iva", "costovta")
+            return keyset_page(conn, "inventarios", columns, "codprod", after, limit)
+        finally:
+            conn.close()
+
+    def _fetch_inventories(self) -> List[dict]:
         conn = self._connection_factory()
         try:
             cursor = conn.cursor()
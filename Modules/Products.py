@@ -2,9 +2,15 @@
 
 from __future__ import annotations
 
+import threading
+from bisect import bisect_left
 from typing import Callable, List, Optional
 
-from DB.connection import get_connection
+from DB.cache import QUERY_CACHE, TABLE_VERSIONS
+from DB.connection import database_identity, get_connection, in_unit_of_work
+from DB.metrics import InstrumentedService
+from DB.paging import keyset_page
+from DB.search import search
 import sqlite3
 
 def get_products_with_provider(db_path="db/app.db"):
@@ -34,9 +40,11 @@ def get_products_with_provider(db_path="db/app.db"):
     finally:
         conn.close()
 
-class ProductsCRUD:
+class ProductsCRUD(InstrumentedService):
     """Encapsula las operaciones CRUD sobre la tabla productos."""
 
+    metrics_module = "productos"
+
     def __init__(self, connection_factory: Callable = get_connection) -> None:
         self._connection_factory = connection_factory
 
@@ -64,6 +72,7 @@ class ProductsCRUD:
                 (codprod, nomprod, descripcion, iva, costovta),
             )
             conn.commit()
+            TABLE_VERSIONS.bump("productos")
             return True, "Producto creado exitosamente."
         finally:
             conn.close()
@@ -110,6 +119,7 @@ class ProductsCRUD:
                 (nomprod, descripcion, iva, costovta, codprod),
             )
             conn.commit()
+            TABLE_VERSIONS.bump("productos")
             return True, "Producto actualizado correctamente."
         finally:
             conn.close()
@@ -125,12 +135,36 @@ class ProductsCRUD:
 
             cursor.execute("DELETE FROM productos WHERE codprod = ?", (codprod,))
             conn.commit()
+            TABLE_VERSIONS.bump("productos")
             return True, "Producto eliminado."
         finally:
             conn.close()
 
     def list_products(self) -> List[dict]:
-        """Return all products ordered by identifier."""
+        """Return all products ordered by identifier (cached until productos changes)."""
+        return QUERY_CACHE.get_or_load(
+            ("list_products",), ("productos",), self._fetch_products, self._connection_factory
+        )
+
+    def list_products_page(self, after: Optional[str] = None, limit: int = 100) -> tuple[List[dict], Optional[str]]:
+        """Return one page of products after the ``after`` code plus the token for the next page."""
+        conn = self._connection_factory()
+        try:
+            columns = ("codprod", "nomprod", "descripcion", "iva", "costovta")
+            return keyset_page(conn, "productos", columns, "codprod", after, limit)
+        finally:
+            conn.close()
+
+    def search_products(self, query: str, limit: int = 50) -> List[dict]:
+        """Return up to ``limit`` products matching ``query`` by name or description, best first."""
+        conn = self._connection_factory()
+        try:
+            columns = ("codprod", "nomprod", "descripcion", "iva", "costovta")
+            return search(conn, "productos_fts", columns, query, limit)
+        finally:
+            conn.close()
+
+    def _fetch_products(self) -> List[dict]:
         conn = self._connection_factory()
         try:
             cursor = conn.cursor()
@@ -142,3 +176,77 @@ class ProductsCRUD:
             return [dict(zip(columns, row)) for row in rows]
         finally:
             conn.close()
+
+
+class ProductCatalog:
+    """Process-wide in-memory copy of productos for lookups without I/O.
+
+    The catalog loads productos once per database and reloads lazily when
+    ``TABLE_VERSIONS`` shows that a ProductsCRUD write changed the table.
+    ``peek`` never loads, so the Tk thread can use it and leave the reload
+    to a background task. Inside a unit of work lookups read productos
+    directly and nothing is stored, so uncommitted rows never reach the
+    shared copy.
+    """
+
+    def __init__(self, connection_factory: Callable = get_connection) -> None:
+        self._connection_factory = connection_factory
+        self._lock = threading.Lock()
+        self._loaded_for: Optional[tuple[str, tuple[int, ...]]] = None
+        self._by_code: dict[str, dict] = {}
+        self._names: list[tuple[str, str]] = []
+
+    @staticmethod
+    def _state() -> tuple[str, tuple[int, ...]]:
+        return database_identity(), TABLE_VERSIONS.snapshot(("productos",))
+
+    def is_stale(self) -> bool:
+        """True when ``ensure_loaded`` would (re)load the catalog."""
+        return self._state() != self._loaded_for
+
+    def _fetch(self) -> tuple[dict[str, dict], list[tuple[str, str]]]:
+        products = ProductsCRUD(self._connection_factory)._fetch_products()
+        by_code = {product["codprod"]: product for product in products}
+        names = sorted((product["nomprod"].casefold(), product["codprod"]) for product in products)
+        return by_code, names
+
+    def ensure_loaded(self) -> None:
+        """Load or reload the catalog if the productos version changed (never inside a unit of work)."""
+        state = self._state()
+        if state == self._loaded_for or in_unit_of_work():
+            return
+        with self._lock:
+            if state == self._loaded_for:
+                return
+            self._by_code, self._names = self._fetch()
+            self._loaded_for = state
+
+    def _lookup(self) -> tuple[dict[str, dict], list[tuple[str, str]]]:
+        if in_unit_of_work():
+            return self._fetch()
+        self.ensure_loaded()
+        return self._by_code, self._names
+
+    def get(self, codprod: str) -> Optional[dict]:
+        """Return a copy of the product with ``codprod`` or None."""
+        product = self._lookup()[0].get(codprod)
+        return dict(product) if product is not None else None
+
+    def peek(self, codprod: str) -> Optional[dict]:
+        """Like ``get`` but from the snapshot already in memory, possibly stale or empty."""
+        product = self._by_code.get(codprod)
+        return dict(product) if product is not None else None
+
+    def search_prefix(self, prefix: str, limit: int = 10) -> List[dict]:
+        """Return up to ``limit`` products whose name starts with ``prefix``."""
+        by_code, names = self._lookup()
+        key = prefix.casefold()
+        matches = []
+        index = bisect_left(names, (key, ""))
+        while index < len(names) and len(matches) < limit and names[index][0].startswith(key):
+            matches.append(dict(by_code[names[index][1]]))
+            index += 1
+        return matches
+
+
+PRODUCT_CATALOG = ProductCatalog()
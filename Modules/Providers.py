@@ -4,12 +4,17 @@ from __future__ import annotations
 
 from typing import Callable, List, Optional
 
+from DB.cache import QUERY_CACHE, TABLE_VERSIONS
 from DB.connection import get_connection
+from DB.metrics import InstrumentedService
+from DB.paging import keyset_page
 
 
-class ProvidersCRUD:
+class ProvidersCRUD(InstrumentedService):
     """Administra operaciones CRUD de la tabla proveedores."""
 
+    metrics_module = "proveedores"
+
     def __init__(self, connection_factory: Callable = get_connection) -> None:
         self._connection_factory = connection_factory
 
@@ -42,6 +47,7 @@ class ProvidersCRUD:
                 (idprov, codprod, descripcion, costo, direccion, telefono),
             )
             conn.commit()
+            TABLE_VERSIONS.bump("proveedores")
             return True, "Proveedor creado."
         finally:
             conn.close()
@@ -97,6 +103,7 @@ class ProvidersCRUD:
                 (codprod, descripcion, costo, direccion, telefono, idprov),
             )
             conn.commit()
+            TABLE_VERSIONS.bump("proveedores")
             return True, "Proveedor actualizado."
         finally:
             conn.close()
@@ -112,12 +119,27 @@ class ProvidersCRUD:
 
             cursor.execute("DELETE FROM proveedores WHERE idprov = ?", (idprov,))
             conn.commit()
+            TABLE_VERSIONS.bump("proveedores")
             return True, "Proveedor eliminado."
         finally:
             conn.close()
 
     def list_providers(self) -> List[dict]:
-        """Return all providers ordered by identifier."""
+        """Return all providers ordered by identifier (cached until proveedores changes)."""
+        return QUERY_CACHE.get_or_load(
+            ("list_providers",), ("proveedores",), self._fetch_providers, self._connection_factory
+        )
+
+    def list_providers_page(self, after: Optional[str] = None, limit: int = 100) -> tuple[List[dict], Optional[str]]:
+        """Return one page of providers after the ``after`` id plus the token for the next page."""
+        conn = self._connection_factory()
+        try:
+            columns = ("idprov", "codprod", "descripcion", "costo", "direccion", "telefono")
+            return keyset_page(conn, "proveedores", columns, "idprov", after, limit)
+        finally:
+            conn.close()
+
+    def _fetch_providers(self) -> List[dict]:
         conn = self._connection_factory()
         try:
             cursor = conn.cursor()
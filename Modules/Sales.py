@@ -2,25 +2,105 @@
 
 from __future__ import annotations
 
-from typing import Any, Callable, List, Optional
+import math
+from datetime import date, timedelta
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Mapping, Optional
 
+from DB.cache import QUERY_CACHE, TABLE_VERSIONS
 from DB.connection import get_connection
+from DB.metrics import InstrumentedService
+from DB.progress import QueryControl, watch_query
+from Modules.Session import SESSIONS, Principal, Session, principal_name
 import sqlite3
 
 
-class SalesCRUD:
+BULK_CHUNK_SIZE = 500
+STREAM_BATCH_SIZE = 500
+_SALE_COLUMNS = "id, fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal"
+_INSERT_SALE_SQL = """
+    INSERT INTO ventas (fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_INSERT_LINE_SQL = """
+    INSERT INTO ventas (fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal, idfactura)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# Parámetros por sentencia IN (...) para no superar SQLITE_MAX_VARIABLE_NUMBER.
+_MAX_IN_PARAMS = 900
+
+
+def _existing_keys(cur: sqlite3.Cursor, table: str, column: str, keys: set) -> set:
+    """Return the subset of ``keys`` present in ``table.column`` using set lookups."""
+    found: set = set()
+    values = list(keys)
+    for start in range(0, len(values), _MAX_IN_PARAMS):
+        batch = values[start:start + _MAX_IN_PARAMS]
+        placeholders = ", ".join("?" for _ in batch)
+        cur.execute(f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})", batch)
+        found.update(row[0] for row in cur.fetchall())
+    return found
+
+
+def _refresh_invoice_totals(cur: sqlite3.Cursor, invoice_id: Optional[int]) -> None:
+    """Recompute a facturas header from its ventas lines; drop it once it has none."""
+    if invoice_id is None:
+        return
+    cur.execute(
+        "DELETE FROM facturas WHERE id = ? AND NOT EXISTS (SELECT 1 FROM ventas WHERE idfactura = ?)",
+        (invoice_id, invoice_id),
+    )
+    cur.execute(
+        """
+        UPDATE facturas
+        SET subtotal = (SELECT ROUND(SUM(subtotal), 2) FROM ventas WHERE idfactura = facturas.id),
+            vriva = (SELECT ROUND(SUM(vriva), 2) FROM ventas WHERE idfactura = facturas.id),
+            vrtotal = (SELECT ROUND(SUM(vrtotal), 2) FROM ventas WHERE idfactura = facturas.id)
+        WHERE id = ?
+        """,
+        (invoice_id,),
+    )
+
+
+def _parse_day(value: str) -> Optional[date]:
+    try:
+        return date.fromisoformat(value[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def _month_aligned(start_date: Optional[str], end_date: Optional[str]) -> bool:
+    """True when the range starts on a month's first day and ends on its last."""
+    if start_date:
+        start = _parse_day(start_date)
+        if start is None or start.day != 1:
+            return False
+    if end_date:
+        end = _parse_day(end_date)
+        if end is None or (end + timedelta(days=1)).day != 1:
+            return False
+    return True
+
+
+class SalesCRUD(InstrumentedService):
     """Gestiona las operaciones CRUD sobre la tabla ventas aplicando validaciones y niveles de acceso."""
 
+    metrics_module = "ventas"
+
     def __init__(self, connection_factory: Callable = get_connection) -> None:
         self._connection_factory = connection_factory
 
-    def _authorize(self, username: Optional[str], min_level: int) -> tuple[bool, str]:
+    def _authorize(self, username: Principal, min_level: int) -> tuple[bool, str]:
         if not username:
             return False, "Usuario no proporcionado."
-        from Modules.Users import UsersCRUD  # import diferido para evitar ciclos
+        if isinstance(username, Session) and SESSIONS.is_current(username, self._connection_factory):
+            level = username.level
+        else:
+            # Sesiones revocadas o sin registrar se validan como un nombre de usuario.
+            from Modules.Users import UsersCRUD  # import diferido para evitar ciclos
 
-        users = UsersCRUD(self._connection_factory)
-        level = users.get_user_level(username)
+            users = UsersCRUD(self._connection_factory)
+            level = users.get_cached_user_level(principal_name(username))
         if level is None:
             return False, "Usuario no encontrado."
         # In the application a lower numeric `nivel` means more privileges
@@ -45,7 +125,7 @@ class SalesCRUD:
         vriva: float = 0.0,
         subtotal: Optional[float] = None,
         vrtotal: Optional[float] = None,
-        username: Optional[str] = None,
+        username: Principal = None,
     ) -> tuple[bool, str]:
         ok, msg = self._authorize(username, 2)
         if not ok:
@@ -76,11 +156,275 @@ class SalesCRUD:
                 (fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal),
             )
             conn.commit()
+            TABLE_VERSIONS.bump("ventas")
             return True, "Venta registrada correctamente."
         finally:
             conn.close()
 
-    def read_sale(self, sale_id: int, username: Optional[str] = None) -> Optional[dict[str, Any]]:
+    def create_sales_bulk(
+        self,
+        sales: Iterable[Mapping[str, Any]],
+        username: Principal = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> tuple[int, list[tuple[int, str]]]:
+        """
+        Insert many sales authorizing once and committing once per chunk.
+
+        Each item is a mapping with the ``create_sale`` keyword arguments.
+        Invalid rows are skipped and reported as ``(index, message)`` without
+        stopping the rest of the batch. Returns ``(inserted, rejects)``.
+        """
+        ok, msg = self._authorize(username, 2)
+        if not ok:
+            return 0, [(-1, msg)]
+
+        inserted = 0
+        rejects: list[tuple[int, str]] = []
+        iterator = enumerate(sales)
+        conn = self._connection_factory()
+        try:
+            cur = conn.cursor()
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                # Se valida cada fila antes de armar los conjuntos de claves: una
+                # fila que no es un mapeo o trae códigos no hashables se rechaza sola.
+                valid = []
+                for index, row in chunk:
+                    try:
+                        costovta = float(row["costovta"])
+                        canti = int(row["canti"])
+                        vriva = float(row.get("vriva", 0.0) or 0.0)
+                        values = (row["fecha"], row["codclie"], row["codprod"], row["nomprod"])
+                        hash(values)
+                        subtotal, vrtotal = row.get("subtotal"), row.get("vrtotal")
+                    except (AttributeError, KeyError, TypeError, ValueError) as exc:
+                        rejects.append((index, f"Fila inválida: {exc}"))
+                        continue
+                    if costovta < 0:
+                        rejects.append((index, "El precio de venta no puede ser negativo."))
+                        continue
+                    if canti <= 0:
+                        rejects.append((index, "La cantidad debe ser mayor que cero."))
+                        continue
+                    if subtotal is None:
+                        subtotal = round(costovta * canti, 2)
+                    if vrtotal is None:
+                        vrtotal = round(subtotal + vriva, 2)
+                    valid.append((index, values + (costovta, canti, vriva, subtotal, vrtotal)))
+                clients = _existing_keys(cur, "clientes", "codclie", {values[1] for _, values in valid})
+                products = _existing_keys(cur, "productos", "codprod", {values[2] for _, values in valid})
+                params = []
+                for index, values in valid:
+                    if values[1] not in clients:
+                        rejects.append((index, "El cliente asociado no existe."))
+                        continue
+                    if values[2] not in products:
+                        rejects.append((index, "El producto asociado no existe."))
+                        continue
+                    params.append((index, values))
+                if not params:
+                    continue
+                try:
+                    cur.executemany(_INSERT_SALE_SQL, [values for _, values in params])
+                except sqlite3.IntegrityError:
+                    # Una fila viola un CHECK: se reintenta fila a fila para aislarla.
+                    conn.rollback()
+                    accepted = 0
+                    for index, values in params:
+                        try:
+                            cur.execute(_INSERT_SALE_SQL, values)
+                            accepted += 1
+                        except sqlite3.IntegrityError as exc:
+                            rejects.append((index, f"Fila rechazada por la base de datos: {exc}"))
+                    conn.commit()
+                    TABLE_VERSIONS.bump("ventas")
+                    inserted += accepted
+                    continue
+                conn.commit()
+                TABLE_VERSIONS.bump("ventas")
+                inserted += len(params)
+            rejects.sort()
+            return inserted, rejects
+        finally:
+            conn.close()
+
+    def _price_lines(
+        self,
+        cur: sqlite3.Cursor,
+        lines: Iterable[Mapping[str, Any]],
+    ) -> tuple[Optional[list[tuple]], str]:
+        """Resolve basket lines into ``(codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal)``.
+
+        Missing ``nomprod``, ``costovta`` and ``vriva`` are taken from productos.
+        """
+        lines = list(lines)
+        if not lines:
+            return None, "La venta debe tener al menos un producto."
+        requested = []
+        for number, line in enumerate(lines, start=1):
+            try:
+                codprod = line.get("codprod")
+                hash(codprod)
+                costovta = line.get("costovta")
+                costovta = None if costovta is None else float(costovta)
+                canti = int(line.get("canti", 0))
+                vriva = line.get("vriva")
+                vriva = None if vriva is None else float(vriva)
+            except (AttributeError, TypeError, ValueError) as exc:
+                return None, f"Línea {number} inválida: {exc}"
+            requested.append((codprod, line.get("nomprod"), costovta, canti, vriva))
+        catalog: dict[str, tuple] = {}
+        codes = {codprod for codprod, *_ in requested}
+        for start in range(0, len(codes), _MAX_IN_PARAMS):
+            batch = list(codes)[start:start + _MAX_IN_PARAMS]
+            placeholders = ", ".join("?" for _ in batch)
+            cur.execute(
+                f"SELECT codprod, nomprod, costovta, iva FROM productos WHERE codprod IN ({placeholders})",
+                batch,
+            )
+            catalog.update((row[0], row[1:]) for row in cur.fetchall())
+        priced = []
+        for number, (codprod, line_name, costovta, canti, vriva) in enumerate(requested, start=1):
+            if codprod not in catalog:
+                return None, f"El producto asociado no existe: {codprod}."
+            nomprod, list_price, iva_rate = catalog[codprod]
+            if costovta is None:
+                costovta = float(list_price)
+            if costovta < 0:
+                return None, "El precio de venta no puede ser negativo."
+            if vriva is not None and not (math.isfinite(vriva) and vriva >= 0):
+                return None, f"Línea {number} inválida: el IVA debe ser un número no negativo."
+            if canti <= 0:
+                return None, "La cantidad debe ser mayor que cero."
+            subtotal = round(costovta * canti, 2)
+            vriva = round(subtotal * iva_rate, 2) if vriva is None else vriva
+            vrtotal = round(subtotal + vriva, 2)
+            priced.append((codprod, line_name or nomprod, costovta, canti, vriva, subtotal, vrtotal))
+        return priced, ""
+
+    def _decrement_stock(self, cur: sqlite3.Cursor, codprod: str, canti: int) -> tuple[bool, str]:
+        """Conditionally take ``canti`` units; no read-modify-write of the quantity."""
+        cur.execute(
+            "UPDATE inventarios SET cantidad = cantidad - ? WHERE codprod = ? AND cantidad >= ?",
+            (canti, codprod, canti),
+        )
+        if cur.rowcount == 1:
+            return True, ""
+        cur.execute("SELECT cantidad FROM inventarios WHERE codprod = ?", (codprod,))
+        row = cur.fetchone()
+        if row is None:
+            return False, f"El producto {codprod} no tiene inventario."
+        return False, f"Stock insuficiente para {codprod}: disponible {row[0]}, solicitado {canti}."
+
+    def create_invoice(
+        self,
+        fecha: str,
+        codclie: str,
+        lines: Iterable[Mapping[str, Any]],
+        username: Principal = None,
+        update_stock: bool = False,
+    ) -> tuple[Optional[int], str]:
+        """
+        Register a whole basket as one factura with its ventas lines.
+
+        Each line needs ``codprod`` and ``canti``; price, name and IVA default
+        to the catalog values. Subtotal, IVA and total are computed in one
+        pass and everything is written in a single transaction. With
+        ``update_stock`` each line also takes its units from inventarios and
+        nothing is written if any line lacks stock. Returns
+        ``(invoice_id, message)``; the id is None when the basket is rejected.
+        """
+        ok, msg = self._authorize(username, 2)
+        if not ok:
+            return None, msg
+
+        conn = self._connection_factory()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1 FROM clientes WHERE codclie = ?", (codclie,))
+            if not cur.fetchone():
+                return None, "El cliente asociado no existe."
+            priced, msg = self._price_lines(cur, lines)
+            if priced is None:
+                return None, msg
+            subtotal = round(sum(line[5] for line in priced), 2)
+            vriva = round(sum(line[4] for line in priced), 2)
+            vrtotal = round(sum(line[6] for line in priced), 2)
+
+            # Las consultas van antes de BEGIN IMMEDIATE para que el bloqueo
+            # de escritura solo cubra los UPDATE condicionales y los INSERT.
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                if update_stock:
+                    for codprod, _, _, canti, _, _, _ in priced:
+                        ok, msg = self._decrement_stock(cur, codprod, canti)
+                        if not ok:
+                            conn.rollback()
+                            return None, msg
+                cur.execute(
+                    "INSERT INTO facturas (fecha, codclie, subtotal, vriva, vrtotal) VALUES (?, ?, ?, ?, ?)",
+                    (fecha, codclie, subtotal, vriva, vrtotal),
+                )
+                invoice_id = cur.lastrowid
+                cur.executemany(
+                    _INSERT_LINE_SQL,
+                    [(fecha, codclie) + line + (invoice_id,) for line in priced],
+                )
+                conn.commit()
+                TABLE_VERSIONS.bump("ventas", "facturas")
+                if update_stock:
+                    TABLE_VERSIONS.bump("inventarios")
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            return invoice_id, f"Factura {invoice_id} registrada."
+        finally:
+            conn.close()
+
+    def create_sale_with_stock(
+        self,
+        fecha: str,
+        codclie: str,
+        lines: Iterable[Mapping[str, Any]],
+        username: Principal = None,
+    ) -> tuple[bool, str]:
+        """
+        Register a basket and decrement inventarios in the same transaction.
+
+        Uses one conditional UPDATE per line (``cantidad >= ?``) and checks
+        the row count, so concurrent tills cannot oversell.
+        """
+        invoice_id, msg = self.create_invoice(fecha, codclie, lines, username, update_stock=True)
+        if invoice_id is None:
+            return False, msg
+        return True, "Venta registrada y stock actualizado."
+
+    def read_invoice(self, invoice_id: int, username: Principal = None) -> Optional[dict[str, Any]]:
+        """Return the factura header with its ``lineas`` or None."""
+        ok, msg = self._authorize(username, 3)
+        if not ok:
+            return None
+        conn = self._connection_factory()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT id, fecha, codclie, subtotal, vriva, vrtotal FROM facturas WHERE id = ?",
+                (invoice_id,),
+            )
+            row = cur.fetchone()
+            if row is None:
+                return None
+            invoice = dict(zip([desc[0] for desc in cur.description], row))
+            cur.execute(f"SELECT {_SALE_COLUMNS} FROM ventas WHERE idfactura = ? ORDER BY id", (invoice_id,))
+            columns = [desc[0] for desc in cur.description]
+            invoice["lineas"] = [dict(zip(columns, line)) for line in cur.fetchall()]
+            return invoice
+        finally:
+            conn.close()
+
+    def read_sale(self, sale_id: int, username: Principal = None) -> Optional[dict[str, Any]]:
         # Allow read access to all levels (1..3)
         ok, msg = self._authorize(username, 3)
         if not ok:
@@ -112,7 +456,7 @@ class SalesCRUD:
         vriva: float = 0.0,
         subtotal: Optional[float] = None,
         vrtotal: Optional[float] = None,
-        username: Optional[str] = None,
+        username: Principal = None,
     ) -> tuple[bool, str]:
         ok, msg = self._authorize(username, 2)
         if not ok:
@@ -120,8 +464,9 @@ class SalesCRUD:
         conn = self._connection_factory()
         try:
             cur = conn.cursor()
-            cur.execute("SELECT 1 FROM ventas WHERE id = ?", (sale_id,))
-            if not cur.fetchone():
+            cur.execute("SELECT idfactura FROM ventas WHERE id = ?", (sale_id,))
+            current = cur.fetchone()
+            if not current:
                 return False, "Registro de venta no existe."
             if costovta < 0:
                 return False, "El precio de venta no puede ser negativo."
@@ -145,12 +490,15 @@ class SalesCRUD:
                 """,
                 (fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal, sale_id),
             )
+            # La cabecera de la factura se recalcula en la misma transacción.
+            _refresh_invoice_totals(cur, current[0])
             conn.commit()
+            TABLE_VERSIONS.bump("ventas", "facturas")
             return True, "Venta actualizada correctamente."
         finally:
             conn.close()
 
-    def delete_sale(self, sale_id: int, username: Optional[str] = None) -> tuple[bool, str]:
+    def delete_sale(self, sale_id: int, username: Principal = None) -> tuple[bool, str]:
         # Only users with level 1 or 2 can delete sales (3 = viewer)
         ok, msg = self._authorize(username, 2)
         if not ok:
@@ -158,20 +506,29 @@ class SalesCRUD:
         conn = self._connection_factory()
         try:
             cur = conn.cursor()
-            cur.execute("SELECT 1 FROM ventas WHERE id = ?", (sale_id,))
-            if not cur.fetchone():
+            cur.execute("SELECT idfactura FROM ventas WHERE id = ?", (sale_id,))
+            current = cur.fetchone()
+            if not current:
                 return False, "Registro de venta no existe."
             cur.execute("DELETE FROM ventas WHERE id = ?", (sale_id,))
+            _refresh_invoice_totals(cur, current[0])
             conn.commit()
+            TABLE_VERSIONS.bump("ventas", "facturas")
             return True, "Venta eliminada."
         finally:
             conn.close()
 
-    def list_sales(self, username: Optional[str] = None) -> list[dict[str, Any]]:
-        # Listing should be permitted for all levels
+    def list_sales(self, username: Principal = None) -> list[dict[str, Any]]:
+        # Listing should be permitted for all levels; the result is cached
+        # until a write bumps the ventas version.
         ok, msg = self._authorize(username, 3)
         if not ok:
             return []
+        return QUERY_CACHE.get_or_load(
+            ("list_sales",), ("ventas",), self._fetch_sales, self._connection_factory
+        )
+
+    def _fetch_sales(self) -> list[dict[str, Any]]:
         conn = self._connection_factory()
         try:
             cur = conn.cursor()
@@ -184,29 +541,126 @@ class SalesCRUD:
         finally:
             conn.close()
 
+    def _keyset_query(
+        self,
+        after_id: int,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        codclie: Optional[str],
+        codprod: Optional[str],
+    ) -> tuple[str, list[Any]]:
+        where_clauses = ["id > ?"]
+        params: List[Any] = [after_id]
+        if start_date:
+            where_clauses.append("date(fecha) >= date(?)")
+            params.append(start_date)
+        if end_date:
+            where_clauses.append("date(fecha) <= date(?)")
+            params.append(end_date)
+        if codclie:
+            where_clauses.append("codclie = ?")
+            params.append(codclie)
+        if codprod:
+            where_clauses.append("codprod = ?")
+            params.append(codprod)
+        query = f"SELECT {_SALE_COLUMNS} FROM ventas WHERE {' AND '.join(where_clauses)} ORDER BY id"
+        return query, params
+
+    def iter_sales(
+        self,
+        username: Principal = None,
+        after_id: int = 0,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        codclie: Optional[str] = None,
+        codprod: Optional[str] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield sales lazily in id order, fetching ``batch_size`` rows at a time.
+
+        The connection stays open until the generator is exhausted or closed.
+        """
+        ok, msg = self._authorize(username, 3)
+        if not ok:
+            return
+        query, params = self._keyset_query(after_id, start_date, end_date, codclie, codprod)
+        conn = self._connection_factory()
+        try:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            columns = [desc[0] for desc in cur.description]
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            conn.close()
+
+    def list_sales_page(
+        self,
+        username: Principal = None,
+        after_id: int = 0,
+        limit: int = 100,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        codclie: Optional[str] = None,
+        codprod: Optional[str] = None,
+    ) -> tuple[list[dict[str, Any]], Optional[int]]:
+        """
+        Return one keyset page of sales plus the token for the next page.
+
+        Pass the returned token as ``after_id`` to continue; it is ``None``
+        once the last page has been returned. Raises ``ValueError`` when
+        ``limit`` is smaller than 1.
+        """
+        if limit < 1:
+            raise ValueError("El tamaño de página (limit) debe ser al menos 1.")
+        ok, msg = self._authorize(username, 3)
+        if not ok:
+            return [], None
+        query, params = self._keyset_query(after_id, start_date, end_date, codclie, codprod)
+        conn = self._connection_factory()
+        try:
+            cur = conn.cursor()
+            # Se pide una fila extra para saber si existe otra página.
+            cur.execute(f"{query} LIMIT ?", params + [limit + 1])
+            rows = cur.fetchall()
+            columns = [desc[0] for desc in cur.description]
+        finally:
+            conn.close()
+        page = [dict(zip(columns, row)) for row in rows[:limit]]
+        next_token = page[-1]["id"] if len(rows) > limit else None
+        return page, next_token
+
     def list_sales_by_date_range(
         self,
         start_date: str,
         end_date: str,
-        username: Optional[str] = None,
+        username: Principal = None,
+        control: Optional[QueryControl] = None,
     ) -> List[dict[str, Any]]:
-        # Permit filtering by date for all levels
+        # Permit filtering by date for all levels. The `date(fecha)` predicate
+        # must stay textually identical to idx_ventas_fecha_date to use it.
+        # With `control` the query can be cancelled or time out (QueryInterrupted).
         ok, msg = self._authorize(username, 3)
         if not ok:
             return []
         conn = self._connection_factory()
         try:
             cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT id, fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal
-                FROM ventas
-                WHERE date(fecha) BETWEEN date(?) AND date(?)
-                ORDER BY fecha, id
-                """,
-                (start_date, end_date),
-            )
-            rows = cur.fetchall()
+            with watch_query(control, conn):
+                cur.execute(
+                    """
+                    SELECT id, fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal
+                    FROM ventas
+                    WHERE date(fecha) BETWEEN date(?) AND date(?)
+                    ORDER BY fecha, id
+                    """,
+                    (start_date, end_date),
+                )
+                rows = cur.fetchall()
             columns = [desc[0] for desc in cur.description]
             return [dict(zip(columns, row)) for row in rows]
         finally:
@@ -215,9 +669,10 @@ class SalesCRUD:
     def summarize_sales(
         self,
         period: str,
-        username: Optional[str] = None,
+        username: Principal = None,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
+        control: Optional[QueryControl] = None,
     ) -> List[dict[str, Any]]:
         # Summaries/reports are allowed for all levels (reports may be
         # restricted at the GUI level by `GUI/permissions.py`)
@@ -233,30 +688,41 @@ class SalesCRUD:
         }
         if period not in period_map:
             return []
-        bucket_format = period_map[period]
+        # Se lee de los rollups (ver DB/init_db.TRIGGER_DEFINITIONS) en lugar
+        # de ventas. El mensual solo sirve si el rango cubre meses completos.
+        # "transacciones" cuenta facturas; una venta sin factura cuenta sola.
+        use_monthly = period in ("month", "year") and _month_aligned(start_date, end_date)
+        if use_monthly:
+            table, key = "ventas_resumen_mensual", "mes"
+            bucket_sql = "mes" if period == "month" else "substr(mes, 1, 4)"
+            bound_sql = "substr(date(?), 1, 7)"
+        else:
+            table, key = "ventas_resumen_diario", "dia"
+            bucket_sql = f"strftime('{period_map[period]}', dia)"
+            bound_sql = "date(?)"
         where_clauses = []
         params: List[Any] = []
         if start_date:
-            where_clauses.append("date(fecha) >= date(?)")
+            where_clauses.append(f"{key} >= {bound_sql}")
             params.append(start_date)
         if end_date:
-            where_clauses.append("date(fecha) <= date(?)")
+            where_clauses.append(f"{key} <= {bound_sql}")
             params.append(end_date)
         where_sql = ""
         if where_clauses:
             where_sql = "WHERE " + " AND ".join(where_clauses)
         query = f"""
             SELECT
-                strftime('{bucket_format}', fecha) AS periodo,
-                COUNT(*) AS transacciones,
-                ROUND(SUM(vrtotal), 2) AS total_ventas,
-                ROUND(SUM(vriva), 2) AS total_iva,
+                {bucket_sql} AS periodo,
+                SUM(transacciones) AS transacciones,
+                ROUND(SUM(total), 2) AS total_ventas,
+                ROUND(SUM(iva), 2) AS total_iva,
                 COUNT(DISTINCT codclie) AS clientes_unicos,
                 CASE
                     WHEN COUNT(DISTINCT codclie) = 0 THEN 0
-                    ELSE ROUND(SUM(vrtotal) / COUNT(DISTINCT codclie), 2)
+                    ELSE ROUND(SUM(total) / COUNT(DISTINCT codclie), 2)
                 END AS promedio_por_cliente
-            FROM ventas
+            FROM {table}
             {where_sql}
             GROUP BY periodo
             ORDER BY periodo
@@ -264,8 +730,9 @@ class SalesCRUD:
         conn = self._connection_factory()
         try:
             cur = conn.cursor()
-            cur.execute(query, params)
-            rows = cur.fetchall()
+            with watch_query(control, conn):
+                cur.execute(query, params)
+                rows = cur.fetchall()
             columns = [desc[0] for desc in cur.description]
             return [dict(zip(columns, row)) for row in rows]
         finally:
@@ -0,0 +1,291 @@
+"""Columnar, in-memory copy of ventas for vectorized analytics (requires NumPy).
+
+``SalesCube`` keeps one NumPy array per field: dates as day numbers since
+1970-01-01, client and product codes dictionary-encoded as small integers and
+money columns as integer cents. Group-bys, top-N rankings and filters are
+answered with array operations instead of per-row SQL or Python dicts.
+
+``refresh()`` only appends sales whose ``id`` is greater than the last one
+loaded; call ``reload()`` after updates or deletes of existing sales.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Optional
+
+from DB.connection import get_connection
+
+try:
+    import numpy as np
+except ImportError:  # dependencia opcional, ver Requirements.txt
+    np = None
+
+_EPOCH_JULIAN_DAY = 2440587.5
+_PERIOD_UNITS = {"month": "datetime64[M]", "year": "datetime64[Y]"}
+_COLUMNS = ("ids", "days", "client_ids", "product_ids", "quantities", "total_cents", "iva_cents", "transaction_ids")
+
+
+class _CodeDictionary:
+    """Map string codes to dense integer ids and back."""
+
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self._ids: dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self._ids.get(value)
+        if code is None:
+            code = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self._ids.get(value)
+
+
+class SalesCube:
+    """Array-backed view of ventas answering summarize/top-N queries."""
+
+    def __init__(self, connection_factory: Callable = get_connection, batch_size: int = 50_000) -> None:
+        if np is None:
+            raise ImportError("SalesCube requiere NumPy: pip install numpy")
+        self._connection_factory = connection_factory
+        self.batch_size = batch_size
+        self._reset()
+
+    def _reset(self) -> None:
+        self.last_id = 0
+        self.clients = _CodeDictionary()
+        self.products = _CodeDictionary()
+        self.ids = np.empty(0, dtype=np.int64)
+        self.days = np.empty(0, dtype=np.int32)
+        self.client_ids = np.empty(0, dtype=np.int32)
+        self.product_ids = np.empty(0, dtype=np.int32)
+        self.quantities = np.empty(0, dtype=np.int64)
+        self.total_cents = np.empty(0, dtype=np.int64)
+        self.iva_cents = np.empty(0, dtype=np.int64)
+        # idfactura, o -id para ventas sin factura: una transacción por factura.
+        self.transaction_ids = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return int(self.ids.size)
+
+    def reload(self) -> int:
+        """Drop every loaded row and load ventas again from scratch."""
+        self._reset()
+        return self.refresh()
+
+    def refresh(self) -> int:
+        """Append sales with ``id`` above the last loaded one; return how many."""
+        conn = self._connection_factory()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                f"""
+                SELECT id,
+                       CAST(julianday(date(fecha)) - {_EPOCH_JULIAN_DAY} AS INTEGER),
+                       codclie, codprod, canti,
+                       CAST(ROUND(vrtotal * 100) AS INTEGER),
+                       CAST(ROUND(vriva * 100) AS INTEGER),
+                       COALESCE(idfactura, -id)
+                FROM ventas
+                WHERE id > ?
+                ORDER BY id
+                """,
+                (self.last_id,),
+            )
+            # Cada lote se codifica por separado y las columnas se concatenan
+            # una sola vez al final, sin copiar los arrays en cada lote.
+            chunks: dict[str, list] = {name: [getattr(self, name)] for name in _COLUMNS}
+            last_id = self.last_id
+            added = 0
+            while True:
+                rows = cur.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                added += self._encode(rows, chunks)
+        finally:
+            conn.close()
+        if added:
+            for name, parts in chunks.items():
+                setattr(self, name, np.concatenate(parts))
+        self.last_id = last_id
+        return added
+
+    def _encode(self, rows: list[tuple], chunks: dict[str, list]) -> int:
+        # Ventas con fecha inválida se omiten, igual que en los rollups.
+        rows = [row for row in rows if row[1] is not None]
+        if not rows:
+            return 0
+        ids, days, clients, products, quantities, totals, ivas, transactions = zip(*rows)
+        count = len(rows)
+        chunks["ids"].append(np.fromiter(ids, np.int64, count))
+        chunks["days"].append(np.fromiter(days, np.int32, count))
+        chunks["client_ids"].append(np.fromiter((self.clients.encode(c) for c in clients), np.int32, count))
+        chunks["product_ids"].append(np.fromiter((self.products.encode(p) for p in products), np.int32, count))
+        chunks["quantities"].append(np.fromiter(quantities, np.int64, count))
+        chunks["total_cents"].append(np.fromiter(totals, np.int64, count))
+        chunks["iva_cents"].append(np.fromiter(ivas, np.int64, count))
+        chunks["transaction_ids"].append(np.fromiter(transactions, np.int64, count))
+        return count
+
+    def mask(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        codclie: Optional[str] = None,
+        codprod: Optional[str] = None,
+    ):
+        """Return a boolean array selecting the rows that match every filter."""
+        selected = np.ones(self.ids.size, dtype=bool)
+        if start_date:
+            selected &= self.days >= _day_number(start_date)
+        if end_date:
+            selected &= self.days <= _day_number(end_date)
+        for value, codes, column in (
+            (codclie, self.clients, self.client_ids),
+            (codprod, self.products, self.product_ids),
+        ):
+            if value:
+                code = codes.lookup(value)
+                if code is None:
+                    selected[:] = False
+                else:
+                    selected &= column == code
+        return selected
+
+    def _bucket_labels(self, period: str, days):
+        dates = days.astype("datetime64[D]")
+        if period == "day":
+            return days, lambda key: str(np.datetime64(int(key), "D"))
+        if period in _PERIOD_UNITS:
+            unit = _PERIOD_UNITS[period]
+            return dates.astype(unit).astype(np.int64), lambda key: str(np.datetime64(int(key), unit[-2]))
+        if period == "week":
+            # Mismo cálculo que strftime('%W'): semanas que empiezan en lunes.
+            years = dates.astype("datetime64[Y]")
+            day_of_year = (dates - years.astype("datetime64[D]")).astype(np.int64)
+            monday_weekday = (days.astype(np.int64) + 3) % 7
+            weeks = (day_of_year + 7 - monday_weekday) // 7
+            keys = (years.astype(np.int64) + 1970) * 100 + weeks
+            return keys, lambda key: f"{int(key) // 100:04d}-{int(key) % 100:02d}"
+        raise ValueError(f"Periodo no soportado: {period}")
+
+    def summarize(
+        self,
+        period: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        """Vectorized equivalent of ``SalesCRUD.summarize_sales``."""
+        period = period.lower()
+        selected = self.mask(start_date, end_date)
+        if not selected.any():
+            return []
+        keys, label = self._bucket_labels(period, self.days[selected])
+        buckets, inverse = np.unique(keys, return_inverse=True)
+        size = buckets.size
+        # Como en los rollups: cada factura cuenta una vez por día y cliente.
+        lines = np.stack(
+            [self.days[selected], self.client_ids[selected], self.transaction_ids[selected]], axis=1
+        ).astype(np.int64)
+        first_lines = np.unique(lines, axis=0, return_index=True)[1]
+        transactions = np.bincount(inverse[first_lines], minlength=size)
+        totals = np.bincount(inverse, weights=self.total_cents[selected], minlength=size)
+        ivas = np.bincount(inverse, weights=self.iva_cents[selected], minlength=size)
+        pairs = np.unique(inverse.astype(np.int64) * len(self.clients.values) + self.client_ids[selected])
+        unique_clients = np.bincount(pairs // len(self.clients.values), minlength=size)
+        return [
+            {
+                "periodo": label(buckets[index]),
+                "transacciones": int(transactions[index]),
+                "total_ventas": round(totals[index] / 100, 2),
+                "total_iva": round(ivas[index] / 100, 2),
+                "clientes_unicos": int(unique_clients[index]),
+                "promedio_por_cliente": round(totals[index] / 100 / unique_clients[index], 2),
+            }
+            for index in range(size)
+        ]
+
+    def top_n(
+        self,
+        n: int = 10,
+        group: str = "codprod",
+        by: str = "vrtotal",
+        **filters: Optional[str],
+    ) -> list[tuple[str, float]]:
+        """Return the ``n`` products or clients with the largest ``by`` value."""
+        if group == "codprod":
+            codes, column = self.products, self.product_ids
+        elif group == "codclie":
+            codes, column = self.clients, self.client_ids
+        else:
+            raise ValueError("group debe ser 'codprod' o 'codclie'.")
+        measures = {
+            "vrtotal": self.total_cents,
+            "vriva": self.iva_cents,
+            "canti": self.quantities,
+            "count": None,
+        }
+        if by not in measures:
+            raise ValueError(f"Medida no soportada: {by}")
+        selected = self.mask(**filters)
+        weights = measures[by]
+        sums = np.bincount(
+            column[selected],
+            weights=None if weights is None else weights[selected],
+            minlength=len(codes.values),
+        )
+        order = np.argsort(-sums, kind="stable")[:n]
+        scale = 100 if by in ("vrtotal", "vriva") else 1
+        return [(codes.values[index], round(float(sums[index]) / scale, 2)) for index in order if sums[index] > 0]
+
+
+def _day_number(value: str) -> int:
+    return int(np.datetime64(value[:10], "D").astype(np.int64))
+
+
+def benchmark(username: Any, period: str = "month", repeat: int = 5) -> dict[str, float]:
+    """Compare the best-of-``repeat`` time of SQL summarize_sales and the cube."""
+    from Modules.Sales import SalesCRUD
+
+    sales = SalesCRUD()
+    cube = SalesCube()
+    started = time.perf_counter()
+    cube.refresh()
+    load_seconds = time.perf_counter() - started
+
+    def best(call) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    return {
+        "rows": len(cube),
+        "cube_load_s": load_seconds,
+        "sql_summarize_s": best(lambda: sales.summarize_sales(period, username=username)),
+        "cube_summarize_s": best(lambda: cube.summarize(period)),
+    }
+
+
+def main() -> None:
+    """CLI: print the SQL vs cube benchmark for the configured database."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--period", default="month", choices=["day", "week", "month", "year"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--user", default="viewer", help="Usuario existente con permiso de reportes.")
+    args = parser.parse_args()
+    results = benchmark(args.user, args.period, args.repeat)
+    for key, value in results.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Authenticated user session shared by the GUI and the CRUD services."""
+
+from __future__ import annotations
+
+import itertools
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, FrozenSet, Hashable, Mapping, Optional, Union
+
+from DB.connection import connection_target
+from Modules.Permissions import PERMISSIONS
+
+
+@dataclass(frozen=True)
+class Session:
+    """Immutable principal created once at login.
+
+    Services trust ``level`` without looking the user up again only while
+    the session's ``revision`` is current in ``SESSIONS``; sessions built
+    directly with ``for_user`` carry no revision and are checked like a
+    bare username.
+    """
+
+    username: str
+    level: int
+    permissions: Mapping[str, FrozenSet[str]] = field(default_factory=dict, compare=False)
+    revision: Optional[int] = field(default=None, compare=False)
+
+    @classmethod
+    def for_user(cls, username: str, level: int, revision: Optional[int] = None) -> "Session":
+        """Build a session with the permission set mapped from ``PERMISSIONS``."""
+        permissions = {
+            module: frozenset(levels.get(level, []))
+            for module, levels in PERMISSIONS.items()
+        }
+        return cls(
+            username=username,
+            level=int(level),
+            permissions=MappingProxyType(permissions),
+            revision=revision,
+        )
+
+    def allowed_actions(self, module: str) -> list[str]:
+        """Return the actions allowed in ``module`` keeping PERMISSIONS order."""
+        module = module.lower()
+        allowed = self.permissions.get(module, frozenset())
+        return [action for action in PERMISSIONS.get(module, {}).get(self.level, []) if action in allowed]
+
+    def can(self, module: str, action: str) -> bool:
+        return action in self.permissions.get(module.lower(), frozenset())
+
+
+class SessionRegistry:
+    """Current session revision per user and database.
+
+    ``UsersCRUD.authenticate`` issues sessions and ``update_user`` /
+    ``delete_user`` revoke them, so a demoted or deleted user's session
+    stops being trusted at once. Like ``UserLevelCache``, a revocation that
+    happens while a login is running keeps that login from registering.
+    """
+
+    def __init__(self) -> None:
+        self._revisions: dict[tuple[str, Hashable, str], int] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._generation = 0
+
+    def generation(self) -> int:
+        """Token to take before reading the user row that ``issue`` will trust."""
+        with self._lock:
+            return self._generation
+
+    def issue(
+        self,
+        username: str,
+        level: int,
+        connection_factory: Optional[Callable] = None,
+        generation: Optional[int] = None,
+    ) -> Session:
+        """Return a session trusted by services using the same connection target."""
+        key = (*connection_target(connection_factory), username)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return Session.for_user(username, level)
+            revision = self._revisions.setdefault(key, next(self._ids))
+        return Session.for_user(username, level, revision)
+
+    def is_current(self, session: Session, connection_factory: Optional[Callable] = None) -> bool:
+        if session.revision is None:
+            return False
+        key = (*connection_target(connection_factory), session.username)
+        with self._lock:
+            return self._revisions.get(key) == session.revision
+
+    def revoke(self, username: Optional[str] = None) -> None:
+        """Stop trusting the sessions of ``username`` (every user when None)."""
+        with self._lock:
+            self._generation += 1
+            if username is None:
+                self._revisions.clear()
+            else:
+                for key in [key for key in self._revisions if key[2] == username]:
+                    del self._revisions[key]
+
+
+SESSIONS = SessionRegistry()
+
+
+Principal = Union[str, Session, None]
+
+
+def principal_name(user: Principal) -> Optional[str]:
+    """Return the username for either a Session or a bare username string."""
+    if isinstance(user, Session):
+        return user.username
+    return user
@@ -5,31 +5,104 @@ from __future__ import annotations
 import hashlib
 import hmac
 import os
-from typing import Callable, Optional, Tuple
+import threading
+import time
+from typing import Callable, Hashable, Optional, Tuple
 
-from DB.connection import get_connection
+from DB.connection import connection_target, get_connection, in_unit_of_work
+from DB.metrics import InstrumentedService
+from DB.paging import keyset_page
+from DB.schema import SCHEMA_REGISTRY
+from Modules.Session import SESSIONS, Session
 
 
-class UsersCRUD:
+def hash_password(password: str, salt: str) -> str:
+    """Return the stored form of ``password`` for ``salt`` (hex salt as kept in usuarios.salt)."""
+    return hashlib.sha256((salt + password).encode("utf-8")).hexdigest()
+
+
+class UserLevelCache:
+    """Process-wide TTL cache of user access levels used by ``_authorize``.
+
+    Entries are keyed by the database the CRUD's connection factory opens
+    (see ``connection_target``). ``invalidate`` bumps a generation counter;
+    a level loaded while an invalidation happened is returned but not
+    stored, so a demotion never leaves the old level cached for the TTL.
+    """
+
+    def __init__(self, ttl: float = 60.0) -> None:
+        self.ttl = ttl
+        self._entries: dict[tuple[str, Hashable, str], tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_level(
+        self,
+        username: str,
+        loader: Callable[[str], Optional[int]],
+        connection_factory: Optional[Callable] = None,
+    ) -> Optional[int]:
+        """Return the cached level or load it; unknown users are not cached."""
+        key = (*connection_target(connection_factory), username)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[1] > now:
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            generation = self._generation
+        level = loader(username)
+        # Dentro de una unidad de trabajo el nivel puede no estar confirmado.
+        if level is not None and not in_unit_of_work():
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = (level, now + self.ttl)
+        return level
+
+    def invalidate(self, username: Optional[str] = None) -> None:
+        """Drop one user (for every connection target) or the whole cache."""
+        with self._lock:
+            self._generation += 1
+            if username is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[2] == username]:
+                    del self._entries[key]
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+USER_LEVEL_CACHE = UserLevelCache()
+
+
+class UsersCRUD(InstrumentedService):
     """Provide CRUD operations for application users backed by the users table."""
 
+    metrics_module = "usuarios"
+
     def __init__(self, connection_factory: Callable = get_connection) -> None:
         self._connection_factory = connection_factory
 
     def _ensure_table(self, cursor) -> None:
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS usuarios (
-                nomusu TEXT PRIMARY KEY,
-                clave TEXT NOT NULL,
-                salt TEXT NOT NULL,
-                nivel INTEGER NOT NULL CHECK(nivel IN (1, 2, 3))
-            )
-            """
-        )
+        # Con el esquema al día basta con leer PRAGMA user_version.
+        SCHEMA_REGISTRY.ensure_table(cursor, "usuarios")
 
     def _hash_password(self, password: str, salt: str) -> str:
-        return hashlib.sha256((salt + password).encode("utf-8")).hexdigest()
+        return hash_password(password, salt)
 
     def create_user(self, username: str, password: str, level: int = 1) -> Tuple[bool, str]:
         if not username or not password:
@@ -52,6 +125,7 @@ class UsersCRUD:
                 (username, password_hash, salt, level),
             )
             conn.commit()
+            USER_LEVEL_CACHE.invalidate(username)
             return True, "Usuario creado."
         finally:
             conn.close()
@@ -96,6 +170,33 @@ class UsersCRUD:
         finally:
             conn.close()
 
+    def authenticate(self, username: str, password: str) -> Tuple[Optional[Session], str]:
+        """Verify credentials and build a Session from a single query."""
+        generation = SESSIONS.generation()
+        conn = self._connection_factory()
+        try:
+            cur = conn.cursor()
+            self._ensure_table(cur)
+            cur.execute(
+                "SELECT clave, salt, nivel FROM usuarios WHERE nomusu = ?",
+                (username,),
+            )
+            row = cur.fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None, "Usuario no encontrado."
+        stored_hash, salt, level = row
+        salt = salt or ""
+        candidate = self._hash_password(password, salt)
+        valid = hmac.compare_digest(candidate, stored_hash) or (
+            not salt and hmac.compare_digest(password, stored_hash)
+        )
+        if not valid:
+            return None, "Contraseña incorrecta."
+        session = SESSIONS.issue(username, int(level), self._connection_factory, generation)
+        return session, "Contraseña verificada."
+
     def delete_user(self, username: str) -> Tuple[bool, str]:
         conn = self._connection_factory()
         try:
@@ -106,6 +207,8 @@ class UsersCRUD:
                 return False, "Usuario no encontrado."
             cur.execute("DELETE FROM usuarios WHERE nomusu = ?", (username,))
             conn.commit()
+            USER_LEVEL_CACHE.invalidate(username)
+            SESSIONS.revoke(username)
             return True, "Usuario eliminado."
         finally:
             conn.close()
@@ -116,6 +219,10 @@ class UsersCRUD:
             return None
         return int(user.get("nivel", 1))
 
+    def get_cached_user_level(self, username: str) -> Optional[int]:
+        """Like ``get_user_level`` but served from ``USER_LEVEL_CACHE`` when possible."""
+        return USER_LEVEL_CACHE.get_level(username, self.get_user_level, self._connection_factory)
+
     def update_user(self, username: str, password: Optional[str], level: Optional[int]) -> Tuple[bool, str]:
         if level is not None and level not in (1, 2, 3):
             return False, "Nivel de usuario inválido."
@@ -143,6 +250,8 @@ class UsersCRUD:
                 (password_hash, salt, new_level, username),
             )
             conn.commit()
+            USER_LEVEL_CACHE.invalidate(username)
+            SESSIONS.revoke(username)
             return True, "Usuario actualizado."
         finally:
             conn.close()
@@ -159,6 +268,16 @@ class UsersCRUD:
         finally:
             conn.close()
 
+    def list_users_page(self, after: Optional[str] = None, limit: int = 100) -> tuple[list[dict], Optional[str]]:
+        """Return one page of users after the ``after`` name plus the token for the next page."""
+        conn = self._connection_factory()
+        try:
+            cur = conn.cursor()
+            self._ensure_table(cur)
+            return keyset_page(conn, "usuarios", ("nomusu", "nivel"), "nomusu", after, limit)
+        finally:
+            conn.close()
+
 
 def create_user(nomusu: str, clave: str, nivel: int) -> Tuple[bool, str]:
     """Compatibility helper to create a user via UsersCRUD."""
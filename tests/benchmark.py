@@ -0,0 +1,355 @@
+"""
+Latency benchmarks for the CRUD hot paths and the report queries.
+
+Builds a synthetic database with DB/generate_data.py, then times create,
+read, update, delete and list for every Modules service, summarize_sales
+for each period, list_sales_by_date_range and login. Each case reports
+p50/p95/p99 latency in milliseconds and throughput in operations per
+second. Results are written as JSON and can be compared against a stored
+baseline; a case regresses when its p95 grows by more than the threshold.
+
+Cached list reads are measured cold (QUERY_CACHE is cleared before each
+call, outside the timed region) so they reflect the SQL work. Sales are
+read, updated and deleted by the ids recorded when the benchmark created
+them, and a reused ``--db`` is left without the benchmark user.
+
+Usage:
+    python -m tests.benchmark --sales 1000000 --output bench.json
+    python -m tests.benchmark --baseline tests/benchmark_baseline.json --threshold 0.25
+    python -m tests.benchmark --save-baseline tests/benchmark_baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Callable, Optional
+
+from DB.cache import QUERY_CACHE
+from DB.connection import ENV_VAR_NAME, get_connection
+from DB.generate_data import GeneratorConfig, generate
+from Modules import Custumers
+from Modules.Inventarios import InventoriesCRUD
+from Modules.Products import ProductsCRUD
+from Modules.Providers import ProvidersCRUD
+from Modules.Sales import SalesCRUD
+from Modules.Users import USER_LEVEL_CACHE, UsersCRUD
+
+DEFAULT_ITERATIONS = 200
+DEFAULT_THRESHOLD = 0.25
+COMPARED_METRIC = "p95_ms"
+BENCH_USER = "benchmark"
+BENCH_PASSWORD = "benchmark"
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Return the ``q`` percentile (0-100) of ``samples`` using linear interpolation."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Turn per-call durations (seconds) into the reported latency figures."""
+    total = sum(samples)
+    return {
+        "n": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "ops_per_s": len(samples) / total if total else 0.0,
+    }
+
+
+def measure(
+    call: Callable[[int], object],
+    iterations: int,
+    setup: Optional[Callable[[int], None]] = None,
+    warmup: int = 0,
+) -> dict[str, float]:
+    """
+    Purpose: Time ``call(i)`` for ``i`` in ``range(iterations)``.
+    Args:
+        call: Operation under test; receives the iteration number.
+        iterations: Number of timed calls.
+        setup: Optional untimed hook run before every call.
+        warmup: Untimed calls made first (only for idempotent operations).
+    Returns:
+        Latency percentiles and throughput (see ``summarize``).
+    """
+    for index in range(warmup):
+        if setup is not None:
+            setup(index)
+        call(index)
+    samples = []
+    for index in range(iterations):
+        if setup is not None:
+            setup(index)
+        started = time.perf_counter()
+        call(index)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def _cold_cache(_index: int) -> None:
+    QUERY_CACHE.clear()
+
+
+def _check(result: tuple[bool, str]) -> None:
+    ok, message = result
+    if not ok:
+        raise RuntimeError(message)
+
+
+class _RowidRecorder:
+    """Connection proxy that appends the ``lastrowid`` of every INSERT to ``rowids``."""
+
+    def __init__(self, connection: sqlite3.Connection, rowids: list[int]) -> None:
+        self._connection = connection
+        self._rowids = rowids
+
+    def cursor(self) -> "_RowidRecorder":
+        return _RowidRecorder(self._connection.cursor(), self._rowids)
+
+    def execute(self, sql: str, *args):
+        result = self._connection.execute(sql, *args)
+        if sql.lstrip().upper().startswith("INSERT"):
+            self._rowids.append(result.lastrowid)
+        return result
+
+    def __getattr__(self, name: str):
+        return getattr(self._connection, name)
+
+
+def prepare_database(db_path: Path, config: GeneratorConfig) -> None:
+    """Generate the dataset and add the benchmark user."""
+    generate(db_path, config, log=None)
+    os.environ[ENV_VAR_NAME] = str(db_path)
+    _check(UsersCRUD().create_user(BENCH_USER, BENCH_PASSWORD, 1))
+
+
+def run_suite(iterations: int = DEFAULT_ITERATIONS) -> dict[str, dict[str, float]]:
+    """
+    Purpose: Run every benchmark case against the database in PYTHON_BD_DB_PATH.
+    Args:
+        iterations: Timed calls per case (full-table listings use a tenth).
+    Returns:
+        Mapping of case name ("productos.create", "ventas.summarize.month", ...) to figures.
+    """
+    QUERY_CACHE.clear()
+    USER_LEVEL_CACHE.invalidate()
+    users = UsersCRUD()
+    session, message = users.authenticate(BENCH_USER, BENCH_PASSWORD)
+    if session is None:
+        raise RuntimeError(message)
+    products = ProductsCRUD()
+    providers = ProvidersCRUD()
+    inventories = InventoriesCRUD()
+    sales = SalesCRUD()
+    # Ids reales de las ventas creadas (AUTOINCREMENT no reutiliza ids borrados,
+    # así que MAX(id) + 1 no sirve); los usan read, update y delete.
+    sale_ids: list[int] = []
+    recording_factory = lambda: _RowidRecorder(get_connection(), sale_ids)  # noqa: E731
+    recording_sales = SalesCRUD(connection_factory=recording_factory)
+    recording_session, message = UsersCRUD(connection_factory=recording_factory).authenticate(
+        BENCH_USER, BENCH_PASSWORD
+    )
+    if recording_session is None:
+        raise RuntimeError(message)
+    heavy = max(3, iterations // 10)
+    n = iterations
+
+    conn = sqlite3.connect(os.environ[ENV_VAR_NAME])
+    try:
+        codclie, codprod, nomprod, costovta = conn.execute(
+            """
+            SELECT c.codclie, p.codprod, p.nomprod, p.costovta
+            FROM clientes AS c, productos AS p
+            ORDER BY c.codclie, p.codprod LIMIT 1
+            """
+        ).fetchone()
+        last_day, = conn.execute("SELECT MAX(date(fecha)) FROM ventas").fetchone()
+    finally:
+        conn.close()
+    range_end = last_day or "2024-12-31"
+    range_start = f"{range_end[:7]}-01"
+
+    def user(i: int) -> str:
+        return f"bench_user_{i:06d}"
+
+    def product(i: int) -> str:
+        return f"BP{i:06d}"
+
+    def client(i: int) -> str:
+        return f"BC{i:06d}"
+
+    def provider(i: int) -> str:
+        return f"BPR{i:06d}"
+
+    results: dict[str, dict[str, float]] = {}
+    cases: list[tuple[str, Callable[[int], object], Optional[Callable[[int], None]], int]] = [
+        ("login", lambda i: users.authenticate(BENCH_USER, BENCH_PASSWORD), None, n),
+        ("usuarios.create", lambda i: _check(users.create_user(user(i), "clave", 3)), None, n),
+        ("usuarios.read", lambda i: users.read_user(user(i)), None, n),
+        ("usuarios.update", lambda i: _check(users.update_user(user(i), None, 2)), None, n),
+        ("usuarios.list", lambda i: users.list_users(), None, heavy),
+        ("productos.create", lambda i: _check(products.create_product(product(i), f"Bench {i}", "Benchmark", 0.19, 10.0)), None, n),
+        ("productos.read", lambda i: products.read_product(product(i)), None, n),
+        ("productos.update", lambda i: _check(products.update_product(product(i), f"Bench {i}", "Actualizado", 0.19, 11.0)), None, n),
+        ("productos.list", lambda i: products.list_products(), _cold_cache, heavy),
+        ("clientes.create", lambda i: _check(Custumers.create_client(client(i), f"Cliente {i}", "Calle 1", "600", "Cali")), None, n),
+        ("clientes.read", lambda i: Custumers.get_client(client(i)), None, n),
+        ("clientes.update", lambda i: _check(Custumers.update_client(client(i), f"Cliente {i}", "Calle 2", "601", "Cali")), None, n),
+        ("clientes.list", lambda i: Custumers.list_clients(), _cold_cache, heavy),
+        ("proveedores.create", lambda i: _check(providers.create_provider(provider(i), product(i), "Bench", 5.0, "Calle 3", "602")), None, n),
+        ("proveedores.read", lambda i: providers.read_provider(provider(i)), None, n),
+        ("proveedores.update", lambda i: _check(providers.update_provider(provider(i), product(i), "Bench", 6.0, "Calle 3", "602")), None, n),
+        ("proveedores.list", lambda i: providers.list_providers(), _cold_cache, heavy),
+        ("inventarios.create", lambda i: _check(inventories.create_inventory(product(i), 50, 5, 0.19, 10.0, username=session)), None, n),
+        ("inventarios.read", lambda i: inventories.read_inventory(product(i), username=session), None, n),
+        ("inventarios.update", lambda i: _check(inventories.update_inventory(product(i), 40, 5, 0.19, 11.0, username=session)), None, n),
+        ("inventarios.list", lambda i: inventories.list_inventories(username=session), _cold_cache, heavy),
+        ("ventas.create", lambda i: _check(recording_sales.create_sale("2024-06-01", codclie, codprod, nomprod, costovta, 1, username=recording_session)), None, n),
+        ("ventas.read", lambda i: sales.read_sale(sale_ids[i], username=session), None, n),
+        ("ventas.update", lambda i: _check(sales.update_sale(sale_ids[i], "2024-06-02", codclie, codprod, nomprod, costovta, 2, username=session)), None, n),
+        ("ventas.list", lambda i: sales.list_sales_page(session, limit=100), None, n),
+        ("ventas.list_all", lambda i: sales.list_sales(username=session), _cold_cache, heavy),
+        ("ventas.by_date_range", lambda i: sales.list_sales_by_date_range(range_start, range_end, username=session), None, heavy),
+    ]
+    cases += [
+        (f"ventas.summarize.{period}", lambda i, period=period: sales.summarize_sales(period, username=session), None, heavy)
+        for period in ("day", "week", "month", "year")
+    ]
+    # Los borrados van al final y en orden inverso a las llaves foráneas.
+    cases += [
+        ("ventas.delete", lambda i: _check(sales.delete_sale(sale_ids[i], username=session)), None, n),
+        ("inventarios.delete", lambda i: _check(inventories.delete_inventory(product(i), username=session)), None, n),
+        ("proveedores.delete", lambda i: _check(providers.delete_provider(provider(i))), None, n),
+        ("productos.delete", lambda i: _check(products.delete_product(product(i))), None, n),
+        ("clientes.delete", lambda i: _check(Custumers.delete_client(client(i))), None, n),
+        ("usuarios.delete", lambda i: _check(users.delete_user(user(i))), None, n),
+    ]
+    for name, call, setup, count in cases:
+        results[name] = measure(call, count, setup=setup)
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+    metric: str = COMPARED_METRIC,
+) -> list[tuple[str, float, float]]:
+    """
+    Purpose: Find cases whose ``metric`` grew by more than ``threshold`` over the baseline.
+    Returns:
+        (case, baseline value, current value) for every regression; cases
+        missing from either side are ignored.
+    """
+    regressions = []
+    for name, figures in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get(metric):
+            continue
+        if figures[metric] > previous[metric] * (1 + threshold):
+            regressions.append((name, previous[metric], figures[metric]))
+    return regressions
+
+
+def _metadata(config: GeneratorConfig, iterations: int) -> dict:
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "sales": config.sales,
+        "clients": config.clients,
+        "products": config.products,
+        "seed": config.seed,
+        "iterations": iterations,
+    }
+
+
+def _print_table(results: dict[str, dict[str, float]]) -> None:
+    print(f"{'caso':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>12}")
+    for name, figures in results.items():
+        print(
+            f"{name:<28}{figures['p50_ms']:>10.3f}{figures['p95_ms']:>10.3f}"
+            f"{figures['p99_ms']:>10.3f}{figures['ops_per_s']:>12.1f}"
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point; returns 1 when a regression against the baseline is found."""
+    defaults = GeneratorConfig()
+    parser = argparse.ArgumentParser(description="Benchmark de las operaciones CRUD y los reportes.")
+    parser.add_argument("--sales", type=int, default=defaults.sales)
+    parser.add_argument("--clients", type=int, default=defaults.clients)
+    parser.add_argument("--products", type=int, default=defaults.products)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--db", type=Path, help="Reutiliza esta base ya generada en lugar de crear una temporal.")
+    parser.add_argument("--output", type=Path, help="Archivo JSON donde guardar los resultados.")
+    parser.add_argument("--baseline", type=Path, help="Resultados JSON previos con los que comparar.")
+    parser.add_argument("--save-baseline", type=Path, help="Guarda los resultados como nueva línea base.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Aumento relativo tolerado del p95.")
+    args = parser.parse_args(argv)
+    config = GeneratorConfig(sales=args.sales, clients=args.clients, products=args.products, seed=args.seed)
+
+    previous_db = os.environ.get(ENV_VAR_NAME)
+    created_user = False
+    with TemporaryDirectory() as tmp_dir:
+        try:
+            if args.db is not None and args.db.exists():
+                os.environ[ENV_VAR_NAME] = str(args.db.resolve())
+                if UsersCRUD().read_user(BENCH_USER) is None:
+                    _check(UsersCRUD().create_user(BENCH_USER, BENCH_PASSWORD, 1))
+                    created_user = True
+            else:
+                db_path = (args.db or Path(tmp_dir) / "benchmark.sqlite").resolve()
+                print(f"Generando {config.sales:,} ventas en {db_path}...")
+                prepare_database(db_path, config)
+            results = run_suite(args.iterations)
+        finally:
+            # Un usuario de nivel 1 con clave conocida no se deja en una base ajena.
+            if created_user:
+                UsersCRUD().delete_user(BENCH_USER)
+            if previous_db is None:
+                os.environ.pop(ENV_VAR_NAME, None)
+            else:
+                os.environ[ENV_VAR_NAME] = previous_db
+
+    report = {"metadata": _metadata(config, args.iterations), "results": results}
+    _print_table(results)
+    for target in (args.output, args.save_baseline):
+        if target is not None:
+            target.write_text(json.dumps(report, indent=2), encoding="utf-8")
+            print(f"Resultados guardados en {target}")
+
+    if args.baseline is None:
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline.get("results", {}), args.threshold)
+    if not regressions:
+        print(f"Sin regresiones frente a {args.baseline} (umbral {args.threshold:.0%}).")
+        return 0
+    for name, before, after in regressions:
+        print(f"REGRESIÓN {name}: {COMPARED_METRIC} {before:.3f} -> {after:.3f} ms ({after / before - 1:+.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
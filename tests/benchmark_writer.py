@@ -0,0 +1,160 @@
+"""
+Throughput of concurrent sale writers: direct commits vs. GroupCommitWriter.
+
+Each producer thread registers ``--per-producer`` sales one after another,
+waiting for each to be acknowledged, like a till. "direct" calls
+``SalesCRUD.create_sale`` (one connection and one commit per sale);
+"group" submits the same call to a ``GroupCommitWriter`` and waits on the
+future. Both runs use the same profile (``durable`` by default, so every
+commit is an fsync) and report sales/s, p50/p95/p99 acknowledgement
+latency, errors (e.g. "database is locked") and, for the writer, the
+number of committed batches.
+
+Usage:
+    python -m tests.benchmark_writer --producers 1 8 32 --per-producer 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Callable, Optional
+
+from DB.connection import ENV_VAR_NAME, PROFILE_ENV_VAR_NAME
+from DB.generate_data import GeneratorConfig, generate
+from DB.writer import DEFAULT_BATCH_WINDOW, GroupCommitWriter
+from Modules.Sales import SalesCRUD
+from Modules.Users import UsersCRUD
+from tests.benchmark import BENCH_PASSWORD, BENCH_USER, summarize
+
+DEFAULT_PRODUCERS = (1, 8, 32)
+
+
+def _run_producers(producers: int, per_producer: int, write: Callable[[int], object]) -> dict:
+    latencies: list[float] = []
+    errors: list[str] = []
+    lock = threading.Lock()
+    start = threading.Barrier(producers + 1)
+
+    def producer(number: int) -> None:
+        local_latencies, local_errors = [], []
+        start.wait()
+        for index in range(per_producer):
+            started = time.perf_counter()
+            try:
+                ok, message = write(number * per_producer + index)
+                if not ok:
+                    local_errors.append(message)
+            except Exception as exc:
+                local_errors.append(str(exc))
+            local_latencies.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local_latencies)
+            errors.extend(local_errors)
+
+    threads = [threading.Thread(target=producer, args=(number,)) for number in range(producers)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    figures = summarize(latencies)
+    figures.update(
+        {
+            "producers": producers,
+            "sales": len(latencies) - len(errors),
+            "errors": len(errors),
+            "sales_per_s": (len(latencies) - len(errors)) / elapsed if elapsed else 0.0,
+            "elapsed_s": elapsed,
+        }
+    )
+    if errors:
+        figures["first_error"] = errors[0]
+    return figures
+
+
+def run_comparison(
+    producer_counts: tuple[int, ...] = DEFAULT_PRODUCERS,
+    per_producer: int = 100,
+    profile: Optional[str] = None,
+    batch_window: float = DEFAULT_BATCH_WINDOW,
+) -> list[dict]:
+    """
+    Purpose: Measure direct and group-commit writers against PYTHON_BD_DB_PATH.
+    Returns:
+        One result dict per (mode, producers) pair.
+    """
+    sales = SalesCRUD()
+    users = UsersCRUD()
+    created = users.read_user(BENCH_USER) is None
+    if created:
+        users.create_user(BENCH_USER, BENCH_PASSWORD, 1)
+    session = users.authenticate(BENCH_USER, BENCH_PASSWORD)[0] or BENCH_USER
+
+    def direct(number: int) -> object:
+        return sales.create_sale("2024-06-01", "C0000001", "P000001", "Bench", 10.0, 1, username=session)
+
+    results = []
+    try:
+        for producers in producer_counts:
+            figures = _run_producers(producers, per_producer, direct)
+            results.append({"mode": "direct", **figures})
+
+            with GroupCommitWriter(batch_window=batch_window, profile=profile) as writer:
+                figures = _run_producers(
+                    producers,
+                    per_producer,
+                    lambda number: writer.submit(direct, number).result(),
+                )
+            results.append({"mode": "group", "batches": writer.stats["batches"], **figures})
+    finally:
+        if created:
+            users.delete_user(BENCH_USER)
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point for the writer throughput comparison."""
+    parser = argparse.ArgumentParser(description="Compara escrituras directas con el escritor de commit agrupado.")
+    parser.add_argument("--producers", type=int, nargs="+", default=list(DEFAULT_PRODUCERS))
+    parser.add_argument("--per-producer", type=int, default=100)
+    parser.add_argument("--profile", default="durable", help="Perfil SQLite de ambos modos.")
+    parser.add_argument("--batch-window", type=float, default=DEFAULT_BATCH_WINDOW, help="Segundos.")
+    parser.add_argument("--output", type=Path, help="Archivo JSON donde guardar los resultados.")
+    args = parser.parse_args(argv)
+
+    previous = {name: os.environ.get(name) for name in (ENV_VAR_NAME, PROFILE_ENV_VAR_NAME)}
+    with TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "writers.sqlite"
+        try:
+            generate(db_path, GeneratorConfig(sales=1000, clients=50, products=20), log=None)
+            os.environ[ENV_VAR_NAME] = str(db_path)
+            os.environ[PROFILE_ENV_VAR_NAME] = args.profile
+            results = run_comparison(tuple(args.producers), args.per_producer, args.profile, args.batch_window)
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    print(f"{'modo':<8}{'productores':>12}{'ventas/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'errores':>9}{'lotes':>8}")
+    for row in results:
+        print(
+            f"{row['mode']:<8}{row['producers']:>12}{row['sales_per_s']:>12.1f}{row['p50_ms']:>10.2f}"
+            f"{row['p99_ms']:>10.2f}{row['errors']:>9}{row.get('batches', ''):>8}"
+        )
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Tests for the benchmark harness helpers and a tiny end-to-end run."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.connection import ENV_VAR_NAME
+from tests.benchmark import BENCH_USER, compare, main, percentile, summarize
+
+
+class BenchmarkTests(unittest.TestCase):
+    """Verify percentile math, regression detection and the JSON report."""
+
+    def test_percentiles_interpolate_between_samples(self) -> None:
+        samples = [float(value) for value in range(1, 101)]
+        self.assertAlmostEqual(percentile(samples, 50), 50.5)
+        self.assertAlmostEqual(percentile(samples, 99), 99.01)
+        self.assertEqual(percentile([], 95), 0.0)
+        figures = summarize([0.001, 0.003])
+        self.assertAlmostEqual(figures["p50_ms"], 2.0)
+        self.assertAlmostEqual(figures["ops_per_s"], 500.0)
+
+    def test_compare_flags_only_growth_beyond_the_threshold(self) -> None:
+        baseline = {"login": {"p95_ms": 1.0}, "ventas.read": {"p95_ms": 2.0}, "retirado": {"p95_ms": 1.0}}
+        results = {"login": {"p95_ms": 1.2}, "ventas.read": {"p95_ms": 3.0}, "nuevo": {"p95_ms": 9.0}}
+        self.assertEqual(compare(results, baseline, threshold=0.25), [("ventas.read", 2.0, 3.0)])
+
+    def test_small_run_writes_results_and_compares_with_baseline(self) -> None:
+        previous = os.environ.get(ENV_VAR_NAME)
+        with TemporaryDirectory() as tmp_dir:
+            output = Path(tmp_dir) / "bench.json"
+            args = ["--sales", "300", "--clients", "20", "--products", "10", "--iterations", "3"]
+            self.assertEqual(main(args + ["--output", str(output)]), 0)
+            report = json.loads(output.read_text(encoding="utf-8"))
+            results = report["results"]
+            for name in ("login", "ventas.create", "ventas.by_date_range", "ventas.summarize.week", "clientes.delete"):
+                self.assertIn(name, results)
+            self.assertEqual(report["metadata"]["sales"], 300)
+
+            # Una línea base imposible de igualar hace fallar la comparación.
+            for figures in results.values():
+                figures["p95_ms"] = 1e-9
+            baseline = Path(tmp_dir) / "baseline.json"
+            baseline.write_text(json.dumps(report), encoding="utf-8")
+            self.assertEqual(main(args + ["--baseline", str(baseline)]), 1)
+        self.assertEqual(os.environ.get(ENV_VAR_NAME), previous)
+
+    def test_reused_database_keeps_its_ids_and_loses_the_benchmark_user(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            db_path = Path(tmp_dir) / "reused.sqlite"
+            args = ["--sales", "300", "--clients", "20", "--products", "10", "--iterations", "3"]
+            self.assertEqual(main(args + ["--db", str(db_path)]), 0)
+            conn = sqlite3.connect(db_path)
+            try:
+                # sqlite_sequence queda por delante de MAX(id) y el usuario no existe.
+                conn.execute("DELETE FROM ventas WHERE id = (SELECT MAX(id) FROM ventas)")
+                conn.execute("DELETE FROM usuarios WHERE nomusu = ?", (BENCH_USER,))
+                conn.commit()
+                sales_before = conn.execute("SELECT COUNT(*) FROM ventas").fetchone()[0]
+            finally:
+                conn.close()
+
+            self.assertEqual(main(args + ["--db", str(db_path)]), 0)
+            conn = sqlite3.connect(db_path)
+            try:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM ventas").fetchone()[0], sales_before)
+                user = conn.execute("SELECT 1 FROM usuarios WHERE nomusu = ?", (BENCH_USER,)).fetchone()
+                self.assertIsNone(user)
+            finally:
+                conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
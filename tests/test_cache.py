@@ -0,0 +1,138 @@
+"""Tests for the shared query-result cache and the product catalog."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.cache import QUERY_CACHE, TABLE_VERSIONS, QueryCache
+from DB.connection import get_connection
+from DB.init_db import initialize_database
+from Modules.Products import ProductCatalog, ProductsCRUD
+
+
+class QueryCacheTests(unittest.TestCase):
+    """Verify hits, table-version invalidation and the LRU bounds."""
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        db_path = Path(self._tmp_dir.name) / "cache.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(db_path)
+        initialize_database(str(db_path))
+        self.products = ProductsCRUD()
+
+    def tearDown(self) -> None:
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self._tmp_dir.cleanup()
+
+    def test_listing_is_cached_until_a_write(self) -> None:
+        self.products.create_product("K1", "Uno", "Desc", 0.19, 1.0)
+        before = QUERY_CACHE.stats()
+        self.assertEqual(len(self.products.list_products()), 1)
+        self.assertEqual(len(self.products.list_products()), 1)
+        after = QUERY_CACHE.stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+
+        self.products.create_product("K2", "Dos", "Desc", 0.19, 2.0)
+        self.assertEqual([p["codprod"] for p in self.products.list_products()], ["K1", "K2"])
+
+    def test_returned_rows_are_copies(self) -> None:
+        self.products.create_product("K1", "Uno", "Desc", 0.19, 1.0)
+        self.products.list_products()[0]["nomprod"] = "mutado"
+        self.assertEqual(self.products.list_products()[0]["nomprod"], "Uno")
+
+    def test_services_with_other_factories_do_not_share_entries(self) -> None:
+        other_path = Path(self._tmp_dir.name) / "other.sqlite"
+        initialize_database(str(other_path))
+        other = ProductsCRUD(lambda: sqlite3.connect(other_path))
+        self.products.create_product("K1", "Uno", "Desc", 0.19, 1.0)
+        self.assertEqual(len(self.products.list_products()), 1)
+        self.assertEqual(other.list_products(), [])
+
+    def test_entry_bound_evicts_least_recently_used(self) -> None:
+        cache = QueryCache(TABLE_VERSIONS, max_entries=2)
+        for name in ("a", "b"):
+            cache.get_or_load((name,), ("productos",), lambda: [{"v": 1}])
+        cache.get_or_load(("a",), ("productos",), lambda: [{"v": 1}])
+        cache.get_or_load(("c",), ("productos",), lambda: [{"v": 1}])
+        self.assertEqual(cache.stats()["evictions"], 1)
+        cache.get_or_load(("a",), ("productos",), lambda: [{"v": 2}])
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_external_writes_detected_with_data_version(self) -> None:
+        cache = QueryCache(TABLE_VERSIONS, watch_external=True)
+        load = lambda: ProductsCRUD()._fetch_products()  # noqa: E731
+        self.assertEqual(cache.get_or_load(("p",), ("productos",), load), [])
+        conn = get_connection()
+        try:
+            conn.execute(
+                "INSERT INTO productos (codprod, nomprod, descripcion, iva, costovta) VALUES ('X', 'X', 'X', 0, 1)"
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        self.assertEqual(len(cache.get_or_load(("p",), ("productos",), load)), 1)
+        cache.close()
+
+
+class ProductCatalogTests(unittest.TestCase):
+    """Verify catalog lookups are served from memory and reload after writes."""
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        db_path = Path(self._tmp_dir.name) / "catalog.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(db_path)
+        initialize_database(str(db_path))
+        self.products = ProductsCRUD()
+
+    def tearDown(self) -> None:
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self._tmp_dir.cleanup()
+
+    def test_product_catalog_lookups_without_io(self) -> None:
+        self.products.create_product("A1", "Teclado Atlas", "Desc", 0.19, 120.0)
+        self.products.create_product("A2", "Teclado Nova", "Desc", 0.19, 90.0)
+        self.products.create_product("B1", "Mouse", "Desc", 0.19, 60.0)
+        opened: list[int] = []
+
+        def counting_factory():
+            opened.append(1)
+            return get_connection()
+
+        catalog = ProductCatalog(counting_factory)
+        catalog.ensure_loaded()
+        self.assertEqual(catalog.get("A2")["costovta"], 90.0)
+        self.assertEqual([p["codprod"] for p in catalog.search_prefix("tec")], ["A1", "A2"])
+        self.assertIsNone(catalog.get("ZZ"))
+        self.assertEqual(len(opened), 1)
+
+        self.products.update_product("A2", "Teclado Nova", "Desc", 0.19, 95.0)
+        self.assertEqual(catalog.get("A2")["costovta"], 95.0)
+        self.assertEqual(len(opened), 2)
+
+    def test_peek_serves_the_snapshot_without_loading(self) -> None:
+        opened: list[int] = []
+
+        def counting_factory():
+            opened.append(1)
+            return get_connection()
+
+        catalog = ProductCatalog(counting_factory)
+        self.assertIsNone(catalog.peek("A1"))
+        self.assertTrue(catalog.is_stale())
+        catalog.ensure_loaded()
+        self.products.create_product("A1", "Teclado Atlas", "Desc", 0.19, 120.0)
+        self.assertIsNone(catalog.peek("A1"))
+        self.assertTrue(catalog.is_stale())
+        self.assertEqual(len(opened), 1)
+        catalog.ensure_loaded()
+        self.assertEqual(catalog.peek("A1")["costovta"], 120.0)
+        self.assertFalse(catalog.is_stale())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""Tests for connection helpers, SQLite performance profiles and schema checks."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.connection import (
+    DEFAULT_PROFILE,
+    PERFORMANCE_PROFILES,
+    PROFILE_ENV_VAR_NAME,
+    apply_profile,
+    describe_profile,
+    get_connection,
+    resolve_profile,
+)
+from DB.init_db import SCHEMA_VERSION, initialize_database, migrate
+from DB.schema import SCHEMA_REGISTRY, SchemaOutOfDateError
+
+
+class ProfileTests(unittest.TestCase):
+    """Verify that profiles are resolved and applied as a whole."""
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        os.environ["PYTHON_BD_DB_PATH"] = str(Path(self._tmp_dir.name) / "profile.sqlite")
+
+    def tearDown(self) -> None:
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        os.environ.pop(PROFILE_ENV_VAR_NAME, None)
+        self._tmp_dir.cleanup()
+
+    def test_argument_profile_is_applied(self) -> None:
+        initialize_database(os.environ["PYTHON_BD_DB_PATH"])
+        conn = get_connection(profile="durable")
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 2)
+            self.assertEqual(
+                conn.execute("PRAGMA cache_size").fetchone()[0],
+                PERFORMANCE_PROFILES["durable"]["cache_size"],
+            )
+            self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        finally:
+            conn.close()
+
+    def test_connections_leave_the_journal_mode_to_initialization(self) -> None:
+        statements: list[str] = []
+        conn = get_connection()
+        conn.set_trace_callback(statements.append)
+        try:
+            apply_profile(conn)
+        finally:
+            conn.close()
+        self.assertEqual(len(statements), len(PERFORMANCE_PROFILES[DEFAULT_PROFILE]) - 1)
+        self.assertFalse([sql for sql in statements if "journal_mode" in sql])
+        # El modo WAL queda guardado en el archivo por initialize_database.
+        initialize_database(os.environ["PYTHON_BD_DB_PATH"])
+        raw = sqlite3.connect(os.environ["PYTHON_BD_DB_PATH"])
+        try:
+            self.assertEqual(raw.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        finally:
+            raw.close()
+
+    def test_env_var_selects_profile(self) -> None:
+        os.environ[PROFILE_ENV_VAR_NAME] = "Throughput"
+        self.assertEqual(resolve_profile(), "throughput")
+        self.assertIn("'throughput'", describe_profile())
+
+    def test_unknown_profile_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            resolve_profile("turbo")
+
+
+class SchemaRegistryTests(unittest.TestCase):
+    """Verify that the schema is checked once and outdated schemas fail fast."""
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        self.db_path = Path(self._tmp_dir.name) / "schema.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(self.db_path)
+
+    def tearDown(self) -> None:
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self._tmp_dir.cleanup()
+
+    def test_verify_rejects_uninitialized_database(self) -> None:
+        with self.assertRaises(SchemaOutOfDateError):
+            SCHEMA_REGISTRY.verify()
+        initialize_database(str(self.db_path))
+        SCHEMA_REGISTRY.verify()
+
+    def test_recreated_database_is_verified_again(self) -> None:
+        initialize_database(str(self.db_path))
+        SCHEMA_REGISTRY.verify()
+        self.db_path.unlink()
+        with self.assertRaises(SchemaOutOfDateError):
+            SCHEMA_REGISTRY.verify()
+
+    def test_ensure_table_on_current_schema_reads_only_user_version(self) -> None:
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            SCHEMA_REGISTRY.ensure_table(cursor, "usuarios")
+            self.assertIsNotNone(
+                conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'usuarios'").fetchone()
+            )
+        finally:
+            conn.close()
+
+        initialize_database(str(self.db_path))
+        statements: list[str] = []
+        conn = get_connection()
+        try:
+            conn.set_trace_callback(statements.append)
+            SCHEMA_REGISTRY.ensure_table(conn.cursor(), "usuarios")
+            SCHEMA_REGISTRY.ensure_table(conn.cursor(), "usuarios")
+        finally:
+            conn.close()
+        self.assertEqual(statements, ["PRAGMA user_version"] * 2)
+
+
+class MigrationTests(unittest.TestCase):
+    """user_version-driven migrations and the opt-in demo seed."""
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        self.db_path = Path(self._tmp_dir.name) / "migrate.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(self.db_path)
+
+    def tearDown(self) -> None:
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self._tmp_dir.cleanup()
+
+    def test_up_to_date_database_only_reads_user_version(self) -> None:
+        initialize_database(str(self.db_path))
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        statements: list[str] = []
+        try:
+            conn.set_trace_callback(statements.append)
+            self.assertEqual(migrate(conn), SCHEMA_VERSION)
+        finally:
+            conn.close()
+        self.assertEqual(statements, ["PRAGMA user_version"])
+
+    def test_unversioned_database_is_upgraded(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(
+            """
+            CREATE TABLE usuarios (nomusu TEXT PRIMARY KEY, clave TEXT NOT NULL, nivel INTEGER NOT NULL);
+            INSERT INTO usuarios VALUES ('legacy', 'secreto', 1);
+            """
+        )
+        conn.close()
+        initialize_database(str(self.db_path))
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+            self.assertEqual(conn.execute("SELECT salt FROM usuarios").fetchone(), ("",))
+        finally:
+            conn.close()
+
+    def test_seed_is_repeatable(self) -> None:
+        from Main import seed_demo_data
+        from Modules.Users import UsersCRUD
+
+        initialize_database(str(self.db_path))
+        seed_demo_data()
+        seed_demo_data()
+        conn = get_connection()
+        try:
+            counts = {
+                table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("usuarios", "clientes", "productos", "proveedores", "inventarios", "ventas")
+            }
+        finally:
+            conn.close()
+        self.assertEqual(set(counts.values()), {10})
+        session, _ = UsersCRUD().authenticate("admin", "Admin123")
+        self.assertEqual(session.level, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Tests for the synthetic dataset generator."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import sqlite3
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.generate_data import GeneratorConfig, generate, main
+from DB.init_db import INDEX_DEFINITIONS, TRIGGER_DEFINITIONS
+
+CONFIG = GeneratorConfig(sales=3000, clients=200, products=80, seed=11, batch_size=1000)
+
+
+class GenerateDataTests(unittest.TestCase):
+    """Verify determinism, schema objects and the shape of the generated data."""
+
+    def setUp(self) -> None:
+        self.tmp_dir = TemporaryDirectory()
+        self.db_path = Path(self.tmp_dir.name) / "synthetic.sqlite"
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _dump(self, db_path: Path) -> list:
+        conn = sqlite3.connect(db_path)
+        try:
+            return [
+                conn.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall()
+                for table in ("clientes", "productos", "proveedores", "inventarios", "ventas")
+            ]
+        finally:
+            conn.close()
+
+    def test_same_seed_produces_identical_data(self) -> None:
+        other_path = Path(self.tmp_dir.name) / "again.sqlite"
+        counts = generate(self.db_path, CONFIG, log=None)
+        generate(other_path, CONFIG, log=None)
+        self.assertEqual(counts["ventas"], 3000)
+        self.assertEqual(self._dump(self.db_path), self._dump(other_path))
+
+    def test_indexes_triggers_and_rollups_are_rebuilt(self) -> None:
+        generate(self.db_path, CONFIG, log=None)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+            self.assertTrue(set(INDEX_DEFINITIONS) <= names)
+            self.assertTrue(set(TRIGGER_DEFINITIONS) <= names)
+            rollup = conn.execute("SELECT SUM(transacciones), ROUND(SUM(total), 2) FROM ventas_resumen_diario").fetchone()
+            base = conn.execute("SELECT COUNT(*), ROUND(SUM(vrtotal), 2) FROM ventas").fetchone()
+            self.assertEqual(rollup, base)
+            if "productos_fts" in names:
+                hits = conn.execute("SELECT COUNT(*) FROM productos_fts WHERE productos_fts MATCH 'teclado'").fetchone()[0]
+                expected = conn.execute("SELECT COUNT(*) FROM productos WHERE nomprod LIKE 'Teclado%'").fetchone()[0]
+                self.assertEqual(hits, expected)
+        finally:
+            conn.close()
+
+    def test_sales_are_skewed_towards_popular_products(self) -> None:
+        generate(self.db_path, CONFIG, log=None)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            top = conn.execute(
+                "SELECT COUNT(*) FROM ventas GROUP BY codprod ORDER BY COUNT(*) DESC LIMIT 8"
+            ).fetchall()
+        finally:
+            conn.close()
+        # El 10 % de los productos concentra bastante más del 10 % de las ventas.
+        self.assertGreater(sum(count for (count,) in top), 0.4 * CONFIG.sales)
+
+    def test_refuses_to_write_into_a_populated_database(self) -> None:
+        generate(self.db_path, CONFIG, log=None)
+        with self.assertRaises(ValueError):
+            generate(self.db_path, CONFIG, log=None)
+
+    def test_cli_requires_an_explicit_target(self) -> None:
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main(["--sales", "10"])
+
+
+if __name__ == "__main__":
+    unittest.main()
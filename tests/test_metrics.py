@@ -0,0 +1,124 @@
+"""Tests for the metrics registry, service instrumentation and HTTP endpoint."""
+
+from __future__ import annotations
+
+import io
+import os
+import socket
+import unittest
+from contextlib import redirect_stdout
+import urllib.request
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.init_db import initialize_database
+from DB.metrics import (
+    AUTHORIZATION_DENIALS,
+    CONNECTIONS_OPENED,
+    FK_FAILURES,
+    OPERATION_SECONDS,
+    OPERATIONS,
+    MetricsRegistry,
+    start_metrics_server,
+)
+from Modules import Custumers
+from Modules.Sales import SalesCRUD
+from Modules.Users import UsersCRUD
+
+
+class MetricsTests(unittest.TestCase):
+    """Verify the exposition format and what the CRUD classes report."""
+
+    def setUp(self) -> None:
+        self.tmp_dir = TemporaryDirectory()
+        db_path = Path(self.tmp_dir.name) / "metrics.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(db_path)
+        initialize_database(db_path)
+
+    def tearDown(self) -> None:
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self.tmp_dir.cleanup()
+
+    def test_exposition_format(self) -> None:
+        registry = MetricsRegistry()
+        calls = registry.counter("demo_total", "Demo calls.", ("op",))
+        latency = registry.histogram("demo_seconds", "Demo latency.", ("op",), buckets=(0.1, 1.0))
+        calls.inc('say "hi"')
+        latency.observe(0.05, "a")
+        latency.observe(0.5, "a")
+        text = registry.render()
+        self.assertIn("# TYPE demo_total counter", text)
+        self.assertIn('demo_total{op="say \\"hi\\""} 1', text)
+        self.assertIn('demo_seconds_bucket{op="a",le="0.1"} 1', text)
+        self.assertIn('demo_seconds_bucket{op="a",le="1"} 2', text)
+        self.assertIn('demo_seconds_bucket{op="a",le="+Inf"} 2', text)
+        self.assertIn('demo_seconds_count{op="a"} 2', text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_crud_calls_record_outcomes_denials_and_fk_failures(self) -> None:
+        sales = SalesCRUD()
+        users = UsersCRUD()
+        users.create_user("viewer", "clave", 3)
+        users.create_user("admin", "clave", 1)
+        viewer, _ = users.authenticate("viewer", "clave")
+        admin, _ = users.authenticate("admin", "clave")
+        before = (
+            OPERATIONS.value("ventas", "create_sale", "denied"),
+            AUTHORIZATION_DENIALS.value("ventas", "create_sale"),
+            FK_FAILURES.value("ventas", "create_sale"),
+            OPERATIONS.value("clientes", "create_client", "ok"),
+            OPERATION_SECONDS.count("clientes", "create_client"),
+            CONNECTIONS_OPENED.value(),
+        )
+
+        sales.create_sale("2024-01-01", "C1", "P1", "Lápiz", 1.0, 1, username=viewer)
+        ok, message = sales.create_sale("2024-01-01", "C404", "P1", "Lápiz", 1.0, 1, username=admin)
+        self.assertFalse(ok)
+        Custumers.create_client("C1", "Ana", "Calle", "1", "Cali")
+
+        after = (
+            OPERATIONS.value("ventas", "create_sale", "denied"),
+            AUTHORIZATION_DENIALS.value("ventas", "create_sale"),
+            FK_FAILURES.value("ventas", "create_sale"),
+            OPERATIONS.value("clientes", "create_client", "ok"),
+            OPERATION_SECONDS.count("clientes", "create_client"),
+            CONNECTIONS_OPENED.value(),
+        )
+        self.assertEqual([b - a for a, b in zip(before, after)][:5], [1, 1, 1, 1, 1])
+        self.assertGreaterEqual(after[5] - before[5], 2)
+
+    def test_denied_listing_is_counted_even_without_a_message(self) -> None:
+        before = AUTHORIZATION_DENIALS.value("ventas", "list_sales")
+        self.assertEqual(SalesCRUD().list_sales(username=None), [])
+        self.assertEqual(AUTHORIZATION_DENIALS.value("ventas", "list_sales"), before + 1)
+
+    def test_http_endpoint_serves_the_registry(self) -> None:
+        server = start_metrics_server(0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                self.assertEqual(response.status, 200)
+                self.assertIn("text/plain; version=0.0.4", response.headers["Content-Type"])
+                self.assertIn("python_bd_connections_opened_total", response.read().decode("utf-8"))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_bad_metrics_port_only_warns(self) -> None:
+        from Main import _start_metrics
+
+        busy = socket.socket()
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        try:
+            for port in ("metricas", str(busy.getsockname()[1])):
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    _start_metrics(port)
+                self.assertTrue(output.getvalue().startswith("Aviso:"), output.getvalue())
+        finally:
+            busy.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
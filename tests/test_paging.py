@@ -0,0 +1,69 @@
+"""Tests for the keyset pages behind the listing windows."""
+
+from __future__ import annotations
+
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.connection import get_connection
+from DB.init_db import initialize_database
+from DB.paging import keyset_page
+from GUI.virtual_list import PagedRows
+from Modules.Custumers import create_client, list_clients_page
+from Modules.Products import ProductsCRUD
+
+
+class KeysetPageTests(unittest.TestCase):
+    """Verify page boundaries, tokens and the service wrappers."""
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        self.db_path = Path(self._tmp_dir.name) / "paging.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(self.db_path)
+        initialize_database(str(self.db_path))
+        self.products = ProductsCRUD()
+        for index in range(1, 8):
+            self.products.create_product(f"P{index}", f"Producto {index}", "Desc", 0.19, float(index))
+
+    def tearDown(self) -> None:
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self._tmp_dir.cleanup()
+
+    def test_pages_follow_the_key_until_the_last_one(self) -> None:
+        conn = get_connection()
+        try:
+            rows, token = keyset_page(conn, "productos", ("codprod", "costovta"), "codprod", None, 3)
+            self.assertEqual([row["codprod"] for row in rows], ["P1", "P2", "P3"])
+            self.assertEqual(token, "P3")
+            rows, token = keyset_page(conn, "productos", ("codprod", "costovta"), "codprod", "P6", 3)
+            self.assertEqual([row["codprod"] for row in rows], ["P7"])
+            self.assertIsNone(token)
+            # Una página exacta no deja un token que lleve a una página vacía.
+            rows, token = keyset_page(conn, "productos", ("codprod",), "codprod", "P4", 3)
+            self.assertEqual(len(rows), 3)
+            self.assertIsNone(token)
+            with self.assertRaises(ValueError):
+                keyset_page(conn, "productos", ("codprod",), "codprod", None, 0)
+        finally:
+            conn.close()
+
+    def test_service_pages_drive_paged_rows(self) -> None:
+        rows = PagedRows(lambda after, limit: self.products.list_products_page(after, limit), 2, first_token=None)
+        self.assertEqual([row["codprod"] for row in rows.rows(0, 10)], [f"P{index}" for index in range(1, 8)])
+        self.assertEqual(rows.total, 7)
+        self.assertEqual(rows.loads, 4)
+
+    def test_client_pages(self) -> None:
+        for code in ("C2", "C1", "C3"):
+            create_client(code, f"Cliente {code}", "Calle", "1", "Cali")
+        rows, token = list_clients_page(limit=2)
+        self.assertEqual([row["codclie"] for row in rows], ["C1", "C2"])
+        rows, token = list_clients_page(token, 2)
+        self.assertEqual([row["codclie"] for row in rows], ["C3"])
+        self.assertIsNone(token)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Tests for the pooled connection factory."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.init_db import initialize_database
+from DB.pool import ConnectionPool, PoolTimeoutError
+from DB.unit_of_work import unit_of_work
+from Modules import Custumers
+from Modules.Products import ProductsCRUD
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    """Verify reuse, bounds and CRUD integration of ConnectionPool."""
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        db_path = Path(self._tmp_dir.name) / "pool.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(db_path)
+        initialize_database(str(db_path))
+        self.pool = ConnectionPool(max_size=2, timeout=0.2)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self._tmp_dir.cleanup()
+
+    def test_crud_reuses_connection(self) -> None:
+        products = ProductsCRUD(self.pool)
+        ok, _ = products.create_product("PP1", "Pooled", "Desc", 0.19, 5.0)
+        self.assertTrue(ok)
+        self.assertEqual(products.read_product("PP1")["nomprod"], "Pooled")
+        self.assertEqual(len(products.list_products()), 1)
+        self.assertEqual(self.pool.stats["created"], 1)
+        self.assertEqual(self.pool.stats["reused"], 2)
+
+    def test_foreign_keys_enabled(self) -> None:
+        with self.pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+
+    def test_bounded_size_times_out(self) -> None:
+        first = self.pool()
+        second = self.pool()
+        with self.assertRaises(PoolTimeoutError):
+            self.pool()
+        first.close()
+        third = self.pool()
+        third.close()
+        second.close()
+
+    def test_uncommitted_work_is_rolled_back_on_release(self) -> None:
+        with self.pool.connection() as conn:
+            conn.execute(
+                "INSERT INTO productos (codprod, nomprod, descripcion, iva, costovta) VALUES ('X', 'X', 'X', 0, 1)"
+            )
+        with self.pool.connection() as conn:
+            self.assertIsNone(conn.execute("SELECT 1 FROM productos WHERE codprod = 'X'").fetchone())
+
+    def test_thread_affinity(self) -> None:
+        seen: dict[int, set[int]] = {0: set(), 1: set()}
+        both_checked_out = threading.Barrier(2)
+
+        def worker(number: int) -> None:
+            # La primera ronda obliga a crear una conexión por hilo.
+            with self.pool.connection() as conn:
+                seen[number].add(id(conn._entry.raw))
+                both_checked_out.wait(timeout=5)
+            for _ in range(5):
+                with self.pool.connection() as conn:
+                    seen[number].add(id(conn._entry.raw))
+
+        threads = [threading.Thread(target=worker, args=(number,)) for number in (0, 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([len(ids) for ids in seen.values()], [1, 1])
+        self.assertNotEqual(seen[0], seen[1])
+        self.assertEqual(self.pool.stats["created"], 2)
+        self.assertEqual(self.pool.stats["reused"], 10)
+
+    def test_units_of_work_get_the_unit_connection(self) -> None:
+        products = ProductsCRUD(self.pool)
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                products.create_product("PP1", "Pooled", "Desc", 0.19, 5.0)
+                Custumers.create_client("C1", "Ana", "Calle", "1", "Cali", connection_factory=self.pool)
+                raise RuntimeError("abortar")
+        self.assertEqual(self.pool.stats["created"], 0)
+        self.assertIsNone(products.read_product("PP1"))
+        self.assertIsNone(Custumers.get_client("C1", connection_factory=self.pool))
+
+    def test_client_helpers_use_the_given_factory(self) -> None:
+        ok, _ = Custumers.create_client("C1", "Ana", "Calle", "1", "Cali", connection_factory=self.pool)
+        self.assertTrue(ok)
+        self.assertEqual([row["codclie"] for row in Custumers.list_clients(connection_factory=self.pool)], ["C1"])
+        self.assertEqual(Custumers.list_clients_page(connection_factory=self.pool)[0][0]["nomclie"], "Ana")
+        self.assertEqual(self.pool.stats["created"], 1)
+        self.assertEqual(self.pool.stats["reused"], 2)
+        conn = sqlite3.connect(os.environ["PYTHON_BD_DB_PATH"])
+        try:
+            self.assertEqual(conn.execute("SELECT nomclie FROM clientes").fetchall(), [("Ana",)])
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,475 @@
+"""Tests for SalesCRUD batch, reporting and listing paths."""
+
+from __future__ import annotations
+
+import os
+import threading
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.connection import get_connection
+from DB.init_db import initialize_database
+from DB.progress import (
+    BUDGET_ENV_VAR_NAME,
+    DEFAULT_TIME_BUDGET,
+    QueryControl,
+    QueryInterrupted,
+    default_time_budget,
+)
+from Modules.Sales import SalesCRUD
+from Modules.SalesCube import SalesCube, np
+from Modules.Users import UsersCRUD
+
+
+class SalesTestCase(unittest.TestCase):
+    """Create a fresh database with two clients and two products per test."""
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        db_path = Path(self._tmp_dir.name) / "sales.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(db_path)
+        initialize_database(str(db_path))
+        conn = get_connection()
+        try:
+            conn.executemany(
+                "INSERT INTO clientes (codclie, nomclie, direc, telef, ciudad) VALUES (?, ?, 'Calle', '555', 'Cali')",
+                [("C1", "Uno"), ("C2", "Dos")],
+            )
+            conn.executemany(
+                "INSERT INTO productos (codprod, nomprod, descripcion, iva, costovta) VALUES (?, ?, 'Desc', 0.19, ?)",
+                [("P1", "Prod 1", 10.0), ("P2", "Prod 2", 25.0)],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        UsersCRUD().create_user("seller", "clave", 2)
+        self.session, _ = UsersCRUD().authenticate("seller", "clave")
+        self.sales = SalesCRUD()
+
+    def tearDown(self) -> None:
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self._tmp_dir.cleanup()
+
+    def _sale(self, fecha: str, codclie: str = "C1", codprod: str = "P1", canti: int = 1) -> dict:
+        return {
+            "fecha": fecha,
+            "codclie": codclie,
+            "codprod": codprod,
+            "nomprod": f"Prod {codprod[-1]}",
+            "costovta": 10.0,
+            "canti": canti,
+            "vriva": 1.9 * canti,
+        }
+
+
+class BulkSalesTests(SalesTestCase):
+    def test_bulk_insert_reports_rejects_without_stopping(self) -> None:
+        rows = [self._sale(f"2025-01-{day:02d}") for day in range(1, 8)]
+        rows[2]["codclie"] = "NOPE"
+        rows[4]["canti"] = 0
+        rows[5]["vriva"] = -1.0
+        inserted, rejects = self.sales.create_sales_bulk(rows, self.session, chunk_size=3)
+        self.assertEqual(inserted, 4)
+        self.assertEqual([index for index, _ in rejects], [2, 4, 5])
+        self.assertEqual(len(self.sales.list_sales(self.session)), 4)
+
+    def test_bulk_insert_rejects_malformed_rows_individually(self) -> None:
+        rows = [self._sale("2025-01-01"), ["no", "es", "un", "mapeo"], self._sale("2025-01-02"), None]
+        rows[2]["codclie"] = ["C1"]
+        rows.append(self._sale("2025-01-03"))
+        inserted, rejects = self.sales.create_sales_bulk(rows, self.session)
+        self.assertEqual(inserted, 2)
+        self.assertEqual([index for index, _ in rejects], [1, 2, 3])
+        self.assertTrue(all(message.startswith("Fila inválida") for _, message in rejects))
+
+    def test_bulk_insert_requires_authorization(self) -> None:
+        UsersCRUD().create_user("viewer", "clave", 3)
+        viewer, _ = UsersCRUD().authenticate("viewer", "clave")
+        inserted, rejects = self.sales.create_sales_bulk([self._sale("2025-01-01")], viewer)
+        self.assertEqual(inserted, 0)
+        self.assertIn("Acceso denegado", rejects[0][1])
+
+
+class DateFilterPlanTests(SalesTestCase):
+    """Prove the date filters are served by an index range scan."""
+
+    def _plans_for(self, call, marker: str = "date(fecha)") -> list[str]:
+        statements: list[str] = []
+
+        def traced_connection():
+            conn = get_connection()
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        call(SalesCRUD(traced_connection))
+        selects = [sql for sql in statements if "FROM ventas" in sql and marker in sql]
+        self.assertTrue(selects)
+        conn = get_connection()
+        try:
+            return [
+                " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+                for sql in selects
+            ]
+        finally:
+            conn.close()
+
+    def test_list_sales_by_date_range_uses_index(self) -> None:
+        plans = self._plans_for(
+            lambda sales: sales.list_sales_by_date_range("2025-01-01", "2025-01-31", self.session)
+        )
+        for plan in plans:
+            self.assertIn("SEARCH ventas USING INDEX idx_ventas_fecha_date", plan)
+
+    def test_summarize_sales_uses_index(self) -> None:
+        # summarize_sales reads the rollup tables, keyed by period first.
+        plans = self._plans_for(
+            lambda sales: sales.summarize_sales("month", self.session, "2025-01-01", "2025-03-31"),
+            marker="ventas_resumen",
+        )
+        for plan in plans:
+            self.assertIn("SEARCH ventas_resumen_mensual USING PRIMARY KEY (mes>? AND mes<?)", plan)
+        plans = self._plans_for(
+            lambda sales: sales.summarize_sales("week", self.session, "2025-01-03", "2025-03-09"),
+            marker="ventas_resumen",
+        )
+        for plan in plans:
+            self.assertIn("SEARCH ventas_resumen_diario USING PRIMARY KEY (dia>? AND dia<?)", plan)
+
+    def test_range_is_inclusive_of_timestamps(self) -> None:
+        rows = [self._sale("2025-01-31 18:30:00"), self._sale("2025-02-01")]
+        self.sales.create_sales_bulk(rows, self.session)
+        found = self.sales.list_sales_by_date_range("2025-01-01", "2025-01-31", self.session)
+        self.assertEqual([sale["fecha"] for sale in found], ["2025-01-31 18:30:00"])
+
+
+class SalesPaginationTests(SalesTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        rows = [self._sale(f"2025-01-{day:02d}", codclie="C1" if day % 2 else "C2") for day in range(1, 11)]
+        self.sales.create_sales_bulk(rows, self.session)
+
+    def test_pages_follow_next_token(self) -> None:
+        seen: list[int] = []
+        token = 0
+        while token is not None:
+            page, token = self.sales.list_sales_page(self.session, after_id=token, limit=4)
+            seen.extend(sale["id"] for sale in page)
+        self.assertEqual(seen, [sale["id"] for sale in self.sales.list_sales(self.session)])
+
+    def test_page_size_below_one_is_rejected(self) -> None:
+        for limit in (0, -1):
+            with self.assertRaises(ValueError):
+                self.sales.list_sales_page(self.session, limit=limit)
+
+    def test_filters_apply_to_pages_and_stream(self) -> None:
+        page, token = self.sales.list_sales_page(self.session, limit=10, codclie="C2", end_date="2025-01-06")
+        self.assertEqual([sale["fecha"] for sale in page], ["2025-01-02", "2025-01-04", "2025-01-06"])
+        self.assertIsNone(token)
+        streamed = list(self.sales.iter_sales(self.session, codclie="C2", end_date="2025-01-06", batch_size=2))
+        self.assertEqual(streamed, page)
+
+
+class SalesRollupTests(SalesTestCase):
+    """summarize_sales over rollups must match a direct scan of ventas."""
+
+    def _raw_summary(self, bucket_format: str, start: str, end: str) -> list[dict]:
+        conn = get_connection()
+        try:
+            cur = conn.execute(
+                f"""
+                SELECT strftime('{bucket_format}', fecha) AS periodo,
+                       COUNT(*) AS transacciones,
+                       ROUND(SUM(vrtotal), 2) AS total_ventas,
+                       ROUND(SUM(vriva), 2) AS total_iva,
+                       COUNT(DISTINCT codclie) AS clientes_unicos,
+                       ROUND(SUM(vrtotal) / COUNT(DISTINCT codclie), 2) AS promedio_por_cliente
+                FROM ventas
+                WHERE date(fecha) BETWEEN date(?) AND date(?)
+                GROUP BY periodo ORDER BY periodo
+                """,
+                (start, end),
+            )
+            columns = [desc[0] for desc in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+        finally:
+            conn.close()
+
+    def _assert_matches_raw(self) -> None:
+        formats = {"day": "%Y-%m-%d", "week": "%Y-%W", "month": "%Y-%m", "year": "%Y"}
+        for start, end in (("2024-01-01", "2025-12-31"), ("2025-01-15", "2025-02-20")):
+            for period, bucket_format in formats.items():
+                got = self.sales.summarize_sales(period, self.session, start, end)
+                expected = self._raw_summary(bucket_format, start, end)
+                label = f"{period} {start}..{end}"
+                self.assertEqual(len(got), len(expected), label)
+                for got_row, expected_row in zip(got, expected):
+                    for column, value in expected_row.items():
+                        if isinstance(value, float):
+                            # Summing floats in another order may move a .005 tie.
+                            self.assertAlmostEqual(got_row[column], value, delta=0.011, msg=label)
+                        else:
+                            self.assertEqual(got_row[column], value, label)
+
+    def test_rollups_follow_inserts_updates_and_deletes(self) -> None:
+        rows = []
+        for day in range(1, 29):
+            rows.append(self._sale(f"2025-01-{day:02d}", codclie="C1" if day % 3 else "C2", canti=day % 4 + 1))
+            rows.append(self._sale(f"2025-02-{day:02d} 10:00:00", codclie="C2", codprod="P2"))
+        self.sales.create_sales_bulk(rows, self.session)
+        self._assert_matches_raw()
+
+        sales = self.sales.list_sales(self.session)
+        first = sales[0]
+        self.sales.update_sale(
+            first["id"], "2025-02-14", "C2", "P2", "Prod 2", 25.0, 3, vriva=14.25, username=self.session
+        )
+        for sale in sales[10:20]:
+            self.sales.delete_sale(sale["id"], username=self.session)
+        self._assert_matches_raw()
+
+    def test_rebuild_matches_trigger_maintained_state(self) -> None:
+        from DB.init_db import rebuild_sales_rollups
+
+        self.sales.create_sales_bulk([self._sale("2025-03-01"), self._sale("2025-03-02", codclie="C2")], self.session)
+        before = self.sales.summarize_sales("month", self.session)
+        conn = get_connection()
+        try:
+            rebuild_sales_rollups(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        self.assertEqual(self.sales.summarize_sales("month", self.session), before)
+        self.assertEqual(before[0]["clientes_unicos"], 2)
+
+
+class SaleWithStockTests(SalesTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        conn = get_connection()
+        try:
+            conn.executemany(
+                "INSERT INTO inventarios (codprod, nomprod, cantidad, stock_minimo, iva, costovta) VALUES (?, ?, ?, 0, 0.19, 10)",
+                [("P1", "Prod 1", 10), ("P2", "Prod 2", 2)],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _stock(self, codprod: str) -> int:
+        conn = get_connection()
+        try:
+            return conn.execute("SELECT cantidad FROM inventarios WHERE codprod = ?", (codprod,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_basket_is_all_or_nothing(self) -> None:
+        lines = [{"codprod": "P1", "canti": 3}, {"codprod": "P2", "canti": 5}]
+        ok, msg = self.sales.create_sale_with_stock("2025-05-01", "C1", lines, self.session)
+        self.assertFalse(ok)
+        self.assertIn("Stock insuficiente", msg)
+        self.assertEqual((self._stock("P1"), self._stock("P2")), (10, 2))
+        self.assertEqual(self.sales.list_sales(self.session), [])
+
+        lines[1]["canti"] = 2
+        ok, _ = self.sales.create_sale_with_stock("2025-05-01", "C1", lines, self.session)
+        self.assertTrue(ok)
+        self.assertEqual((self._stock("P1"), self._stock("P2")), (7, 0))
+        sold = self.sales.list_sales(self.session)
+        self.assertEqual([sale["canti"] for sale in sold], [3, 2])
+        self.assertEqual(sold[1]["vrtotal"], round(50.0 * 1.19, 2))
+
+    def test_concurrent_tills_never_oversell(self) -> None:
+        results: list[bool] = []
+
+        def till() -> None:
+            ok, _ = SalesCRUD().create_sale_with_stock("2025-05-02", "C2", [{"codprod": "P1", "canti": 1}], self.session)
+            results.append(ok)
+
+        threads = [threading.Thread(target=till) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 10)
+        self.assertEqual(self._stock("P1"), 0)
+
+
+class InvoiceTests(SalesTestCase):
+    def test_invoice_totals_and_view(self) -> None:
+        lines = [{"codprod": "P1", "canti": 2}, {"codprod": "P2", "canti": 1, "costovta": 20.0}]
+        invoice_id, _ = self.sales.create_invoice("2025-06-01", "C2", lines, self.session)
+        self.assertIsNotNone(invoice_id)
+        invoice = self.sales.read_invoice(invoice_id, self.session)
+        self.assertEqual(invoice["subtotal"], 40.0)
+        self.assertEqual(invoice["vriva"], 7.6)
+        self.assertEqual(invoice["vrtotal"], 47.6)
+        self.assertEqual([line["codprod"] for line in invoice["lineas"]], ["P1", "P2"])
+
+        conn = get_connection()
+        try:
+            view_rows = conn.execute("SELECT COUNT(*) FROM vw_sales_with_clients").fetchone()[0]
+        finally:
+            conn.close()
+        self.assertEqual(view_rows, 2)
+        for start, end in ((None, None), ("2025-06-01", "2025-06-15")):
+            summary = self.sales.summarize_sales("month", self.session, start, end)
+            self.assertEqual(summary[0]["transacciones"], 1)
+            self.assertEqual(summary[0]["total_ventas"], 47.6)
+
+    def test_line_changes_keep_the_header_in_sync(self) -> None:
+        lines = [{"codprod": "P1", "canti": 2}, {"codprod": "P2", "canti": 1}]
+        invoice_id, _ = self.sales.create_invoice("2025-06-01", "C2", lines, self.session)
+        first, second = self.sales.read_invoice(invoice_id, self.session)["lineas"]
+
+        ok, _ = self.sales.update_sale(first["id"], "2025-06-01", "C2", "P1", "Prod 1", 10.0, 5, vriva=9.5,
+                                       username=self.session)
+        self.assertTrue(ok)
+        invoice = self.sales.read_invoice(invoice_id, self.session)
+        for column in ("subtotal", "vriva", "vrtotal"):
+            self.assertEqual(invoice[column], round(sum(line[column] for line in invoice["lineas"]), 2))
+        self.assertEqual(invoice["vrtotal"], 59.5 + 29.75)
+
+        self.sales.delete_sale(first["id"], self.session)
+        self.assertEqual(self.sales.read_invoice(invoice_id, self.session)["vrtotal"], second["vrtotal"])
+        self.assertEqual(self.sales.summarize_sales("day", self.session)[0]["transacciones"], 1)
+        self.sales.delete_sale(second["id"], self.session)
+        self.assertIsNone(self.sales.read_invoice(invoice_id, self.session))
+        self.assertEqual(self.sales.summarize_sales("day", self.session), [])
+
+    def test_invalid_line_rejects_whole_invoice(self) -> None:
+        lines = [{"codprod": "P1", "canti": 1}, {"codprod": "P404", "canti": 1}]
+        invoice_id, msg = self.sales.create_invoice("2025-06-01", "C1", lines, self.session)
+        self.assertIsNone(invoice_id)
+        self.assertIn("P404", msg)
+        self.assertEqual(self.sales.list_sales(self.session), [])
+
+    def test_malformed_lines_return_an_error(self) -> None:
+        bad_lines = [
+            {"codprod": "P1", "canti": "dos"},
+            {"codprod": "P1", "canti": 1, "costovta": "gratis"},
+            {"codprod": ["P1"], "canti": 1},
+            "P1",
+        ]
+        for bad_line in bad_lines:
+            lines = [{"codprod": "P2", "canti": 1}, bad_line]
+            invoice_id, msg = self.sales.create_invoice("2025-06-01", "C1", lines, self.session)
+            self.assertIsNone(invoice_id)
+            self.assertTrue(msg.startswith("Línea 2 inválida"), msg)
+        for vriva in (-1.0, float("nan"), "inf"):
+            lines = [{"codprod": "P2", "canti": 1}, {"codprod": "P1", "canti": 1, "vriva": vriva}]
+            invoice_id, msg = self.sales.create_invoice("2025-06-01", "C1", lines, self.session)
+            self.assertIsNone(invoice_id)
+            self.assertTrue(msg.startswith("Línea 2 inválida"), msg)
+        ok, msg = self.sales.create_sale_with_stock("2025-06-01", "C1", [{"codprod": "P1", "canti": None}], self.session)
+        self.assertFalse(ok)
+        self.assertEqual(self.sales.list_sales(self.session), [])
+
+
+class ReportCancellationTests(SalesTestCase):
+    """Report queries stop on cancel() or when the time budget runs out."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        rows = [self._sale(f"2025-01-{day % 28 + 1:02d}") for day in range(200)]
+        self.sales.create_sales_bulk(rows, self.session)
+
+    def test_outcome_ok_reports_progress(self) -> None:
+        control = QueryControl(time_budget=60.0, interval=10)
+        outcome = control.run(self.sales.list_sales_by_date_range, "2025-01-01", "2025-01-31", self.session)
+        self.assertTrue(outcome.ok)
+        self.assertEqual(len(outcome.rows), 200)
+        self.assertGreater(control.steps, 0)
+
+    def test_time_budget_returns_timeout_outcome(self) -> None:
+        control = QueryControl(time_budget=0.0, interval=1)
+        outcome = control.run(self.sales.summarize_sales, "day", self.session)
+        self.assertEqual(outcome.status, "timeout")
+        self.assertEqual(outcome.rows, [])
+        self.assertIn("tiempo máximo", outcome.message)
+
+    def test_cancel_from_another_thread_interrupts_query(self) -> None:
+        control = QueryControl(interval=1000)
+        conn = get_connection()
+        timer = threading.Timer(0.05, control.cancel)
+        timer.start()
+        try:
+            with self.assertRaises(QueryInterrupted) as raised:
+                with control.watch(conn):
+                    conn.execute(
+                        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT max(i) FROM n"
+                    ).fetchone()
+        finally:
+            timer.cancel()
+            conn.close()
+        self.assertEqual(raised.exception.status, "cancelled")
+
+    def test_cancelled_before_start_skips_the_query(self) -> None:
+        control = QueryControl()
+        control.cancel()
+        outcome = control.run(self.sales.list_sales_by_date_range, "2025-01-01", "2025-01-31", self.session)
+        self.assertEqual(outcome.status, "cancelled")
+
+    def test_budget_from_environment(self) -> None:
+        for raw, expected in (("12.5", 12.5), ("0", None), ("", None), ("treinta", DEFAULT_TIME_BUDGET)):
+            os.environ[BUDGET_ENV_VAR_NAME] = raw
+            try:
+                self.assertEqual(default_time_budget(), expected, raw)
+            finally:
+                os.environ.pop(BUDGET_ENV_VAR_NAME, None)
+        self.assertEqual(default_time_budget(), DEFAULT_TIME_BUDGET)
+
+
+@unittest.skipUnless(np is not None, "NumPy no está instalado")
+class SalesCubeTests(SalesTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        rows = []
+        for day in range(1, 29):
+            rows.append(self._sale(f"2025-01-{day:02d}", codclie="C1" if day % 3 else "C2", canti=day % 4 + 1))
+            rows.append(self._sale(f"2025-02-{day:02d} 10:00:00", codclie="C2", codprod="P2"))
+        self.sales.create_sales_bulk(rows, self.session)
+        self.cube = SalesCube()
+        self.cube.refresh()
+
+    def test_summarize_matches_sql(self) -> None:
+        for period in ("day", "week", "month", "year"):
+            for start, end in ((None, None), ("2025-01-10", "2025-02-03")):
+                expected = self.sales.summarize_sales(period, self.session, start, end)
+                got = self.cube.summarize(period, start, end)
+                self.assertEqual([row["periodo"] for row in got], [row["periodo"] for row in expected])
+                for got_row, expected_row in zip(got, expected):
+                    self.assertEqual(got_row["transacciones"], expected_row["transacciones"])
+                    self.assertEqual(got_row["clientes_unicos"], expected_row["clientes_unicos"])
+                    self.assertAlmostEqual(got_row["total_ventas"], expected_row["total_ventas"], delta=0.011)
+
+    def test_incremental_refresh_and_top_n(self) -> None:
+        self.assertEqual(self.cube.refresh(), 0)
+        self.sales.create_sales_bulk([self._sale("2025-03-01", codprod="P2", canti=50)], self.session)
+        self.assertEqual(self.cube.refresh(), 1)
+        self.assertEqual(len(self.cube), 57)
+        top = self.cube.top_n(1, group="codprod", by="canti")
+        self.assertEqual(top[0][0], "P2")
+        self.assertEqual(self.cube.top_n(5, group="codclie", by="count", codprod="P2"), [("C2", 28.0), ("C1", 1.0)])
+
+    def test_invoices_count_as_one_transaction(self) -> None:
+        lines = [{"codprod": "P1", "canti": 1}, {"codprod": "P2", "canti": 2}, {"codprod": "P1", "canti": 3}]
+        self.sales.create_invoice("2025-03-05", "C1", lines, self.session)
+        self.cube.refresh()
+        for period in ("day", "month"):
+            expected = self.sales.summarize_sales(period, self.session, "2025-03-01", "2025-03-31")
+            got = self.cube.summarize(period, "2025-03-01", "2025-03-31")
+            self.assertEqual([row["transacciones"] for row in got], [1])
+            self.assertEqual([row["transacciones"] for row in expected], [1])
+
+    def test_batched_load_matches_single_batch(self) -> None:
+        batched = SalesCube(batch_size=5)
+        self.assertEqual(batched.refresh(), len(self.cube))
+        self.assertEqual(batched.last_id, self.cube.last_id)
+        for column in ("ids", "days", "client_ids", "product_ids", "quantities", "total_cents", "iva_cents",
+                       "transaction_ids"):
+            self.assertEqual(getattr(batched, column).tolist(), getattr(self.cube, column).tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
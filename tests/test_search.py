@@ -0,0 +1,88 @@
+"""Tests for the FTS5 product and client search."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.connection import get_connection
+from DB.init_db import initialize_database
+from DB.search import match_expression, search
+from Modules.Custumers import create_client, delete_client, search_clients, update_client
+from Modules.Products import ProductsCRUD
+
+
+class SearchTests(unittest.TestCase):
+    """Verify ranking, prefix matching and trigger synchronisation."""
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        self.db_path = Path(self._tmp_dir.name) / "search.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(self.db_path)
+        initialize_database(str(self.db_path))
+        self.products = ProductsCRUD()
+        self.products.create_product("P1", "Laptop Gamer", "Portátil con tarjeta gráfica", 0.19, 900.0)
+        self.products.create_product("P2", "Mouse", "Accesorio para laptop", 0.19, 20.0)
+        self.products.create_product("P3", "Teclado", "Mecánico", 0.19, 50.0)
+
+    def tearDown(self) -> None:
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self._tmp_dir.cleanup()
+
+    def test_match_expression_quotes_prefix_terms(self) -> None:
+        self.assertEqual(match_expression('lap "gam" OR'), '"lap"* "gam"* "OR"*')
+        self.assertEqual(match_expression("  ,; "), "")
+
+    def test_name_matches_rank_before_description_matches(self) -> None:
+        results = self.products.search_products("lap")
+        self.assertEqual([p["codprod"] for p in results], ["P1", "P2"])
+        self.assertEqual(results[0]["costovta"], 900.0)
+
+    def test_search_ignores_accents_and_blank_queries(self) -> None:
+        self.assertEqual([p["codprod"] for p in self.products.search_products("mecanico")], ["P3"])
+        self.assertEqual(self.products.search_products("   "), [])
+
+    def test_updates_and_deletes_keep_index_in_sync(self) -> None:
+        self.products.update_product("P3", "Teclado Gamer", "Mecánico", 0.19, 55.0)
+        self.assertEqual({p["codprod"] for p in self.products.search_products("gamer")}, {"P1", "P3"})
+        self.products.delete_product("P1")
+        self.assertEqual([p["codprod"] for p in self.products.search_products("gamer")], ["P3"])
+
+    def test_search_clients_by_name_and_city(self) -> None:
+        create_client("C1", "Ana Gómez", "Calle 1", "555", "Medellín")
+        create_client("C2", "Luis Pérez", "Carrera 2", "556", "Bogotá")
+        self.assertEqual([c["codclie"] for c in search_clients("gomez")], ["C1"])
+        self.assertEqual([c["codclie"] for c in search_clients("bogo")], ["C2"])
+        update_client("C2", "Luis Pérez", "Carrera 2", "556", "Cali")
+        self.assertEqual(search_clients("bogota"), [])
+        delete_client("C1")
+        self.assertEqual(search_clients("ana"), [])
+
+    def test_existing_rows_are_indexed_when_upgrading(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DROP TABLE productos_fts")
+        conn.execute("PRAGMA user_version = 4")
+        conn.commit()
+        conn.close()
+        initialize_database(str(self.db_path))
+        self.assertEqual([p["codprod"] for p in self.products.search_products("teclado")], ["P3"])
+
+    def test_like_fallback_without_fts_table(self) -> None:
+        conn = get_connection()
+        try:
+            # Así queda una base creada con un SQLite sin FTS5.
+            for suffix in ("insert", "delete", "update"):
+                conn.execute(f"DROP TRIGGER trg_clientes_fts_{suffix}")
+            conn.execute("DROP TABLE clientes_fts")
+            conn.execute("INSERT INTO clientes VALUES ('C9', 'Marta Ruiz', 'Av 3', '1', 'Pasto')")
+            rows = search(conn, "clientes_fts", ("codclie",), "ruiz pas", 10)
+        finally:
+            conn.close()
+        self.assertEqual(rows, [{"codclie": "C9"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
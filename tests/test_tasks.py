@@ -0,0 +1,62 @@
+"""Tests for the keyed background executor used by the GUI windows."""
+
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from GUI.tasks import KeyedExecutor
+
+
+class KeyedExecutorTests(unittest.TestCase):
+    """Verify per-key ordering, parallelism across keys and cancellation."""
+
+    def setUp(self) -> None:
+        self.executor = KeyedExecutor(max_workers=4)
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+
+    def test_same_key_runs_in_submission_order(self) -> None:
+        seen: list[int] = []
+
+        def record(value: int) -> int:
+            time.sleep(0.002 * (5 - value))
+            seen.append(value)
+            return value
+
+        futures = [self.executor.submit("ventas", record, value) for value in range(5)]
+        self.assertEqual([future.result(timeout=5) for future in futures], list(range(5)))
+        self.assertEqual(seen, list(range(5)))
+
+    def test_different_keys_run_in_parallel(self) -> None:
+        gate = threading.Event()
+        blocked = self.executor.submit("ventas", gate.wait, 5)
+        other = self.executor.submit("productos", lambda: "listo")
+        self.assertEqual(other.result(timeout=5), "listo")
+        self.assertFalse(blocked.done())
+        gate.set()
+        self.assertTrue(blocked.result(timeout=5))
+
+    def test_queued_call_can_be_cancelled_without_breaking_the_lane(self) -> None:
+        gate = threading.Event()
+        calls: list[str] = []
+        first = self.executor.submit("clientes", gate.wait, 5)
+        second = self.executor.submit("clientes", calls.append, "cancelada")
+        third = self.executor.submit("clientes", calls.append, "ejecutada")
+        self.assertTrue(second.cancel())
+        gate.set()
+        first.result(timeout=5)
+        third.result(timeout=5)
+        self.assertEqual(calls, ["ejecutada"])
+
+    def test_exceptions_are_delivered_through_the_future(self) -> None:
+        future = self.executor.submit("usuarios", lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            future.result(timeout=5)
+        self.assertEqual(self.executor.submit("usuarios", lambda: 2).result(timeout=5), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
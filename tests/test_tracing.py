@@ -0,0 +1,111 @@
+"""Tests for the opt-in SQL tracer and slow-query log."""
+
+from __future__ import annotations
+
+import json
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.connection import get_connection
+from DB.init_db import initialize_database
+from DB.tracing import (
+    DEFAULT_SLOW_QUERY_MS,
+    QUERY_TRACER,
+    SLOW_QUERY_ENV_VAR_NAME,
+    QueryTracer,
+    TracedConnection,
+    format_report,
+    normalize_sql,
+)
+from Modules.Products import ProductsCRUD
+
+
+class TracingTests(unittest.TestCase):
+    """Verify normalization, per-statement aggregates and the slow-query log."""
+
+    def setUp(self) -> None:
+        self.tmp_dir = TemporaryDirectory()
+        self.db_path = Path(self.tmp_dir.name) / "trace.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(self.db_path)
+        initialize_database(self.db_path)
+        self.previous = (QUERY_TRACER.enabled, QUERY_TRACER.slow_threshold_ms)
+        QUERY_TRACER.reset()
+        QUERY_TRACER.enable(slow_threshold_ms=10_000)
+
+    def tearDown(self) -> None:
+        QUERY_TRACER.enabled, QUERY_TRACER.slow_threshold_ms = self.previous
+        QUERY_TRACER.reset()
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self.tmp_dir.cleanup()
+
+    def test_literals_and_whitespace_are_normalized(self) -> None:
+        self.assertEqual(
+            normalize_sql("SELECT *\n  FROM ventas WHERE codclie = 'O''Neil' AND canti > 3 AND id IN (1, 2, 3);"),
+            "SELECT * FROM ventas WHERE codclie = ? AND canti > ? AND id IN (?)",
+        )
+        self.assertEqual(normalize_sql("SELECT * FROM t1 WHERE x = ?"), "SELECT * FROM t1 WHERE x = ?")
+
+    def test_expanded_and_parameterized_statements_share_an_entry(self) -> None:
+        products = ProductsCRUD()
+        for index in range(3):
+            products.create_product(f"P{index}", f"Producto {index}", "Desc", 0.19, 10.0 + index)
+        conn = get_connection()
+        self.assertIsInstance(conn, TracedConnection)
+        conn.close()
+
+        stats = QUERY_TRACER.snapshot()
+        insert = stats["INSERT INTO productos (codprod, nomprod, descripcion, iva, costovta) VALUES (?, ?, ?, ?, ?)"]
+        self.assertEqual(insert["calls"], 3)
+        self.assertEqual(insert["timed"], 3)
+        self.assertEqual(sum(insert["histogram"].values()), 3)
+        self.assertGreaterEqual(insert["max_ms"], insert["p50_ms"])
+
+        conn = get_connection()
+        try:
+            conn.executemany("UPDATE productos SET costovta = ? WHERE codprod = ?", [(1.0, "P0"), (2.0, "P1")])
+            conn.commit()
+        finally:
+            conn.close()
+        update = QUERY_TRACER.snapshot()["UPDATE productos SET costovta = ? WHERE codprod = ?"]
+        self.assertEqual((update["calls"], update["timed"]), (2, 1))
+
+    def test_slow_statements_are_logged_with_their_plan(self) -> None:
+        QUERY_TRACER.enable(slow_threshold_ms=0)
+        conn = get_connection()
+        try:
+            conn.execute("SELECT codprod FROM productos WHERE codprod = ?", ("P1",)).fetchone()
+        finally:
+            conn.close()
+        slow = [entry for entry in QUERY_TRACER.slow_queries() if entry.sql.startswith("SELECT codprod")]
+        self.assertEqual(len(slow), 1)
+        self.assertEqual(slow[0].params, "('P1',)")
+        self.assertTrue(any("productos" in step for step in slow[0].plan))
+        self.assertNotIn("EXPLAIN", " ".join(QUERY_TRACER.snapshot()))
+
+        dump_path = Path(self.tmp_dir.name) / "trace.json"
+        QUERY_TRACER.dump(str(dump_path))
+        report = json.loads(dump_path.read_text(encoding="utf-8"))
+        self.assertIn("SELECT codprod FROM productos WHERE codprod = ?", report["statements"])
+        self.assertIn("Consultas lentas", format_report(report))
+
+    def test_disabled_tracer_returns_plain_connections(self) -> None:
+        QUERY_TRACER.disable()
+        conn = get_connection()
+        try:
+            self.assertNotIsInstance(conn, TracedConnection)
+        finally:
+            conn.close()
+
+    def test_slow_threshold_from_environment(self) -> None:
+        for raw, expected in (("250", 250.0), ("", DEFAULT_SLOW_QUERY_MS), ("lento", DEFAULT_SLOW_QUERY_MS)):
+            os.environ[SLOW_QUERY_ENV_VAR_NAME] = raw
+            try:
+                self.assertEqual(QueryTracer.from_env().slow_threshold_ms, expected, raw)
+            finally:
+                os.environ.pop(SLOW_QUERY_ENV_VAR_NAME, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
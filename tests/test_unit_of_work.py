@@ -0,0 +1,228 @@
+"""Tests for the unit-of-work transaction scope shared by the CRUD services."""
+
+from __future__ import annotations
+
+import itertools
+import os
+import sqlite3
+import threading
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.connection import get_connection
+from DB.init_db import initialize_database
+from DB.unit_of_work import UnitOfWorkAborted, unit_of_work
+from Modules import Custumers
+from Modules.Inventarios import InventoriesCRUD
+from Modules.Products import ProductCatalog, ProductsCRUD
+from Modules.Providers import ProvidersCRUD
+from Modules.Sales import SalesCRUD
+from Modules.Users import UsersCRUD
+
+
+class UnitOfWorkTests(unittest.TestCase):
+    """Verify single-commit scopes, rollback, savepoints and cache coherence."""
+
+    def setUp(self) -> None:
+        self.tmp_dir = TemporaryDirectory()
+        self.db_path = Path(self.tmp_dir.name) / "uow.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(self.db_path)
+        initialize_database(self.db_path)
+        UsersCRUD().create_user("admin", "clave", 1)
+        self.session, _ = UsersCRUD().authenticate("admin", "clave")
+        self.products = ProductsCRUD()
+        self.providers = ProvidersCRUD()
+        self.inventories = InventoriesCRUD()
+
+    def tearDown(self) -> None:
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self.tmp_dir.cleanup()
+
+    def _count(self, table: str) -> int:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+
+    def _create_bundle(self, codprod: str) -> None:
+        self.assertTrue(self.products.create_product(codprod, "Teclado", "USB", 0.19, 25.0)[0])
+        self.assertTrue(self.providers.create_provider(f"PR{codprod}", codprod, "Teclado", 18.0, "Calle 1", "555")[0])
+        self.assertTrue(self.inventories.create_inventory(codprod, 10, 2, 0.19, 25.0, username=self.session)[0])
+
+    def test_composite_operation_commits_once_at_the_end(self) -> None:
+        with unit_of_work():
+            self._create_bundle("P1")
+            self.assertEqual(self.products.read_product("P1")["nomprod"], "Teclado")
+            # Otra conexión todavía no ve nada.
+            self.assertEqual(self._count("productos"), 0)
+        self.assertEqual([self._count(t) for t in ("productos", "proveedores", "inventarios")], [1, 1, 1])
+
+    def test_exception_rolls_back_every_call(self) -> None:
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                self._create_bundle("P1")
+                raise RuntimeError("abortar")
+        self.assertEqual([self._count(t) for t in ("productos", "proveedores", "inventarios")], [0, 0, 0])
+
+    def test_nested_scope_is_a_savepoint(self) -> None:
+        with unit_of_work():
+            self._create_bundle("P1")
+            with self.assertRaises(RuntimeError):
+                with unit_of_work():
+                    self._create_bundle("P2")
+                    raise RuntimeError("solo el bloque interno")
+            with unit_of_work():
+                Custumers.create_client("C1", "Ana", "Calle", "1", "Cali")
+        self.assertEqual(self._count("productos"), 1)
+        self.assertEqual(self._count("clientes"), 1)
+
+    def test_services_keep_their_own_rollback_semantics(self) -> None:
+        sales = SalesCRUD()
+        with unit_of_work():
+            self._create_bundle("P1")
+            Custumers.create_client("C1", "Ana", "Calle", "1", "Cali")
+            # create_invoice emite BEGIN IMMEDIATE y, sin stock, revierte solo su parte.
+            invoice_id, message = sales.create_invoice(
+                "2024-01-01", "C1", [{"codprod": "P1", "canti": 50}], username=self.session, update_stock=True
+            )
+            self.assertIsNone(invoice_id)
+            invoice_id, _ = sales.create_invoice(
+                "2024-01-01", "C1", [{"codprod": "P1", "canti": 4}], username=self.session, update_stock=True
+            )
+            self.assertIsNotNone(invoice_id)
+        self.assertEqual(self._count("ventas"), 1)
+        self.assertEqual(self.inventories.read_inventory("P1", username=self.session)["cantidad"], 6)
+
+    def test_closing_an_earlier_handle_keeps_later_commits(self) -> None:
+        self._create_bundle("P0")
+        Custumers.create_client("C0", "Ana", "Calle", "1", "Cali")
+        SalesCRUD().create_invoice("2024-01-01", "C0", [{"codprod": "P0", "canti": 1}], username=self.session)
+        with unit_of_work():
+            outer = get_connection()
+            outer.execute("INSERT INTO clientes (codclie, nomclie, direc, telef, ciudad) VALUES ('C1', 'A', 'B', 'C', 'D')")
+            self.products.create_product("P1", "Teclado", "USB", 0.19, 25.0)
+            outer.close()
+            # Un generador abierto no se lleva las escrituras hechas mientras tanto.
+            Custumers.create_client("C2", "Ana", "Calle", "1", "Cali")
+            sales = SalesCRUD().iter_sales(self.session)
+            self.assertEqual(len(list(itertools.islice(sales, 1))), 1)
+            self.products.create_product("P2", "Mouse", "USB", 0.19, 10.0)
+            sales.close()
+            # Sin commits intermedios, close() sigue descartando lo no confirmado.
+            handle = get_connection()
+            handle.execute("DELETE FROM productos WHERE codprod IN ('P1', 'P2')")
+            handle.close()
+        self.assertEqual(self._count("productos"), 3)
+        self.assertEqual(self._count("clientes"), 3)
+
+    def test_handle_closed_before_a_later_one_waits_for_it(self) -> None:
+        with unit_of_work():
+            first = get_connection()
+            second = get_connection()
+            first.close()
+            self.assertTrue(first.closed)
+            second.execute("INSERT INTO clientes (codclie, nomclie, direc, telef, ciudad) VALUES ('C1', 'A', 'B', 'C', 'D')")
+            second.commit()
+            second.close()
+            with self.assertRaises(sqlite3.ProgrammingError):
+                first.commit()
+        self.assertEqual(self._count("clientes"), 1)
+
+    def test_cached_reads_of_rolled_back_rows_are_dropped(self) -> None:
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                self.products.create_product("P1", "Teclado", "USB", 0.19, 25.0)
+                self.assertEqual(len(self.products.list_products()), 1)
+                raise RuntimeError("abortar")
+        self.assertEqual(self.products.list_products(), [])
+
+    def test_uncommitted_rows_are_not_cached_for_other_threads(self) -> None:
+        seen: list[list[dict]] = []
+        with unit_of_work():
+            self.products.create_product("P1", "Teclado", "USB", 0.19, 25.0)
+            self.assertEqual(len(self.products.list_products()), 1)
+            # Otro hilo consulta antes del commit: no debe recibir la fila sin confirmar.
+            reader = threading.Thread(target=lambda: seen.append(self.products.list_products()))
+            reader.start()
+            reader.join()
+        self.assertEqual(seen, [[]])
+        self.assertEqual(len(self.products.list_products()), 1)
+
+    def test_catalog_lookups_inside_a_unit_are_not_stored(self) -> None:
+        catalog = ProductCatalog()
+        catalog.ensure_loaded()
+        with unit_of_work() as unit:
+            self.products.create_product("LEAK1", "Teclado", "USB", 0.19, 25.0)
+            self.assertEqual(catalog.get("LEAK1")["nomprod"], "Teclado")
+            self.assertEqual([p["codprod"] for p in catalog.search_prefix("tec")], ["LEAK1"])
+            unit.fail()
+        self.assertIsNone(catalog.peek("LEAK1"))
+        self.assertIsNone(catalog.get("LEAK1"))
+
+    def test_levels_read_inside_a_rolled_back_unit_are_not_cached(self) -> None:
+        users = UsersCRUD()
+        users.create_user("vendedor", "clave", 3)
+        with unit_of_work() as unit:
+            users.update_user("vendedor", None, 1)
+            self.assertEqual(users.get_cached_user_level("vendedor"), 1)
+            unit.fail()
+        self.assertEqual(users.get_cached_user_level("vendedor"), 3)
+
+    def test_check_aborts_the_unit_on_a_rejected_call(self) -> None:
+        with self.assertRaises(UnitOfWorkAborted) as raised:
+            with unit_of_work() as unit:
+                unit.check(self.products.create_product("P1", "Teclado", "USB", 0.19, 25.0))
+                unit.check(self.products.create_product("P1", "Repetido", "USB", 0.19, 25.0))
+        self.assertTrue(str(raised.exception))
+        self.assertEqual(self._count("productos"), 0)
+
+    def test_fail_rolls_back_without_raising(self) -> None:
+        with unit_of_work() as unit:
+            self._create_bundle("P1")
+            with unit_of_work() as inner:
+                self.products.create_product("P2", "Mouse", "USB", 0.19, 10.0)
+                inner.fail()
+            self.assertIsNone(self.products.read_product("P2"))
+            unit.fail()
+        self.assertEqual([self._count(t) for t in ("productos", "proveedores", "inventarios")], [0, 0, 0])
+
+    def test_rejected_commit_is_rolled_back(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        try:
+            with self.assertRaises(sqlite3.IntegrityError):
+                with unit_of_work(connection=conn):
+                    handle = get_connection()
+                    handle.execute("PRAGMA defer_foreign_keys = ON")
+                    handle.execute(
+                        """
+                        INSERT INTO ventas (fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal)
+                        VALUES ('2024-01-01', 'C404', 'P404', 'Nada', 1.0, 1, 0.0, 1.0, 1.0)
+                        """
+                    )
+                    handle.commit()
+                    handle.close()
+            self.assertFalse(conn.in_transaction)
+            # La conexión queda lista para la siguiente unidad.
+            with unit_of_work(connection=conn):
+                Custumers.create_client("C1", "Ana", "Calle", "1", "Cali")
+        finally:
+            conn.close()
+        self.assertEqual(self._count("ventas"), 0)
+        self.assertEqual(self._count("clientes"), 1)
+
+    def test_connections_outside_the_scope_are_independent(self) -> None:
+        with unit_of_work():
+            handle = get_connection()
+            handle.close()
+        conn = get_connection()
+        try:
+            self.assertIsInstance(conn, sqlite3.Connection)
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
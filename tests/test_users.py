@@ -0,0 +1,116 @@
+"""Tests for user helpers: level cache and invalidation."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.init_db import initialize_database
+from Modules.Sales import SalesCRUD
+from Modules.Session import Session
+from Modules.Users import USER_LEVEL_CACHE, UsersCRUD
+
+
+class UserLevelCacheTests(unittest.TestCase):
+    """Verify that authorization is served from the shared level cache."""
+
+    def setUp(self) -> None:
+        self._tmp_dir = TemporaryDirectory()
+        db_path = Path(self._tmp_dir.name) / "users.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(db_path)
+        initialize_database(str(db_path))
+        USER_LEVEL_CACHE.invalidate()
+        self.users = UsersCRUD()
+
+    def tearDown(self) -> None:
+        USER_LEVEL_CACHE.invalidate()
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self._tmp_dir.cleanup()
+
+    def test_authorize_hits_cache_after_first_lookup(self) -> None:
+        self.users.create_user("cached", "pass", level=2)
+        sales = SalesCRUD()
+        before = USER_LEVEL_CACHE.stats()
+        for _ in range(3):
+            sales.list_sales(username="cached")
+        after = USER_LEVEL_CACHE.stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 2)
+
+    def test_update_and_delete_invalidate(self) -> None:
+        self.users.create_user("mover", "pass", level=3)
+        self.assertEqual(self.users.get_cached_user_level("mover"), 3)
+        self.users.update_user("mover", None, 1)
+        self.assertEqual(self.users.get_cached_user_level("mover"), 1)
+        self.users.delete_user("mover")
+        self.assertIsNone(self.users.get_cached_user_level("mover"))
+
+    def test_level_loaded_across_an_invalidation_is_not_stored(self) -> None:
+        self.users.create_user("demoted", "pass", level=1)
+
+        def load_then_demote(username: str):
+            level = self.users.get_user_level(username)
+            # Otra operación degrada al usuario mientras la carga sigue en curso.
+            self.users.update_user(username, None, 3)
+            return level
+
+        self.assertEqual(USER_LEVEL_CACHE.get_level("demoted", load_then_demote), 1)
+        self.assertEqual(self.users.get_cached_user_level("demoted"), 3)
+
+    def test_levels_are_keyed_by_connection_factory(self) -> None:
+        other_path = Path(self._tmp_dir.name) / "other.sqlite"
+        initialize_database(str(other_path))
+
+        def other_factory():
+            return sqlite3.connect(other_path)
+
+        self.users.create_user("shared", "pass", level=1)
+        UsersCRUD(other_factory).create_user("shared", "pass", level=3)
+        self.assertEqual(self.users.get_cached_user_level("shared"), 1)
+        self.assertEqual(UsersCRUD(other_factory).get_cached_user_level("shared"), 3)
+
+    def test_authenticate_returns_session(self) -> None:
+        self.users.create_user("clerk", "secret", level=2)
+        session, _ = self.users.authenticate("clerk", "secret")
+        self.assertIsInstance(session, Session)
+        self.assertEqual(session.level, 2)
+        self.assertTrue(session.can("sales", "create"))
+        self.assertFalse(session.can("users", "read"))
+        self.assertEqual(session.allowed_actions("sales"), ["read", "create", "report"])
+        denied, msg = self.users.authenticate("clerk", "wrong")
+        self.assertIsNone(denied)
+        self.assertIn("incorrecta", msg)
+
+    def test_session_skips_level_lookup(self) -> None:
+        self.users.create_user("clerk", "secret", level=2)
+        session, _ = self.users.authenticate("clerk", "secret")
+        before = USER_LEVEL_CACHE.stats()
+        # Pasa la autorización y falla después, en la validación del cliente.
+        result = SalesCRUD().create_sale("2024-01-01", "C404", "P1", "Lápiz", 1.0, 1, username=session)
+        self.assertEqual(result, (False, "El cliente asociado no existe."))
+        after = USER_LEVEL_CACHE.stats()
+        self.assertEqual(before["hits"] + before["misses"], after["hits"] + after["misses"])
+
+    def test_unregistered_and_revoked_sessions_are_checked_against_the_database(self) -> None:
+        sales = SalesCRUD()
+
+        def create_sale(session):
+            return sales.create_sale("2024-01-01", "C404", "P1", "Lápiz", 1.0, 1, username=session)
+
+        self.assertEqual(create_sale(Session.for_user("ghost", 1)), (False, "Usuario no encontrado."))
+
+        self.users.create_user("clerk", "secret", level=2)
+        session, _ = self.users.authenticate("clerk", "secret")
+        self.users.update_user("clerk", None, 3)
+        ok, message = create_sale(session)
+        self.assertFalse(ok)
+        self.assertIn("Acceso denegado", message)
+        self.users.delete_user("clerk")
+        self.assertEqual(create_sale(session), (False, "Usuario no encontrado."))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Tests for the paging model behind the virtual list widget."""
+
+from __future__ import annotations
+
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.connection import get_connection
+from DB.init_db import initialize_database
+from GUI.virtual_list import PagedRows, list_page_loader
+from Modules.Sales import SalesCRUD
+from Modules.Users import UsersCRUD
+
+
+class PagedRowsTests(unittest.TestCase):
+    """Verify lazy page loading, the bounded cache and keyset sources."""
+
+    def setUp(self) -> None:
+        self.data = [{"id": index} for index in range(1, 1001)]
+        self.calls: list[tuple[int, int]] = []
+        loader = list_page_loader(self.data)
+
+        def counting_loader(token: int, limit: int):
+            self.calls.append((token, limit))
+            return loader(token, limit)
+
+        self.rows = PagedRows(counting_loader, page_size=100, max_pages=3)
+
+    def test_only_pages_up_to_the_visible_window_are_loaded(self) -> None:
+        self.assertEqual([row["id"] for row in self.rows.rows(0, 10)], list(range(1, 11)))
+        self.assertEqual(self.calls, [(0, 100)])
+        self.assertIsNone(self.rows.total)
+        self.assertEqual(self.rows.estimated_count(), 200)
+
+        self.assertEqual([row["id"] for row in self.rows.rows(195, 205)], list(range(196, 206)))
+        self.assertEqual(len(self.calls), 3)
+
+    def test_total_is_exact_after_reaching_the_end(self) -> None:
+        self.assertEqual(len(self.rows.rows(990, 1010)), 10)
+        self.assertEqual(self.rows.total, 1000)
+        self.assertEqual(self.rows.rows(2000, 2010), [])
+
+    def test_evicted_pages_are_reloaded_from_their_token(self) -> None:
+        self.rows.rows(0, 600)
+        self.calls.clear()
+        self.assertEqual(self.rows.rows(0, 1), [{"id": 1}])
+        self.assertEqual(self.calls, [(0, 100)])
+
+    def test_cached_rows_report_missing_pages_until_stored(self) -> None:
+        rows = PagedRows(None, page_size=100)
+        visible, missing = rows.cached_rows(95, 105)
+        self.assertEqual(visible, [None] * 5)
+        self.assertEqual(missing, [0])
+
+        loader = list_page_loader(self.data)
+        rows.store(0, *loader(rows.token(0), 100))
+        visible, missing = rows.cached_rows(95, 105)
+        self.assertEqual([row and row["id"] for row in visible], [96, 97, 98, 99, 100] + [None] * 5)
+        self.assertEqual(missing, [1])
+
+        rows.store(1, *loader(rows.token(1), 100))
+        visible, missing = rows.cached_rows(95, 105)
+        self.assertEqual([row["id"] for row in visible], list(range(96, 106)))
+        self.assertEqual(missing, [])
+        self.assertEqual(rows.loads, 2)
+
+    def test_stored_last_page_fixes_the_total(self) -> None:
+        rows = PagedRows(None, page_size=100)
+        rows.store(0, [{"id": 1}, {"id": 2}], None)
+        self.assertEqual(rows.total, 2)
+        visible, missing = rows.cached_rows(0, 50)
+        self.assertEqual([row["id"] for row in visible], [1, 2])
+        self.assertEqual(missing, [])
+
+    def test_keyset_sales_source(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            db_path = Path(tmp_dir) / "virtual.sqlite"
+            os.environ["PYTHON_BD_DB_PATH"] = str(db_path)
+            try:
+                initialize_database(str(db_path))
+                conn = get_connection()
+                conn.execute("INSERT INTO clientes VALUES ('C1', 'Ana', 'Calle', '1', 'Cali')")
+                conn.execute("INSERT INTO productos VALUES ('P1', 'Lápiz', 'Desc', 0.19, 1.0)")
+                conn.executemany(
+                    """
+                    INSERT INTO ventas (fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal)
+                    VALUES ('2024-01-01', 'C1', 'P1', 'Lápiz', 1.0, 1, 0.19, 1.0, 1.19)
+                    """,
+                    [()] * 25,
+                )
+                conn.commit()
+                conn.close()
+                service = SalesCRUD()
+                UsersCRUD().create_user("seller", "clave", 2)
+                session, _ = UsersCRUD().authenticate("seller", "clave")
+                rows = PagedRows(
+                    lambda after_id, limit: service.list_sales_page(session, after_id=after_id, limit=limit),
+                    page_size=10,
+                )
+                self.assertEqual([sale["id"] for sale in rows.rows(8, 12)], [9, 10, 11, 12])
+                self.assertIsNone(rows.total)
+                rows.reach(100)
+                self.assertEqual(rows.total, 25)
+            finally:
+                os.environ.pop("PYTHON_BD_DB_PATH", None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""Tests for the group-commit writer and its throughput benchmark."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from DB.connection import get_connection
+from DB.init_db import initialize_database
+from DB.writer import GroupCommitWriter
+from Modules import Custumers
+from Modules.Products import ProductsCRUD
+from Modules.Sales import SalesCRUD
+from Modules.Users import UsersCRUD
+from tests.benchmark_writer import run_comparison
+
+
+class GroupCommitWriterTests(unittest.TestCase):
+    """Verify batching, per-request isolation and acknowledgement after commit."""
+
+    def setUp(self) -> None:
+        self.tmp_dir = TemporaryDirectory()
+        self.db_path = Path(self.tmp_dir.name) / "writer.sqlite"
+        os.environ["PYTHON_BD_DB_PATH"] = str(self.db_path)
+        initialize_database(self.db_path)
+        Custumers.create_client("C1", "Ana", "Calle", "1", "Cali")
+        ProductsCRUD().create_product("P1", "Lápiz", "Desc", 0.19, 1.0)
+        self.sales = SalesCRUD()
+        UsersCRUD().create_user("admin", "clave", 1)
+        self.session, _ = UsersCRUD().authenticate("admin", "clave")
+
+    def tearDown(self) -> None:
+        os.environ.pop("PYTHON_BD_DB_PATH", None)
+        self.tmp_dir.cleanup()
+
+    def _count_sales(self) -> int:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM ventas").fetchone()[0]
+        finally:
+            conn.close()
+
+    def _sale(self, codclie: str = "C1"):
+        return self.sales.create_sale("2024-01-01", codclie, "P1", "Lápiz", 1.0, 1, username=self.session)
+
+    def test_queued_requests_share_one_commit(self) -> None:
+        with GroupCommitWriter(batch_window=0.2) as writer:
+            futures = [writer.submit(self._sale) for _ in range(20)]
+            results = [future.result(timeout=5) for future in futures]
+            # Al resolverse el future la venta ya es visible para otra conexión.
+            self.assertEqual(self._count_sales(), 20)
+        self.assertTrue(all(ok for ok, _ in results))
+        self.assertEqual(writer.stats["requests"], 20)
+        self.assertLess(writer.stats["batches"], 20)
+
+    def test_failing_request_does_not_affect_the_rest_of_the_batch(self) -> None:
+        def sale_then_fail():
+            self._sale()
+            raise ValueError("falla")
+
+        with GroupCommitWriter(batch_window=0.2) as writer:
+            first = writer.submit(self._sale)
+            failing = writer.submit(sale_then_fail)
+            rejected = writer.submit(self._sale, "C404")
+            last = writer.submit(self._sale)
+            with self.assertRaises(ValueError):
+                failing.result(timeout=5)
+            self.assertEqual(rejected.result(timeout=5), (False, "El cliente asociado no existe."))
+            self.assertTrue(first.result(timeout=5)[0] and last.result(timeout=5)[0])
+        self.assertEqual(self._count_sales(), 2)
+
+    def test_writer_recovers_after_a_rejected_commit(self) -> None:
+        def deferred_orphan_sale() -> bool:
+            # Con llaves foráneas diferidas el error aparece recién en el COMMIT del lote.
+            conn = get_connection()
+            try:
+                conn.execute("PRAGMA defer_foreign_keys = ON")
+                conn.execute(
+                    """
+                    INSERT INTO ventas (fecha, codclie, codprod, nomprod, costovta, canti, vriva, subtotal, vrtotal)
+                    VALUES ('2024-01-01', 'C404', 'P1', 'Lápiz', 1.0, 1, 0.0, 1.0, 1.0)
+                    """
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            return True
+
+        with GroupCommitWriter() as writer:
+            with self.assertRaises(sqlite3.IntegrityError):
+                writer.submit(deferred_orphan_sale).result(timeout=5)
+            self.assertTrue(writer.submit(self._sale).result(timeout=5)[0])
+        self.assertEqual(writer.stats["failed"], 1)
+        self.assertEqual(self._count_sales(), 1)
+
+    def test_base_exception_resolves_futures_and_closes_the_writer(self) -> None:
+        class Stop(BaseException):
+            pass
+
+        def stop() -> None:
+            raise Stop()
+
+        writer = GroupCommitWriter(batch_window=0.2)
+        sale = writer.submit(self._sale)
+        stopping = writer.submit(stop)
+        with self.assertRaises(Stop):
+            stopping.result(timeout=5)
+        with self.assertRaises(Stop):
+            sale.result(timeout=5)
+        writer._thread.join(timeout=5)
+        self.assertFalse(writer._thread.is_alive())
+        with self.assertRaises(RuntimeError):
+            writer.submit(self._sale)
+        writer.close()
+        self.assertEqual(self._count_sales(), 0)
+
+    def test_close_flushes_queue_and_rejects_new_work(self) -> None:
+        writer = GroupCommitWriter()
+        futures = [writer.submit(self._sale) for _ in range(5)]
+        writer.close()
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(self._count_sales(), 5)
+        with self.assertRaises(RuntimeError):
+            writer.submit(self._sale)
+
+    def test_benchmark_compares_both_modes(self) -> None:
+        Custumers.create_client("C0000001", "Bench", "Calle", "1", "Cali")
+        ProductsCRUD().create_product("P000001", "Bench", "Desc", 0.19, 10.0)
+        results = run_comparison((1, 4), per_producer=5)
+        self.assertEqual([(row["mode"], row["producers"]) for row in results],
+                         [("direct", 1), ("group", 1), ("direct", 4), ("group", 4)])
+        self.assertTrue(all(row["errors"] == 0 and row["sales"] == row["producers"] * 5 for row in results))
+
+
+if __name__ == "__main__":
+    unittest.main()